@@ -0,0 +1,47 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Tuple, Dict, Optional
+
+_OK_BODY = json.dumps({"ok": True}).encode()
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """
+    Handler that answers requests with the server's canned response for the requested path, else with Shinobi's minimal
+    success response, using keep-alive connections.
+    """
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, which otherwise stalls keep-alive connections on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        content_length = int(self.headers.get("Content-Length", 0))
+        if content_length:
+            self.rfile.read(content_length)
+        body = self.server.responses.get(self.path, _OK_BODY)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stand_in_server(responses: Optional[Dict[str, bytes]] = None) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    Starts a local HTTP server that stands in for Shinobi.
+    :param responses: map of path (including query) to the (JSON) body to respond with
+    :return: tuple of the running server (call `shutdown` to stop) and its host:port
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    server.daemon_threads = True
+    server.responses = dict(responses) if responses is not None else {}
+    Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"{host}:{port}"
@@ -0,0 +1,97 @@
+"""
+Compares the time taken to decode large responses from Shinobi (a list of all users and a monitor inventory) as
+previously, decoding the body once to check for errors and again to use it, against the single-parse decoding layer
+(which uses orjson, if installed).
+
+Run with:
+```
+python -m benchmarks.decoding [--entries N]
+```
+"""
+import argparse
+import json
+from time import perf_counter
+from typing import Callable, Any
+
+from requests import Response
+
+import shinobi_client._common
+from shinobi_client._common import decode, raise_if_errors
+from shinobi_client.orms.user import ShinobiUserOrm
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+
+def _create_response(content: Any) -> Response:
+    response = Response()
+    response.status_code = 200
+    response._content = json.dumps(content).encode()
+    return response
+
+
+def _decode_twice(response: Response) -> Any:
+    """
+    Decodes the response as was previously done: once to check for errors and again to use it.
+    """
+    response.raise_for_status()
+    json_response = response.json()
+    if isinstance(json_response, dict) and not json_response.get("ok", True):
+        raise RuntimeError(json_response.get("msg", json_response))
+    return response.json()
+
+
+def _decode_once(response: Response) -> Any:
+    """
+    Decodes the response using the decoding layer, which is shared by error checking and use.
+    """
+    raise_if_errors(response)
+    return decode(response).payload
+
+
+def _measure(decoder: Callable[[Response], Any], content: Any, repeats: int) -> float:
+    """
+    Measures the time taken to decode the given content (as a fresh response each time).
+    :return: best time taken, in seconds
+    """
+    elapsed = float("inf")
+    for _ in range(repeats):
+        response = _create_response(content)
+        started_at = perf_counter()
+        decoder(response)
+        elapsed = min(elapsed, perf_counter() - started_at)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=10000, help="number of users/monitors in each response")
+    parser.add_argument("--repeats", type=int, default=5, help="number of times to decode (best time is reported)")
+    arguments = parser.parse_args()
+
+    user = ShinobiUserOrm._create_register_payload("user@example.com", "password")["data"]
+    monitor = get_monitor_configuration(1)
+    contents = {
+        "accounts/list": {"ok": True, "users": [
+            dict(user, mail=f"user{i}@example.com", uid=f"uid{i}", ke=f"ke{i}") for i in range(arguments.entries)]},
+        "monitor inventory": [
+            dict(monitor, mid=f"camera{i}", ke="ke", details=json.dumps(monitor["details"]))
+            for i in range(arguments.entries)],
+    }
+
+    orjson = shinobi_client._common.orjson
+    for name, content in contents.items():
+        print(f"{name} ({arguments.entries} entries):")
+        before = _measure(_decode_twice, content, arguments.repeats)
+        print(f"  decoded twice (json):   {before * 1000:8.1f} ms")
+        try:
+            shinobi_client._common.orjson = None
+            after = _measure(_decode_once, content, arguments.repeats)
+        finally:
+            shinobi_client._common.orjson = orjson
+        print(f"  decoded once (json):    {after * 1000:8.1f} ms ({before / after:.2f}x faster)")
+        if orjson is not None:
+            after = _measure(_decode_once, content, arguments.repeats)
+            print(f"  decoded once (orjson):  {after * 1000:8.1f} ms ({before / after:.2f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compares the CPU time and peak memory of turning Shinobi's response to a request for all monitors into monitors, using
+eagerly deep-copied dictionaries (as previously) against lazy monitor records.
+
+Run with:
+```
+python -m benchmarks.monitor_records [--monitors N]
+```
+"""
+import argparse
+import json
+import tracemalloc
+from copy import deepcopy
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+from shinobi_client.orms.monitor import ShinobiMonitorOrm
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+
+def _create_eager_entry(monitor: Dict) -> Dict:
+    """
+    Creates a monitor entry as was previously done, by deep-copying and eagerly parsing details.
+    """
+    monitor = deepcopy(monitor)
+    monitor["id"] = monitor["mid"]
+    monitor["details"] = json.loads(monitor["details"])
+    return monitor
+
+
+def _create_response(number_of_monitors: int) -> bytes:
+    """
+    Creates a response to a request for all monitors, where details are JSON dumped strings (as the API returns).
+    """
+    configuration = get_monitor_configuration(1)
+    return json.dumps([
+        dict(configuration, mid=f"camera{i}", ke="group", details=json.dumps(configuration["details"]))
+        for i in range(number_of_monitors)]).encode()
+
+
+def _measure(parse: Callable[[List[Dict]], Tuple], use: Callable[[Tuple], None], content: bytes) -> Tuple[float, int]:
+    """
+    Measures the time (best of 3) and peak memory of decoding and parsing the response and then using the monitors.
+    :return: tuple of seconds taken and peak memory allocated (in bytes)
+    """
+    # Timed separately, as tracing memory allocations slows them down
+    elapsed = float("inf")
+    for _ in range(3):
+        started_at = perf_counter()
+        use(parse(json.loads(content)))
+        elapsed = min(elapsed, perf_counter() - started_at)
+    tracemalloc.start()
+    use(parse(json.loads(content)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--monitors", type=int, default=10000, help="number of monitors in the response")
+    arguments = parser.parse_args()
+    content = _create_response(arguments.monitors)
+
+    uses = {
+        "names only": lambda monitors: [monitor["name"] for monitor in monitors],
+        "names and details": lambda monitors: [(monitor["name"], monitor["details"]["muser"]) for monitor in monitors],
+    }
+    for use_name, use in uses.items():
+        before = _measure(lambda monitors: tuple(_create_eager_entry(monitor) for monitor in monitors), use, content)
+        after = _measure(ShinobiMonitorOrm._parse_get_all_response, use, content)
+        print(f"{arguments.monitors} monitors, {use_name}:")
+        print(f"  deep-copied dictionaries: {before[0] * 1000:8.1f} ms, {before[1] / 2 ** 20:7.1f} MiB peak")
+        print(f"  lazy records:             {after[0] * 1000:8.1f} ms, {after[1] / 2 ** 20:7.1f} MiB peak "
+              f"({before[0] / after[0]:.2f}x faster, {before[1] / after[1]:.2f}x less memory)")
+
+
+if __name__ == "__main__":
+    main()
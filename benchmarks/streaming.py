@@ -0,0 +1,73 @@
+"""
+Compares the peak memory and time to the first monitor of getting all monitors with `get_all` against streaming them
+with `iter_all`.
+
+Run with:
+```
+python -m benchmarks.streaming [--monitors N]
+```
+"""
+import argparse
+import json
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Iterable, Tuple
+
+from benchmarks._stand_in import start_stand_in_server
+from shinobi_client import ShinobiClient
+from shinobi_client.orms.monitor import ShinobiMonitorOrm
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+_API_KEY = "api-key"
+_GROUP_KEY = "group"
+
+
+def _measure(get_monitors: Callable[[], Iterable]) -> Tuple[float, float, int]:
+    """
+    Measures getting and using (reading the name of) all monitors.
+    :return: tuple of seconds to the first monitor, seconds to all monitors and peak memory allocated (in bytes)
+    """
+    tracemalloc.start()
+    started_at = perf_counter()
+    first_at = None
+    for monitor in get_monitors():
+        monitor["name"]
+        if first_at is None:
+            first_at = perf_counter()
+    elapsed = perf_counter() - started_at
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_at - started_at, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--monitors", type=int, default=10000, help="number of monitors to get")
+    arguments = parser.parse_args()
+
+    configuration = get_monitor_configuration(1)
+    monitors = [dict(configuration, mid=f"camera{i}", ke=_GROUP_KEY, details=json.dumps(configuration["details"]))
+                for i in range(arguments.monitors)]
+    server, address = start_stand_in_server({
+        "/?json=true": json.dumps({"ok": True, "$user": {
+            "mail": "user@example.com", "auth_token": _API_KEY, "ke": _GROUP_KEY}}).encode(),
+        f"/{_API_KEY}/monitor/{_GROUP_KEY}": json.dumps(monitors).encode()
+    })
+    del monitors
+    try:
+        host, port = address.split(":")
+        shinobi_client = ShinobiClient(host, port)
+        monitor_orm = ShinobiMonitorOrm(shinobi_client, "user@example.com", "password")
+        results = {"get_all": _measure(monitor_orm.get_all), "iter_all": _measure(monitor_orm.iter_all)}
+        shinobi_client.close()
+    finally:
+        server.shutdown()
+
+    print(f"{arguments.monitors} monitors:")
+    for name, (first, elapsed, peak) in results.items():
+        print(f"  {name + ':':10} first after {first * 1000:8.1f} ms, all after {elapsed * 1000:8.1f} ms, "
+              f"{peak / 2 ** 20:7.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Measures the throughput and latency of the user and monitor ORMs at scale, against a stand-in Shinobi.
+
+Scenarios:
+- user create/get/delete with 100 to 10,000 existing accounts
+- monitor create/modify/get_all with 10 to 10,000 existing monitors
+each with verification on and off (where applicable) and with concurrent callers.
+
+Reports ops/sec, p50/p99 latency, HTTP requests made per operation and peak memory allocated (by the client and the
+stand-in, which runs in the same process), optionally storing the results as JSON for comparison with another run.
+
+Run with:
+```
+python -m benchmarks.suite [--quick] [--output results.json] [--compare previous-results.json]
+```
+"""
+import argparse
+import json
+import platform
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from itertools import count
+from time import perf_counter
+from typing import Callable, List, Optional, Any, Dict, Tuple, Iterator
+
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+RESULTS_VERSION = 1
+
+_PASSWORD = "password"
+# Maximum number of operations measured under `tracemalloc` (which slows operations down, so is measured separately)
+_MEMORY_OPERATIONS = 10
+# Monitors returned by the `get_all` operations measured at each size (as each returns all of the monitors)
+_GET_ALL_MONITORS = 20000
+
+# Prepares the given number of operations (without measuring), returning a callable to make each operation
+Prepare = Callable[[int], List[Callable[[], Any]]]
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Result of measuring an operation.
+
+    `verify` is `None` for operations that cannot be verified.
+    """
+    scenario: str
+    operation: str
+    size: int
+    verify: Optional[bool]
+    concurrency: int
+    operations: int
+    ops_per_sec: float
+    p50_ms: float
+    p99_ms: float
+    requests_per_op: float
+    peak_memory_bytes: int
+
+    @property
+    def key(self) -> Tuple:
+        return self.scenario, self.operation, self.size, self.verify, self.concurrency
+
+    def __str__(self) -> str:
+        verify = "-" if self.verify is None else ("on" if self.verify else "off")
+        return f"{self.scenario:8} {self.operation:8} size={self.size:<6} verify={verify:3} " \
+               f"callers={self.concurrency:<3} {self.ops_per_sec:9.1f} ops/sec  p50={self.p50_ms:8.2f}ms  " \
+               f"p99={self.p99_ms:8.2f}ms  requests/op={self.requests_per_op:5.2f}  " \
+               f"peak={self.peak_memory_bytes / 1024:9.1f}KiB"
+
+
+def measure(stand_in_shinobi: StandInShinobi, prepare: Prepare, operations: int, concurrency: int) -> Dict:
+    """
+    Measures operations made against the given stand-in.
+    :param stand_in_shinobi: stand-in that the operations are made against
+    :param prepare: prepares the operations to measure
+    :param operations: number of operations to measure
+    :param concurrency: number of concurrent callers making the operations
+    :return: measurements, as keyword arguments of `BenchmarkResult`
+    """
+    to_time = prepare(operations)
+    requests_before = stand_in_shinobi.requests
+
+    def timed(operation: Callable[[], Any]) -> float:
+        started_at = perf_counter()
+        operation()
+        return perf_counter() - started_at
+
+    started_at = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(timed, to_time))
+    elapsed = perf_counter() - started_at
+    requests = stand_in_shinobi.requests - requests_before
+
+    to_trace = prepare(min(operations, _MEMORY_OPERATIONS))
+    tracemalloc.start()
+    for operation in to_trace:
+        operation()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return dict(operations=operations, ops_per_sec=operations / elapsed, p50_ms=_percentile(latencies, 0.5) * 1000,
+                p99_ms=_percentile(latencies, 0.99) * 1000, requests_per_op=requests / operations,
+                peak_memory_bytes=peak_memory)
+
+
+def benchmark_users(size: int, operations: int, concurrencies: List[int]) -> Iterator[BenchmarkResult]:
+    """
+    Benchmarks the user ORM with the given number of existing users.
+    :param size: number of existing users
+    :param operations: number of operations to measure
+    :param concurrencies: numbers of concurrent callers to measure with
+    :return: results
+    """
+    stand_in_shinobi = StandInShinobi()
+    shinobi_client = stand_in_shinobi.start()
+    try:
+        emails = (f"user-{i}@example.com" for i in count())
+
+        def register_users(number: int) -> List[str]:
+            registered = [next(emails) for _ in range(number)]
+            for email in registered:
+                stand_in_shinobi.handle("POST", f"/super/{stand_in_shinobi.super_user_token}/accounts/registerAdmin",
+                                        {"data": {"mail": email, "pass": _PASSWORD}})
+            return registered
+
+        existing_emails = register_users(size)
+
+        def prepare_create(verify: bool) -> Prepare:
+            return lambda number: [lambda email=next(emails): shinobi_client.user.create(email, _PASSWORD, verify)
+                                   for _ in range(number)]
+
+        def prepare_get(number: int) -> List[Callable[[], Any]]:
+            return [lambda email=existing_emails[i % size]: shinobi_client.user.get(email) for i in range(number)]
+
+        def prepare_delete(verify: bool) -> Prepare:
+            return lambda number: [lambda email=email: shinobi_client.user.delete(email, verify)
+                                   for email in register_users(number)]
+
+        for concurrency in concurrencies:
+            for verify in (False, True):
+                yield BenchmarkResult("user", "create", size, verify, concurrency, **measure(
+                    stand_in_shinobi, prepare_create(verify), operations, concurrency))
+            yield BenchmarkResult("user", "get", size, None, concurrency, **measure(
+                stand_in_shinobi, prepare_get, operations, concurrency))
+            for verify in (False, True):
+                yield BenchmarkResult("user", "delete", size, verify, concurrency, **measure(
+                    stand_in_shinobi, prepare_delete(verify), operations, concurrency))
+    finally:
+        shinobi_client.close()
+        stand_in_shinobi.stop()
+
+
+def benchmark_monitors(size: int, operations: int, concurrencies: List[int]) -> Iterator[BenchmarkResult]:
+    """
+    Benchmarks the monitor ORM with the given number of existing monitors.
+    :param size: number of existing monitors
+    :param operations: number of operations to measure
+    :param concurrencies: numbers of concurrent callers to measure with
+    :return: results
+    """
+    stand_in_shinobi = StandInShinobi()
+    shinobi_client = stand_in_shinobi.start()
+    try:
+        email = "user@example.com"
+        shinobi_client.user.create(email, _PASSWORD)
+        monitor_orm = shinobi_client.monitor(email, _PASSWORD)
+        configuration = get_monitor_configuration(1)
+        for i in range(size):
+            stand_in_shinobi.handle("POST", f"/{monitor_orm.api_key}/configureMonitor/{monitor_orm.group_key}/{i}",
+                                    {"data": configuration})
+        monitor_ids = (f"new{i}" for i in count())
+        names = (f"Camera {i}" for i in count())
+
+        def prepare_create(verify: bool) -> Prepare:
+            return lambda number: [
+                lambda monitor_id=next(monitor_ids): monitor_orm.create(monitor_id, configuration, verify)
+                for _ in range(number)]
+
+        def prepare_modify(verify: bool) -> Prepare:
+            return lambda number: [
+                lambda monitor_id=str(i % size), name=next(names): monitor_orm.modify(
+                    monitor_id, dict(configuration, name=name), verify)
+                for i in range(number)]
+
+        def prepare_get_all(number: int) -> List[Callable[[], Any]]:
+            return [monitor_orm.get_all] * number
+
+        get_all_operations = max(3, min(operations, _GET_ALL_MONITORS // size))
+        for concurrency in concurrencies:
+            for verify in (False, True):
+                yield BenchmarkResult("monitor", "create", size, verify, concurrency, **measure(
+                    stand_in_shinobi, prepare_create(verify), operations, concurrency))
+                yield BenchmarkResult("monitor", "modify", size, verify, concurrency, **measure(
+                    stand_in_shinobi, prepare_modify(verify), operations, concurrency))
+            yield BenchmarkResult("monitor", "get_all", size, None, concurrency, **measure(
+                stand_in_shinobi, prepare_get_all, get_all_operations, concurrency))
+    finally:
+        shinobi_client.close()
+        stand_in_shinobi.stop()
+
+
+def compare(results: List[BenchmarkResult], previous_location: str) -> List[str]:
+    """
+    Compares results with those of a previous run.
+    :param results: results of this run
+    :param previous_location: location of the JSON results of the previous run
+    :return: description of the change in ops/sec and p99 latency of each operation measured by both runs
+    """
+    with open(previous_location, "r") as file:
+        previous = {BenchmarkResult(**result).key: BenchmarkResult(**result) for result in json.load(file)["results"]}
+    lines = []
+    for result in results:
+        before = previous.get(result.key)
+        if before is not None:
+            lines.append(f"{result.scenario:8} {result.operation:8} size={result.size:<6} verify={result.verify!s:5} "
+                         f"callers={result.concurrency:<3} ops/sec {result.ops_per_sec / before.ops_per_sec:6.2f}x  "
+                         f"p99 {result.p99_ms / before.p99_ms:6.2f}x")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=_parse_integers, default=[100, 1000, 10000],
+                        help="comma separated numbers of existing users to measure with")
+    parser.add_argument("--monitors", type=_parse_integers, default=[10, 100, 1000, 10000],
+                        help="comma separated numbers of existing monitors to measure with")
+    parser.add_argument("--concurrency", type=_parse_integers, default=[1, 8],
+                        help="comma separated numbers of concurrent callers to measure with")
+    parser.add_argument("--operations", type=int, default=200, help="number of each operation to measure")
+    parser.add_argument("--quick", action="store_true", help="measure fewer operations with fewer users/monitors")
+    parser.add_argument("--output", help="location to write the results to, as JSON")
+    parser.add_argument("--compare", help="location of the JSON results of a previous run to compare with")
+    arguments = parser.parse_args()
+    if arguments.quick:
+        arguments.users, arguments.monitors, arguments.operations = [100], [10, 100], 20
+
+    results = []
+    for size in arguments.users:
+        for result in benchmark_users(size, arguments.operations, arguments.concurrency):
+            print(result, flush=True)
+            results.append(result)
+    for size in arguments.monitors:
+        for result in benchmark_monitors(size, arguments.operations, arguments.concurrency):
+            print(result, flush=True)
+            results.append(result)
+
+    if arguments.output is not None:
+        with open(arguments.output, "w") as file:
+            json.dump(dict(version=RESULTS_VERSION, created=datetime.now(timezone.utc).isoformat(),
+                           python=platform.python_version(), platform=platform.platform(),
+                           results=[asdict(result) for result in results]), file, indent=2)
+    if arguments.compare is not None:
+        print(f"\nCompared with {arguments.compare}:")
+        print("\n".join(compare(results, arguments.compare)) or "No operations measured by both runs")
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """
+    Gets the given percentile (nearest rank) of the given ordered values.
+    """
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def _parse_integers(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip() != ""]
+
+
+if __name__ == "__main__":
+    main()
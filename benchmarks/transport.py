@@ -0,0 +1,55 @@
+"""
+Compares requests/sec of one-connection-per-request `requests.get` against the client's pooled transport.
+
+Run with:
+```
+python -m benchmarks.transport [--requests N]
+```
+"""
+import argparse
+from time import perf_counter
+from typing import Callable
+
+import requests
+
+from benchmarks._stand_in import start_stand_in_server
+from shinobi_client import ShinobiClient
+
+
+def _measure(get: Callable[[str], requests.Response], url: str, number_of_requests: int) -> float:
+    """
+    Measures the rate at which the given getter can make requests.
+    :param get: callable that makes a GET request to the given URL
+    :param url: URL to request
+    :param number_of_requests: number of requests to make
+    :return: requests/sec
+    """
+    started_at = perf_counter()
+    for _ in range(number_of_requests):
+        get(url).raise_for_status()
+    return number_of_requests / (perf_counter() - started_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000, help="number of requests to make per measurement")
+    arguments = parser.parse_args()
+
+    server, address = start_stand_in_server()
+    try:
+        host, port = address.split(":")
+        shinobi_client = ShinobiClient(host, port)
+        url = f"{shinobi_client.url}/monitor"
+
+        before = _measure(requests.get, url, arguments.requests)
+        after = _measure(shinobi_client.transport.get, url, arguments.requests)
+        shinobi_client.close()
+    finally:
+        server.shutdown()
+
+    print(f"module-level requests.get: {before:10.1f} requests/sec")
+    print(f"pooled transport:          {after:10.1f} requests/sec ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
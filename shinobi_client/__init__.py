@@ -2,8 +2,16 @@ from shinobi_client.client import ShinobiClient
 from shinobi_client.orms.user import ShinobiUserOrm, ShinobiWrongPasswordError
 from shinobi_client._common import ShinobiSuperUserCredentialsRequiredError
 from shinobi_client.orms.monitor import ShinobiMonitorOrm, ShinobiMonitorAlreadyExistsError
+from shinobi_client.orms.monitor_record import ShinobiMonitor
+from shinobi_client.orms.monitor_diff import diff_monitor_configuration, MonitorConfigurationDiff
 from shinobi_client.api_key import ShinobiApiKey
 try:
     from shinobi_client.shinobi_controller import start_shinobi, ShinobiController
 except ImportError:
     pass
+try:
+    from shinobi_client.async_client import AsyncShinobiClient
+    from shinobi_client.orms.async_user import AsyncShinobiUserOrm
+    from shinobi_client.orms.async_monitor import AsyncShinobiMonitorOrm
+except ImportError:
+    pass
@@ -1,10 +1,19 @@
+import json
 import string
-from asyncio import sleep
-from typing import Callable
 import random
+from dataclasses import dataclass
+from typing import Any, Optional, Union
 
 from requests import Response
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_NOT_AUTHORIZED_MESSAGE = "Not Authorized"
+_NOT_DECODED = object()
+
 
 class ShinobiSuperUserCredentialsRequiredError(RuntimeError):
     """
@@ -12,35 +21,114 @@ class ShinobiSuperUserCredentialsRequiredError(RuntimeError):
     """
 
 
-def raise_if_errors(shinobi_response: Response, raise_if_json_not_ok: bool = True):
+class ShinobiNotAuthorizedError(RuntimeError):
     """
-    Raises an exception if the response from Shinobi indicated there were errors.
+    Raised if Shinobi rejects the API key used to make a request.
+    """
+
+
+@dataclass(frozen=True)
+class ShinobiEnvelope:
+    """
+    Decoded response from Shinobi.
+    """
+    ok: bool
+    msg: Optional[str]
+    payload: Any
+
+    @staticmethod
+    def from_payload(payload: Any, ok_if_missing: bool = False) -> "ShinobiEnvelope":
+        """
+        Creates an envelope for the given decoded response.
+        :param payload: decoded response
+        :param ok_if_missing: whether an object without `ok` is ok, which should only be the case for endpoints that
+                              return a bare object (e.g. getting a monitor)
+        :return: the envelope
+        """
+        if isinstance(payload, dict):
+            # Yes, the API returns a 2XX when everything is not ok...
+            return ShinobiEnvelope(bool(payload.get("ok", ok_if_missing)), payload.get("msg"), payload)
+        return ShinobiEnvelope(True, None, payload)
+
+    @property
+    def is_not_authorized(self) -> bool:
+        """
+        Whether Shinobi rejected the API key used to make the request.
+        """
+        return not self.ok and self.msg == _NOT_AUTHORIZED_MESSAGE
+
+
+def loads(content: Union[bytes, str]) -> Any:
+    """
+    Decodes the given JSON, using orjson if it is installed.
+    :param content: JSON to decode
+    :return: decoded JSON
+    :raises ValueError: if the content is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps_canonical(value: Any) -> bytes:
+    """
+    Encodes the given value as canonical JSON (sorted keys, no whitespace, UTF-8), using orjson if it is installed.
+
+    Both encoders give the same encoding of strings, integers, booleans, `None`, lists and string keyed dictionaries.
+    :param value: value to encode
+    :return: encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def decode(shinobi_response: Response, ok_if_missing: bool = False) -> ShinobiEnvelope:
+    """
+    Decodes the given response from Shinobi.
+
+    The response body is only decoded once, however many times this is called for the same response.
     :param shinobi_response: the response from Shinobi
-    :param raise_if_json_not_ok: raise an exception if Shinobi returns a 2XX but the JSON has `"ok": false`
+    :param ok_if_missing: whether a response object without `ok` is ok (see `ShinobiEnvelope.from_payload`)
+    :return: decoded response
+    :raises HTTPError: if the response has an error status
+    :raises ValueError: if the response is not valid JSON
     """
     shinobi_response.raise_for_status()
-    json_response = shinobi_response.json()
-    if raise_if_json_not_ok and not json_response["ok"]:
-        # Yes, the API returns a 2XX when everything is not ok...
-        message = json_response.get("msg", json_response)
-        raise RuntimeError(message)
+    payload = getattr(shinobi_response, "_shinobi_payload", _NOT_DECODED)
+    if payload is _NOT_DECODED:
+        payload = loads(shinobi_response.content)
+        shinobi_response._shinobi_payload = payload
+    return ShinobiEnvelope.from_payload(payload, ok_if_missing)
 
 
-def wait_and_verify(verifier: Callable[[], bool], *, wait_iterations: int = 10,
-                    iteration_wait_in_milliseconds_multiplier: int = 100):
+def is_not_authorized(shinobi_response: Response) -> bool:
     """
-    Wait to verify an event has happened.
-    :param verifier: callable that returns `True` if the event been waiting upon has been verified
-    :param wait_iterations: number of times to try if state not valid
-    :param iteration_wait_in_milliseconds_multiplier: waiting for `wait_iterations` * `iteration_wait_in_milliseconds_multiplier`
-                                                      between each iteration
-    :return: `True` if the event has been verified, else `False`
+    Determines whether Shinobi rejected the API key used to make the request that got the given response.
+    :param shinobi_response: the response from Shinobi
+    :return: `True` if the API key was rejected
     """
-    for i in range(wait_iterations):
-        if verifier():
-            return True
-        sleep(iteration_wait_in_milliseconds_multiplier * i)
-    return False
+    # Checked before decoding, as almost all responses are not rejections
+    if not shinobi_response.ok or _NOT_AUTHORIZED_MESSAGE.encode() not in shinobi_response.content:
+        return False
+    try:
+        return decode(shinobi_response).is_not_authorized
+    except ValueError:
+        return False
+
+
+def raise_if_errors(shinobi_response: Response, raise_if_json_not_ok: bool = True) -> ShinobiEnvelope:
+    """
+    Raises an exception if the response from Shinobi indicated there were errors.
+    :param shinobi_response: the response from Shinobi
+    :param raise_if_json_not_ok: raise an exception if Shinobi returns a 2XX but the JSON has `"ok": false`
+    :return: decoded response
+    """
+    envelope = decode(shinobi_response)
+    if raise_if_json_not_ok and not envelope.ok:
+        message = envelope.msg if envelope.msg is not None else envelope.payload
+        raise RuntimeError(message)
+    return envelope
 
 
 def generate_random_string(length: int = 8) -> str:
@@ -0,0 +1,144 @@
+import codecs
+import json
+from typing import Iterable, Iterator, Any, Optional
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_DELIMITERS = _WHITESPACE + ",]}"
+
+
+class StreamedJsonArray:
+    """
+    Incrementally parses the elements of a JSON array from a stream of chunks of JSON, so that elements can be used as
+    they arrive and the whole document is never held in memory.
+
+    The array is either the top level value or, if `key` is given, the value of the top level object's member with the
+    given key. If there is no such array, `value` is set to the top level value (excluding any array that was streamed)
+    once iteration has finished.
+    """
+    def __init__(self, chunks: Iterable[bytes], key: Optional[str] = None):
+        """
+        Constructor.
+        :param chunks: chunks of UTF-8 encoded JSON
+        :param key: key of the top level object's member that is the array, `None` if the array is the top level value
+        """
+        self.key = key
+        self.value: Any = None
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._exhausted = False
+
+    def __iter__(self) -> Iterator[Any]:
+        """
+        Iterates the elements of the array, as they are parsed.
+        :raises ValueError: if the stream is not valid JSON
+        """
+        character = self._peek()
+        if character == "[" and self.key is None:
+            yield from self._iter_elements()
+            self._expect_end()
+            return
+        if character != "{" or self.key is None:
+            self.value = self._decode_value()
+            self._expect_end()
+            return
+
+        self._position += 1
+        members = {}
+        while True:
+            character = self._peek()
+            if character == "}":
+                self._position += 1
+                break
+            if character == ",":
+                self._position += 1
+                continue
+            name = self._decode_value()
+            if self._peek() != ":":
+                raise ValueError(f"Expected \":\" after object key: {name}")
+            self._position += 1
+            if name == self.key and self._peek() == "[":
+                yield from self._iter_elements()
+                members = None
+            elif members is not None:
+                members[name] = self._decode_value()
+            else:
+                self._decode_value()
+        self._expect_end()
+        if members is not None:
+            self.value = members
+
+    def _iter_elements(self) -> Iterator[Any]:
+        """
+        Iterates the elements of the array starting at the current position.
+        """
+        self._position += 1
+        while True:
+            character = self._peek()
+            if character == "]":
+                self._position += 1
+                return
+            if character == ",":
+                self._position += 1
+                continue
+            yield self._decode_value()
+
+    def _decode_value(self) -> Any:
+        """
+        Decodes the JSON value starting at the current position (after any whitespace), reading more chunks as needed.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._position)
+                # A number is only complete once followed by a delimiter, as it may continue in the next chunk
+                is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+                if not is_number or self._exhausted \
+                        or (end < len(self._buffer) and self._buffer[end] in _NUMBER_DELIMITERS):
+                    self._position = end
+                    return value
+            except json.JSONDecodeError:
+                if self._exhausted:
+                    raise
+            self._read()
+
+    def _peek(self) -> str:
+        """
+        Skips whitespace, reading more chunks as needed, and gets the character at the current position.
+        :raises ValueError: if the stream ends
+        """
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if self._exhausted:
+                raise ValueError("Unexpected end of JSON")
+            self._read()
+
+    def _expect_end(self):
+        """
+        Checks that nothing but whitespace remains in the stream.
+        """
+        try:
+            character = self._peek()
+        except ValueError:
+            return
+        raise ValueError(f"Unexpected content after JSON: {character}")
+
+    def _read(self):
+        """
+        Reads the next chunk into the buffer, discarding what has already been parsed.
+        """
+        self._buffer = self._buffer[self._position:]
+        self._position = 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._buffer += self._text_decoder.decode(b"", final=True)
+            self._exhausted = True
+        else:
+            self._buffer += self._text_decoder.decode(chunk)
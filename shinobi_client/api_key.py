@@ -1,13 +1,17 @@
 from typing import Dict
 
 from shinobi_client.client import ShinobiClient
+from shinobi_client.deadlines import accepts_deadline
+from shinobi_client.profiling import profiled
 
 
 class ShinobiApiKey:
     """
     API key ORM.
 
-    Not thread safe.
+    `get` accepts a keyword only `deadline` (see `shinobi_client.deadlines`).
+
+    Thread safe.
     """
     def __init__(self, shinobi_client: ShinobiClient):
         """
@@ -16,6 +20,8 @@ class ShinobiApiKey:
         """
         self.shinobi_client = shinobi_client
 
+    @profiled("api_key.get")
+    @accepts_deadline("api_key.get")
     def get(self, email: str, password: str) -> Dict:
         """
         Gets the API key for the user with the given email address and password.
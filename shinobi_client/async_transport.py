@@ -0,0 +1,185 @@
+import asyncio
+from time import perf_counter, monotonic
+from typing import Dict, Optional, Sequence
+
+import aiohttp
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from shinobi_client.deadlines import get_deadline_scope, describe_request, DeadlineScope, ShinobiTimeoutError
+from shinobi_client.transport import DEFAULT_POOL_SIZE, RequestHook
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+class AsyncShinobiTransport:
+    """
+    Pooled, keep-alive asyncio HTTP transport.
+
+    The asyncio equivalent of `ShinobiTransport`. Responses are fully read and returned as `requests.Response` so that
+    they can be handled in the same way as responses from the synchronous transport.
+    """
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, timeout: Optional[float] = None,
+                 headers: Optional[Dict[str, str]] = None, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 hooks: Sequence[RequestHook] = (), flow_control: Optional["ShinobiFlowControl"] = None):
+        """
+        Constructor.
+        :param pool_size: maximum number of connections to keep alive to Shinobi
+        :param timeout: default timeout (in seconds) for each request, `None` for no timeout
+        :param headers: headers to send with every request
+        :param max_concurrency: maximum number of requests that can be in progress at once (further requests wait)
+        :param hooks: called after each request (see `RequestHook`)
+        :param flow_control: optional flow control (concurrency limit, retries and circuit breaker) of requests
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = dict(headers) if headers is not None else {}
+        self.max_concurrency = max_concurrency
+        self.hooks = tuple(hooks)
+        self.flow_control = flow_control
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created lazily as the session must be created within the event loop that it is used in
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size), headers=self.headers)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Makes a request to Shinobi using a pooled connection.
+
+        With flow control, the request waits for the concurrency limit of Shinobi's host and idempotent reads that fail
+        are retried (see `shinobi_client.flow_control`).
+        :param method: HTTP method
+        :param url: URL to request
+        :param kwargs: key word arguments to pass to `aiohttp.ClientSession.request` (`timeout`, in seconds, overrides
+                       the default)
+        :return: response from Shinobi
+        :raises ShinobiTimeoutError: if the deadline of the current deadline scope (see `shinobi_client.deadlines`)
+                                     has passed, or passes while waiting to make the request or during it
+        :raises ShinobiCircuitOpenError: if using flow control and the circuit breaker of Shinobi's host is open
+        """
+        timeout = kwargs.pop("timeout", self.timeout)
+        session = self.session
+        scope = get_deadline_scope()
+        if self.flow_control is None:
+            return await self._request_within_deadline(session, scope, method, url, timeout, kwargs)
+
+        host = self.flow_control.get_host(url)
+        retry_policy = self.flow_control.retry_policy
+        phase = describe_request(method, url)
+        attempt = 0
+        while True:
+            attempt += 1
+            if not await host.async_acquire(scope.bound_timeout(None, phase) if scope is not None else None):
+                raise scope.timeout_error(f"{phase} (waiting to be made)")
+            started_at = monotonic()
+            response, status, error = None, None, None
+            try:
+                try:
+                    response = await self._request_within_deadline(session, scope, method, url, timeout, kwargs)
+                    status = response.status_code
+                except ShinobiTimeoutError:
+                    raise
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = e
+            finally:
+                host.record(started_at, status, error is not None)
+
+            interval = retry_policy.interval(attempt)
+            if not retry_policy.should_retry(method, attempt, status) \
+                    or (scope is not None and scope.remaining <= interval):
+                if error is not None:
+                    raise error
+                return response
+            await asyncio.sleep(interval)
+
+    async def _request_within_deadline(self, session: aiohttp.ClientSession, scope: Optional[DeadlineScope],
+                                       method: str, url: str, timeout: Optional[float],
+                                       kwargs: Dict) -> requests.Response:
+        """
+        Makes a request to Shinobi, once the semaphore allows, with the wait and the request bounded by the time
+        remaining until the deadline (if any).
+        """
+        if scope is None:
+            async with self._semaphore:
+                return await self._request(session, method, url, timeout, kwargs)
+
+        phase = describe_request(method, url)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), scope.bound_timeout(None, phase))
+        except asyncio.TimeoutError as e:
+            raise scope.timeout_error(f"{phase} (waiting to be made)") from e
+        try:
+            bounded_timeout = scope.bound_timeout(timeout, phase)
+            try:
+                return await self._request(session, method, url, bounded_timeout, kwargs)
+            except asyncio.TimeoutError as e:
+                if bounded_timeout != timeout:
+                    raise scope.timeout_error(phase) from e
+                raise
+        finally:
+            self._semaphore.release()
+
+    async def _request(self, session: aiohttp.ClientSession, method: str, url: str, timeout: Optional[float],
+                       kwargs: Dict) -> requests.Response:
+        """
+        Makes a request to Shinobi (once the semaphore has been acquired), calling the request hooks.
+        """
+        converted = None
+        # Timed once a request can be made, so that time spent waiting for the semaphore is not included
+        started_at = perf_counter()
+        try:
+            async with session.request(method, url, timeout=aiohttp.ClientTimeout(total=timeout),
+                                       **kwargs) as response:
+                content = await response.read()
+                converted = AsyncShinobiTransport._to_requests_response(response, content)
+                return converted
+        finally:
+            if len(self.hooks) > 0:
+                elapsed = perf_counter() - started_at
+                for hook in self.hooks:
+                    hook(method, url, converted, elapsed)
+
+    def add_hook(self, hook: RequestHook):
+        """
+        Adds a hook that is called after each request.
+        :param hook: hook to add (see `RequestHook`)
+        """
+        self.hooks = self.hooks + (hook, )
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> requests.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def close(self):
+        """
+        Closes all pooled connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @staticmethod
+    def _to_requests_response(response: aiohttp.ClientResponse, content: bytes) -> requests.Response:
+        """
+        Converts the given aiohttp response into an equivalent `requests` response.
+        :param response: aiohttp response
+        :param content: body of the response
+        :return: equivalent response
+        """
+        converted = requests.Response()
+        converted.status_code = response.status
+        converted.reason = response.reason
+        converted.url = str(response.url)
+        converted.headers = CaseInsensitiveDict(response.headers)
+        converted.encoding = response.charset
+        converted._content = content
+        return converted
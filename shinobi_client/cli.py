@@ -1,6 +1,47 @@
 from shinobi_client.client import ShinobiClient
+from shinobi_client.reconciler import ShinobiReconciler, load_desired_state
+
+
+class ShinobiCli(ShinobiClient):
+    """
+    Shinobi client, with commands to reconcile Shinobi with a desired state file.
+    """
+    def plan(self, desired_state_location: str) -> str:
+        """
+        Plans the changes required to reconcile Shinobi with the given desired state, without making any changes.
+        :param desired_state_location: location of TOML/JSON file describing the desired users and monitors
+        :return: description of the planned changes
+        """
+        return str(ShinobiReconciler(self).plan(load_desired_state(desired_state_location)))
+
+    def drift(self, desired_state_location: str) -> str:
+        """
+        Lists the monitors that have drifted from the given desired state, without making any changes.
+        :param desired_state_location: location of TOML/JSON file describing the desired users and monitors
+        :return: description of the drifted monitors
+        """
+        drifted = ShinobiReconciler(self).check_drift(load_desired_state(desired_state_location))
+        return "\n".join(f"{email}/{monitor_id}" for email, monitor_ids in sorted(drifted.items())
+                         for monitor_id in sorted(monitor_ids)) if drifted else "No drift"
+
+    def apply(self, desired_state_location: str, verify: bool = True) -> str:
+        """
+        Reconciles Shinobi with the given desired state.
+        :param desired_state_location: location of TOML/JSON file describing the desired users and monitors
+        :param verify: wait and verify that changes have been made if `True`
+        :return: description of the changes applied
+        :raises RuntimeError: if any of the changes could not be applied
+        """
+        reconciler = ShinobiReconciler(self)
+        plan = reconciler.plan(load_desired_state(desired_state_location))
+        applied_changes = reconciler.apply(plan, verify=verify)
+        report = "\n".join(str(applied_change) for applied_change in applied_changes) if applied_changes \
+            else "No changes required"
+        if not all(applied_change.succeeded for applied_change in applied_changes):
+            raise RuntimeError(f"Failed to apply all changes:\n{report}")
+        return report
 
 
 if __name__ == "__main__":
     import fire
-    fire.Fire(ShinobiClient)
+    fire.Fire(ShinobiCli)
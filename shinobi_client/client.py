@@ -1,4 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from shinobi_client.flow_control import ShinobiFlowControl
+from shinobi_client.metrics import ShinobiMetrics
+from shinobi_client.orms.credential_cache import ShinobiCredentialCache
+from shinobi_client.orms.monitor_cache import ShinobiMonitorCache, DEFAULT_MONITOR_CACHE_SIZE
+from shinobi_client.orms.user_directory import ShinobiUserDirectory
+from shinobi_client.polling import PollPolicy, PollStatistics
+from shinobi_client.transport import ShinobiTransport, DEFAULT_POOL_SIZE
 
 
 @dataclass
@@ -6,13 +15,41 @@ class ShinobiClient:
     """
     Shinobi client.
 
-    Not thread safe.
+    Thread safe: the client, and the ORMs created from it, can be shared between threads.
     """
     host: str
     port: str
     super_user_token: str = None
     super_user_email: str = None
     super_user_password: str = None
+    pool_size: int = DEFAULT_POOL_SIZE
+    timeout: Optional[float] = None
+    headers: Optional[Dict[str, str]] = None
+    poll_policy: PollPolicy = field(default_factory=PollPolicy)
+    user_directory_ttl: Optional[float] = None
+    credential_cache_ttl: Optional[float] = None
+    credential_cache_location: Optional[str] = None
+    monitor_cache_ttl: Optional[float] = None
+    monitor_cache_size: int = DEFAULT_MONITOR_CACHE_SIZE
+    metrics: Optional[ShinobiMetrics] = field(default=None, repr=False, compare=False)
+    flow_control: Optional[ShinobiFlowControl] = field(default=None, repr=False, compare=False)
+    transport: ShinobiTransport = field(init=False, repr=False, compare=False)
+    poll_statistics: PollStatistics = field(init=False, repr=False, compare=False)
+    user_directory: Optional[ShinobiUserDirectory] = field(init=False, repr=False, compare=False)
+    credential_cache: Optional[ShinobiCredentialCache] = field(init=False, repr=False, compare=False)
+    monitor_cache: Optional[ShinobiMonitorCache] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.poll_statistics = PollStatistics()
+        self.user_directory = ShinobiUserDirectory(self.user_directory_ttl) \
+            if self.user_directory_ttl is not None else None
+        self.credential_cache = ShinobiCredentialCache(self.credential_cache_ttl, self.credential_cache_location) \
+            if self.credential_cache_ttl is not None else None
+        self.monitor_cache = ShinobiMonitorCache(self.monitor_cache_ttl, self.monitor_cache_size) \
+            if self.monitor_cache_ttl is not None else None
+        self.transport = ShinobiTransport(pool_size=self.pool_size, timeout=self.timeout, headers=self.headers,
+                                          hooks=[self.metrics.record_request] if self.metrics is not None else [],
+                                          flow_control=self.flow_control)
 
     @property
     def url(self) -> str:
@@ -31,3 +68,9 @@ class ShinobiClient:
     def monitor(self, email: str, password: str) -> "ShinobiMonitor":
         from shinobi_client.orms.monitor import ShinobiMonitorOrm
         return ShinobiMonitorOrm(self, email, password)
+
+    def close(self):
+        """
+        Closes connections held open to Shinobi.
+        """
+        self.transport.close()
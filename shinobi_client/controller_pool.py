@@ -0,0 +1,183 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Condition
+from time import monotonic
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
+
+from shinobi_client.client import ShinobiClient
+from shinobi_client.orms.monitor import DEFAULT_APPLY_WORKERS
+from shinobi_client.polling import poll
+from shinobi_client.profiling import in_current_context
+
+# Creates a (stopped) controller of a Shinobi installation, which has `start` and `stop` methods
+ControllerFactory = Callable[[], Any]
+
+
+class ShinobiResetError(RuntimeError):
+    """
+    Raised if a Shinobi installation could not be reset to a clean state.
+    """
+
+
+def reset_shinobi(shinobi_client: ShinobiClient, max_workers: int = DEFAULT_APPLY_WORKERS):
+    """
+    Resets a Shinobi installation to a clean state by deleting all users, along with their monitors, through the API.
+
+    Requires super user credentials.
+    :param shinobi_client: client connected to the Shinobi installation
+    :param max_workers: maximum number of users to delete concurrently
+    :raises ShinobiResetError: if users remain after the reset
+    """
+    user_orm = shinobi_client.user
+    users = user_orm.get_all()
+    if len(users) > 0:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Consumed to raise any errors
+            list(executor.map(in_current_context(
+                lambda user: user_orm.delete(user["mail"], verify=False, delete_monitors=True)), users))
+    if not poll(user_orm.get_all, lambda users: len(users) == 0, policy=shinobi_client.poll_policy,
+                statistics=shinobi_client.poll_statistics).converged:
+        raise ShinobiResetError("Users remain after deleting all users")
+
+
+def create_shinobi_controller() -> Any:
+    """
+    Creates a controller of Shinobi running in Docker.
+    """
+    # Imported when required, as Docker is an optional dependency
+    from shinobi_client.shinobi_controller import ShinobiController
+    return ShinobiController()
+
+
+class ShinobiControllerPool:
+    """
+    Pool of warm (running) Shinobi installations, which are leased out and reset to a clean state when returned (see
+    `reset_shinobi`), rather than being restarted.
+
+    Installations are started on demand, up to the pool's size. Pools belong to a process, so under pytest-xdist each
+    worker has its own pool and the number of installations scales with the number of workers.
+
+    Thread safe.
+    """
+    def __init__(self, size: int = 1, controller_factory: ControllerFactory = create_shinobi_controller,
+                 reset: Callable[[ShinobiClient], None] = reset_shinobi):
+        """
+        Constructor.
+        :param size: maximum number of installations to run
+        :param controller_factory: creates a controller of an installation (defaults to `ShinobiController`)
+        :param reset: resets a leased installation to a clean state
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1: {size}")
+        self.size = size
+        self.controller_factory = controller_factory
+        self.reset = reset
+        # Notified when an installation becomes idle, a slot to start one frees up or the pool is closed
+        self._available = Condition()
+        self._idle: "deque[Tuple[Any, ShinobiClient]]" = deque()
+        self._controllers: List[Any] = []
+        self._leased: Dict[int, Tuple[Any, ShinobiClient]] = {}
+        self._closed = False
+
+    def acquire(self, timeout: Optional[float] = None) -> ShinobiClient:
+        """
+        Leases an installation, starting one if none are idle and the pool is not full.
+        :param timeout: seconds to wait for an installation to become idle (forever if `None`)
+        :return: client connected to the leased installation
+        :raises TimeoutError: if no installation became idle in time
+        :raises RuntimeError: if the pool is closed (including whilst waiting)
+        """
+        expires_at = monotonic() + timeout if timeout is not None else None
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pool is closed")
+                if len(self._idle) > 0:
+                    leased = self._idle.popleft()
+                    self._leased[id(leased[1])] = leased
+                    return leased[1]
+                if len(self._controllers) < self.size:
+                    controller = self.controller_factory()
+                    self._controllers.append(controller)
+                    break
+                remaining = expires_at - monotonic() if expires_at is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No Shinobi installation became idle within {timeout}s")
+                self._available.wait(remaining)
+
+        try:
+            shinobi_client = controller.start()
+        except BaseException:
+            with self._available:
+                self._controllers.remove(controller)
+                self._available.notify()
+            raise
+        with self._available:
+            self._leased[id(shinobi_client)] = (controller, shinobi_client)
+        return shinobi_client
+
+    def release(self, shinobi_client: ShinobiClient):
+        """
+        Returns a leased installation, resetting it to a clean state. An installation that cannot be reset is stopped.
+        :param shinobi_client: client given when the installation was leased
+        :raises ShinobiResetError: if the installation could not be reset
+        """
+        with self._available:
+            controller, _ = self._leased.pop(id(shinobi_client))
+        try:
+            self.reset(shinobi_client)
+        except BaseException:
+            self._discard(controller, shinobi_client)
+            raise
+        with self._available:
+            if self._closed:
+                discard = True
+            else:
+                discard = False
+                self._idle.append((controller, shinobi_client))
+                self._available.notify()
+        if discard:
+            self._discard(controller, shinobi_client)
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[ShinobiClient]:
+        """
+        Leases an installation for the duration of a `with` statement.
+        :param timeout: seconds to wait for an installation to become idle (forever if `None`)
+        :return: client connected to the leased installation
+        """
+        shinobi_client = self.acquire(timeout)
+        try:
+            yield shinobi_client
+        finally:
+            self.release(shinobi_client)
+
+    def close(self):
+        """
+        Stops all idle installations. Leased installations are stopped when released.
+        """
+        with self._available:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._available.notify_all()
+        for controller, shinobi_client in idle:
+            self._discard(controller, shinobi_client)
+
+    def __enter__(self) -> "ShinobiControllerPool":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _discard(self, controller: Any, shinobi_client: ShinobiClient):
+        """
+        Stops and forgets the given installation.
+        """
+        with self._available:
+            if controller in self._controllers:
+                self._controllers.remove(controller)
+                self._available.notify()
+        shinobi_client.close()
+        controller.stop()
@@ -0,0 +1,165 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from functools import wraps
+from time import monotonic
+from typing import Optional, Callable, TypeVar, Iterator
+
+from shinobi_client.metrics import get_endpoint_template
+
+F = TypeVar("F", bound=Callable)
+
+
+@dataclass
+class ShinobiTimeoutError(TimeoutError):
+    """
+    Raised if an operation does not complete before its deadline.
+
+    `phase` is the phase of the operation that used up what remained of the deadline: a request (e.g.
+    `GET monitor/{ke}/{mid}`) or polling for a change to be verified.
+    """
+    operation: str
+    phase: str
+    deadline: float
+
+    def __str__(self) -> str:
+        return f"{self.operation} did not complete within its deadline of {self.deadline}s (timed out in: {self.phase})"
+
+
+@dataclass(frozen=True)
+class DeadlineScope:
+    """
+    Deadline that applies to the operation in progress (and the operations that it calls).
+    """
+    operation: str
+    expires_at: float
+    deadline: float
+    phase: Optional[str] = None
+
+    @property
+    def remaining(self) -> float:
+        """
+        Seconds until the deadline (negative if it has passed).
+        """
+        return self.expires_at - monotonic()
+
+    def bound_timeout(self, timeout: Optional[float], phase: str) -> float:
+        """
+        Bounds the timeout of a step of the operation by the time remaining until the deadline.
+        :param timeout: timeout of the step (`None` for no timeout)
+        :param phase: phase of the operation that the step is in, reported if the deadline has passed
+        :return: bounded timeout
+        :raises ShinobiTimeoutError: if the deadline has passed
+        """
+        remaining = self.remaining
+        if remaining <= 0:
+            raise self.timeout_error(phase)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def timeout_error(self, phase: str) -> ShinobiTimeoutError:
+        """
+        Creates the error raised when the deadline passes in the given phase.
+        :param phase: phase in which the deadline passed
+        :return: the error
+        """
+        return ShinobiTimeoutError(self.operation, phase if self.phase is None else f"{self.phase} ({phase})",
+                                   self.deadline)
+
+
+_current: ContextVar[Optional[DeadlineScope]] = ContextVar("shinobi_client_deadline", default=None)
+
+
+def get_deadline_scope() -> Optional[DeadlineScope]:
+    """
+    Gets the deadline of the operation in progress in the current context.
+    :return: deadline scope else `None` if there is no deadline
+    """
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float], operation: str = "operation") -> Iterator[Optional[DeadlineScope]]:
+    """
+    Bounds the ORM operations made within a `with` statement (in the current context and contexts created from it) by
+    a deadline, which is shared by all of the operations. Each request is given the time remaining as its timeout and
+    verification stops polling when the deadline passes. An enclosing deadline that expires sooner still applies.
+    :param deadline: seconds that the operations can take (`None` to only apply any enclosing deadline)
+    :param operation: name of the operation, reported if the deadline passes
+    :return: the deadline scope (`None` if there is no deadline)
+    """
+    parent = _current.get()
+    if deadline is None and parent is None:
+        yield None
+        return
+    if deadline is not None and deadline <= 0:
+        raise ValueError(f"Deadline must be positive: {deadline}")
+    expires_at = monotonic() + deadline if deadline is not None else parent.expires_at
+    if parent is not None and parent.expires_at <= expires_at:
+        # The sooner, enclosing deadline applies
+        scope = DeadlineScope(operation, parent.expires_at, parent.deadline)
+    else:
+        scope = DeadlineScope(operation, expires_at, deadline)
+    token = _current.set(scope)
+    try:
+        yield scope
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def deadline_phase(phase: str) -> Iterator[None]:
+    """
+    Marks the steps made within a `with` statement as being in the given phase of the operation in progress (e.g.
+    verification), which is reported if the deadline passes. Does nothing if there is no deadline.
+    :param phase: name of the phase
+    """
+    scope = _current.get()
+    if scope is None:
+        yield
+        return
+    token = _current.set(replace(scope, phase=phase))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def accepts_deadline(operation: str) -> Callable[[F], F]:
+    """
+    Decorates an ORM method (or coroutine method) so that it accepts a keyword only `deadline` argument: the number of
+    seconds that the operation can take, in total (see `deadline_scope`).
+    :param operation: name of the operation, e.g. `monitor.create`
+    :return: decorator
+    """
+    def decorator(function: F) -> F:
+        if asyncio.iscoroutinefunction(function):
+            @wraps(function)
+            async def async_wrapper(*args, deadline: Optional[float] = None, **kwargs):
+                if deadline is None and _current.get() is None:
+                    return await function(*args, **kwargs)
+                with deadline_scope(deadline, operation):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, deadline: Optional[float] = None, **kwargs):
+            if deadline is None and _current.get() is None:
+                return function(*args, **kwargs)
+            with deadline_scope(deadline, operation):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def describe_request(method: str, url: str) -> str:
+    """
+    Describes a request as a phase of an operation, without any credentials in its URL.
+    :param method: HTTP method
+    :param url: URL requested
+    :return: description, e.g. `GET monitor/{ke}/{mid}`
+    """
+    return f"{method} {get_endpoint_template(url)}"
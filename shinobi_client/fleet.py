@@ -0,0 +1,275 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from time import monotonic
+from typing import Dict, Optional, Callable, TypeVar, Generic, Iterable, Tuple, Any, List
+
+from shinobi_client.client import ShinobiClient
+from shinobi_client.deadlines import accepts_deadline
+from shinobi_client.orms.monitor import ShinobiMonitorOrm, MonitorApplyResult
+from shinobi_client.orms.monitor_record import ShinobiMonitor
+from shinobi_client.profiling import profiled, in_current_context
+
+T = TypeVar("T")
+
+DEFAULT_FLEET_WORKERS = 32
+
+
+@dataclass(frozen=True)
+class FleetHost:
+    """
+    Shinobi host in a fleet, with the credentials used to manage it.
+
+    `name` labels the host's results.
+    """
+    name: str
+    host: str
+    port: str
+    super_user_token: str = None
+    super_user_email: str = None
+    super_user_password: str = None
+
+
+@dataclass(frozen=True)
+class FleetItem(Generic[T]):
+    """
+    Item (e.g. a user or monitor) from a host in a fleet, labelled with the host's name.
+    """
+    host: str
+    value: T
+
+
+@dataclass(frozen=True)
+class HostResult(Generic[T]):
+    """
+    Result of running an operation on a host in a fleet.
+
+    `error` is the error raised by the operation if it failed.
+    """
+    host: str
+    value: Optional[T] = None
+    error: Optional[Exception] = None
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+class ShinobiFleetError(RuntimeError):
+    """
+    Raised if an operation failed on one or more hosts in a fleet.
+    """
+    def __init__(self, errors: Dict[str, Exception]):
+        """
+        Constructor.
+        :param errors: error raised by the operation, keyed by the name of the host it failed on
+        """
+        super().__init__(f"Operation failed on {len(errors)} host{'' if len(errors) == 1 else 's'}: "
+                         + ", ".join(f"{host} ({type(error).__name__}: {error})" for host, error in errors.items()))
+        self.errors = errors
+
+
+@dataclass(frozen=True)
+class FleetResult(Generic[T]):
+    """
+    Result of running an operation on the hosts in a fleet, which may have failed on some of them (partial result).
+    """
+    results: Dict[str, HostResult[T]]
+    elapsed: float
+
+    @property
+    def succeeded(self) -> bool:
+        return all(result.succeeded for result in self.results.values())
+
+    @property
+    def values(self) -> Dict[str, T]:
+        """
+        Values returned by the operation, keyed by the name of the host, for the hosts it succeeded on.
+        """
+        return {host: result.value for host, result in self.results.items() if result.succeeded}
+
+    @property
+    def errors(self) -> Dict[str, Exception]:
+        """
+        Errors raised by the operation, keyed by the name of the host, for the hosts it failed on.
+        """
+        return {host: result.error for host, result in self.results.items() if not result.succeeded}
+
+    def merge(self) -> Tuple[FleetItem, ...]:
+        """
+        Merges the collections (e.g. of users) returned by the operation on each host it succeeded on.
+        :return: the items from all the hosts, each labelled with its host, in the order of the hosts in the fleet
+        """
+        return tuple(FleetItem(host, item) for host, value in self.values.items() for item in value)
+
+    def raise_for_errors(self):
+        """
+        Raises if the operation failed on any host.
+        :raises ShinobiFleetError: if the operation failed on one or more hosts
+        """
+        errors = self.errors
+        if len(errors) > 0:
+            raise ShinobiFleetError(errors)
+
+
+class ShinobiFleet:
+    """
+    Fleet of Shinobi hosts, on which user and monitor operations are run concurrently, so that an operation on the
+    whole fleet takes about as long as it takes on the slowest host.
+
+    Failure on a host does not stop an operation from running on the others: results are partial, with the error from
+    each host that failed (see `FleetResult`). Operations accept a keyword only `deadline` (see
+    `shinobi_client.deadlines`) which, if given, bounds the operation on every host.
+
+    Thread safe.
+    """
+    @staticmethod
+    def from_hosts(hosts: Iterable[FleetHost], max_workers: int = DEFAULT_FLEET_WORKERS,
+                   **client_options: Any) -> "ShinobiFleet":
+        """
+        Creates a fleet of the given hosts.
+        :param hosts: hosts in the fleet
+        :param max_workers: maximum number of hosts to run an operation on concurrently
+        :param client_options: options of the client of each host (see `ShinobiClient`), e.g. `timeout` or
+                               `flow_control`
+        :return: the fleet
+        """
+        return ShinobiFleet({
+            host.name: ShinobiClient(host.host, host.port, super_user_token=host.super_user_token,
+                                     super_user_email=host.super_user_email,
+                                     super_user_password=host.super_user_password, **client_options)
+            for host in ShinobiFleet._check_unique_names(hosts)}, max_workers=max_workers)
+
+    @staticmethod
+    def _check_unique_names(hosts: Iterable[FleetHost]) -> List[FleetHost]:
+        """
+        Checks that the names of the given hosts are unique.
+        :raises ValueError: if more than one host has the same name
+        """
+        hosts = list(hosts)
+        names = [host.name for host in hosts]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if len(duplicates) > 0:
+            raise ValueError(f"Hosts must have unique names: {duplicates}")
+        return hosts
+
+    def __init__(self, clients: Dict[str, ShinobiClient], max_workers: int = DEFAULT_FLEET_WORKERS):
+        """
+        Constructor.
+        :param clients: client connected to each host, keyed by the host's name
+        :param max_workers: maximum number of hosts to run an operation on concurrently
+        """
+        self.clients = dict(clients)
+        self.max_workers = max_workers
+
+    @property
+    def hosts(self) -> Tuple[str, ...]:
+        return tuple(self.clients.keys())
+
+    @profiled("fleet.run")
+    @accepts_deadline("fleet.run")
+    def run(self, operation: Callable[[ShinobiClient], T], hosts: Optional[Iterable[str]] = None) -> FleetResult[T]:
+        """
+        Runs the given operation on the hosts in the fleet concurrently.
+        :param operation: operation to run, given the client connected to a host
+        :param hosts: names of the hosts to run the operation on (all hosts if `None`)
+        :return: result of the operation on each host, in the order of the hosts in the fleet
+        :raises KeyError: if a host is not in the fleet
+        """
+        if hosts is None:
+            clients = self.clients
+        else:
+            hosts = set(hosts)
+            unknown_hosts = hosts - self.clients.keys()
+            if len(unknown_hosts) > 0:
+                raise KeyError(f"Hosts not in the fleet: {sorted(unknown_hosts)}")
+            clients = {host: client for host, client in self.clients.items() if host in hosts}
+
+        def run_on_host(host: str) -> HostResult[T]:
+            started_at = monotonic()
+            try:
+                return HostResult(host, value=operation(clients[host]), elapsed=monotonic() - started_at)
+            except Exception as e:
+                return HostResult(host, error=e, elapsed=monotonic() - started_at)
+
+        if len(clients) == 0:
+            return FleetResult({}, 0.0)
+        started_at = monotonic()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(clients))) as executor:
+            results = list(executor.map(in_current_context(run_on_host), clients))
+        return FleetResult({result.host: result for result in results}, monotonic() - started_at)
+
+    @profiled("fleet.get_all_users")
+    @accepts_deadline("fleet.get_all_users")
+    def get_all_users(self) -> FleetResult[Tuple[Dict, ...]]:
+        """
+        Gets details about all users on every host. Use `merge` on the result to get the users labelled by host.
+        :return: users on each host
+        """
+        return self.run(lambda shinobi_client: shinobi_client.user.get_all())
+
+    @profiled("fleet.create_user")
+    @accepts_deadline("fleet.create_user")
+    def create_user(self, email: str, password: str, verify: bool = True) -> FleetResult[Dict]:
+        """
+        Creates a user with the given email address and password on every host.
+        :param email: user's email address
+        :param password: user's password
+        :param verify: wait and verify that the user has been created on each host if `True`
+        :return: details about the user created on each host
+        """
+        return self.run(lambda shinobi_client: shinobi_client.user.create(email, password, verify=verify))
+
+    @profiled("fleet.delete_user")
+    @accepts_deadline("fleet.delete_user")
+    def delete_user(self, email: str, verify: bool = True, delete_monitors: bool = False) -> FleetResult[bool]:
+        """
+        Deletes the user with the given email address from every host.
+        :param email: user's email address
+        :param verify: wait and verify that the user has been deleted from each host if `True`
+        :param delete_monitors: also deletes the user's monitors (and their videos and events) if `True`
+        :return: whether the user was deleted from each host
+        """
+        return self.run(lambda shinobi_client: shinobi_client.user.delete(
+            email, verify=verify, delete_monitors=delete_monitors))
+
+    @profiled("fleet.get_all_monitors")
+    @accepts_deadline("fleet.get_all_monitors")
+    def get_all_monitors(self, email: str, password: str) -> FleetResult[Tuple[ShinobiMonitor, ...]]:
+        """
+        Gets all of the monitors of the user with the given email address on every host. Use `merge` on the result to
+        get the monitors labelled by host.
+        :param email: user's email address
+        :param password: user's password
+        :return: the user's monitors on each host
+        """
+        return self.run(lambda shinobi_client: ShinobiMonitorOrm(shinobi_client, email, password).get_all())
+
+    @profiled("fleet.apply_monitors")
+    @accepts_deadline("fleet.apply_monitors")
+    def apply_monitors(self, email: str, password: str, configurations: Dict[str, Dict],
+                       verify: bool = True) -> FleetResult[Dict[str, MonitorApplyResult]]:
+        """
+        Applies the given monitor configurations to the monitors of the user with the given email address on every
+        host (see `ShinobiMonitorOrm.apply_many`).
+        :param email: user's email address
+        :param password: user's password
+        :param configurations: map of monitor ID to the monitor's configuration
+        :param verify: wait and verify that the monitors have been created/modified on each host if `True`
+        :return: result of applying each monitor's configuration on each host
+        """
+        return self.run(lambda shinobi_client: ShinobiMonitorOrm(shinobi_client, email, password).apply_many(
+            configurations, verify=verify))
+
+    def close(self):
+        """
+        Closes connections held open to the hosts in the fleet.
+        """
+        for shinobi_client in self.clients.values():
+            shinobi_client.close()
+
+    def __enter__(self) -> "ShinobiFleet":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,403 @@
+import asyncio
+import random
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock, Event
+from time import monotonic
+from typing import Optional, Callable, Deque, Dict, Tuple, Any
+from urllib.parse import urlsplit
+
+from shinobi_client.transport import DEFAULT_POOL_SIZE
+
+# States of a circuit breaker
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half-open"
+
+
+@dataclass
+class ShinobiCircuitOpenError(ConnectionError):
+    """
+    Raised, without making a request, if the circuit breaker of the Shinobi host requested is open, as recent requests
+    to the host have failed.
+    """
+    host: str
+    retry_after: float
+
+    def __str__(self) -> str:
+        return f"Circuit breaker for Shinobi host {self.host} is open (retry after {self.retry_after:.1f}s)"
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Policy that determines which requests are retried, how many times and how long to wait between attempts.
+
+    Only idempotent reads (requests with one of `methods`) are retried: if they fail without a response (e.g. the
+    connection is dropped) or get a response with one of `statuses`. The interval between attempts starts at
+    `initial_interval` and is multiplied by `multiplier` after each attempt, up to `max_interval`, randomly varied by up
+    to `jitter`.
+    """
+    max_attempts: int = 3
+    initial_interval: float = 0.05
+    max_interval: float = 1.0
+    multiplier: float = 2.0
+    jitter: float = 0.2
+    methods: Tuple[str, ...] = ("GET", "HEAD")
+    statuses: Tuple[int, ...] = (500, 502, 503, 504)
+
+    def should_retry(self, method: str, attempt: int, status: Optional[int]) -> bool:
+        """
+        Gets whether to retry a request.
+        :param method: HTTP method of the request
+        :param attempt: number of the attempt that has just been made (starting at 1)
+        :param status: status of the response else `None` if the attempt failed without a response
+        :return: `True` if the request should be retried
+        """
+        return attempt < self.max_attempts and method in self.methods and (status is None or status in self.statuses)
+
+    def interval(self, attempt: int) -> float:
+        """
+        Gets the interval to wait after the given attempt.
+        :param attempt: number of the attempt that has just been made (starting at 1)
+        :return: interval in seconds
+        """
+        interval = min(self.initial_interval * self.multiplier ** (attempt - 1), self.max_interval)
+        return max(0.0, interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+class _Waiter:
+    """
+    Request waiting for the limiter to allow it to be made.
+    """
+    __slots__ = ("wake", "allowed")
+
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.allowed = False
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the number of requests in progress at once, adapting the limit to how the server copes (additive increase,
+    multiplicative decrease).
+
+    The limit grows by one for each limit's worth of successful requests. It is multiplied by `backoff_ratio` when a
+    request fails as the server is overloaded (e.g. a 5xx response) or takes more than `latency_tolerance` times the
+    lowest latency seen (and more than `latency_threshold`). Only requests that started after the limit was last
+    decreased can decrease it again, so that a burst of failures only decreases it once.
+
+    Waiting requests are allowed in the order that they started waiting. Thread safe and usable from any event loop.
+    """
+    def __init__(self, initial_limit: int = DEFAULT_POOL_SIZE, min_limit: int = 1, max_limit: int = 100,
+                 backoff_ratio: float = 0.5, latency_tolerance: float = 2.0, latency_threshold: float = 0.05):
+        """
+        Constructor.
+        :param initial_limit: number of requests allowed in progress at once to start with
+        :param min_limit: lowest that the limit can be decreased to
+        :param max_limit: highest that the limit can be increased to
+        :param backoff_ratio: ratio that the limit is multiplied by when decreased
+        :param latency_tolerance: multiple of the lowest latency seen above which a request is taken as a sign that the
+                                  server is overloaded
+        :param latency_threshold: latency (in seconds) below which a request is never taken as a sign that the server is
+                                  overloaded
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(f"Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit: "
+                             f"{min_limit}, {initial_limit}, {max_limit}")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_tolerance = latency_tolerance
+        self.latency_threshold = latency_threshold
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._lowest_latency: Optional[float] = None
+        self._decreased_at = float("-inf")
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until a request is allowed to be made.
+        :param timeout: seconds to wait (forever if `None`)
+        :return: `True` if the request is allowed else `False` if it was not allowed in time
+        """
+        event = Event()
+        waiter = self._wait(event.set)
+        if waiter is None:
+            return True
+        event.wait(timeout)
+        return self._stop_waiting(waiter)
+
+    async def async_acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits, without blocking the event loop, until a request is allowed to be made.
+        :param timeout: seconds to wait (forever if `None`)
+        :return: `True` if the request is allowed else `False` if it was not allowed in time
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def set_result():
+            if not future.done():
+                future.set_result(None)
+
+        waiter = self._wait(lambda: loop.call_soon_threadsafe(set_result))
+        if waiter is None:
+            return True
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # e.g. cancelled
+            if self._stop_waiting(waiter):
+                self.release(monotonic(), None)
+            raise
+        return self._stop_waiting(waiter)
+
+    def release(self, started_at: float, overloaded: Optional[bool]):
+        """
+        Releases an allowed request once it is complete, adapting the limit.
+        :param started_at: time (`time.monotonic`) that the request started
+        :param overloaded: `True` if the request failed as the server is overloaded, `False` if it succeeded and `None`
+                           if its outcome says nothing about the server (e.g. the request was cancelled)
+        """
+        latency = monotonic() - started_at
+        with self._lock:
+            self._in_flight -= 1
+            if overloaded is not None:
+                if not overloaded:
+                    if self._lowest_latency is None or latency < self._lowest_latency:
+                        self._lowest_latency = latency
+                    overloaded = latency > self.latency_threshold \
+                        and latency > self.latency_tolerance * self._lowest_latency
+                if overloaded:
+                    if started_at >= self._decreased_at:
+                        self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+                        self._decreased_at = monotonic()
+                else:
+                    self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self._allow_waiters()
+
+    def _wait(self, wake: Callable[[], None]) -> Optional[_Waiter]:
+        """
+        Allows a request if the limit has not been reached, else queues it to wait.
+        :return: the waiter if the request must wait else `None` if it is allowed
+        """
+        with self._lock:
+            if len(self._waiters) == 0 and self._in_flight < int(self._limit):
+                self._in_flight += 1
+                return None
+            waiter = _Waiter(wake)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _stop_waiting(self, waiter: _Waiter) -> bool:
+        """
+        Stops waiting, forgetting the waiter if it was not allowed.
+        :return: whether the waiter was allowed
+        """
+        with self._lock:
+            if not waiter.allowed:
+                self._waiters.remove(waiter)
+            return waiter.allowed
+
+    def _allow_waiters(self):
+        """
+        Allows waiting requests up to the limit. Must be called with the lock held.
+        """
+        while len(self._waiters) > 0 and self._in_flight < int(self._limit):
+            waiter = self._waiters.popleft()
+            waiter.allowed = True
+            self._in_flight += 1
+            waiter.wake()
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a Shinobi host, which fails requests fast while the host is failing.
+
+    Opens after `failure_threshold` consecutive requests fail as the host is overloaded or down. Once open, requests
+    fail without being made until `reset_timeout` seconds have passed, then a single trial request is allowed
+    (half-open): the circuit closes if it succeeds, else opens again.
+
+    Thread safe.
+    """
+    def __init__(self, host: str, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        """
+        Constructor.
+        :param host: host that the circuit breaker is for
+        :param failure_threshold: number of consecutive failures that opens the circuit
+        :param reset_timeout: seconds that the circuit stays open before a trial request is allowed
+        """
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == CIRCUIT_OPEN and monotonic() - self._opened_at >= self.reset_timeout:
+                return CIRCUIT_HALF_OPEN
+            return self._state
+
+    def check(self):
+        """
+        Checks that a request can be made.
+        :raises ShinobiCircuitOpenError: if the circuit is open (or a half-open trial request is in progress)
+        """
+        with self._lock:
+            if self._state == CIRCUIT_CLOSED:
+                return
+            retry_after = self._opened_at + self.reset_timeout - monotonic()
+            if self._state == CIRCUIT_OPEN and retry_after <= 0:
+                self._state = CIRCUIT_HALF_OPEN
+            if self._state == CIRCUIT_HALF_OPEN and not self._trial_in_progress:
+                self._trial_in_progress = True
+                return
+            raise ShinobiCircuitOpenError(self.host, max(retry_after, 0.0))
+
+    def record(self, failed: Optional[bool]):
+        """
+        Records the outcome of a request that was allowed by `check`.
+        :param failed: `True` if the request failed as the host is overloaded or down, `False` if it succeeded and
+                       `None` if its outcome says nothing about the host
+        """
+        with self._lock:
+            trial, self._trial_in_progress = self._trial_in_progress, False
+            if failed is None:
+                return
+            if not failed:
+                self._failures = 0
+                self._state = CIRCUIT_CLOSED
+                return
+            self._failures += 1
+            if (trial and self._state == CIRCUIT_HALF_OPEN) or self._failures >= self.failure_threshold:
+                self._state = CIRCUIT_OPEN
+                self._opened_at = monotonic()
+
+
+@dataclass
+class HostFlowControl:
+    """
+    Flow control of the requests made to a Shinobi host.
+    """
+    host: str
+    limiter: AdaptiveConcurrencyLimiter
+    circuit_breaker: CircuitBreaker
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Blocks until a request to the host is allowed to be made.
+        :param timeout: seconds to wait (forever if `None`)
+        :return: `True` if the request is allowed else `False` if it was not allowed in time
+        :raises ShinobiCircuitOpenError: if the host's circuit breaker is open
+        """
+        self.circuit_breaker.check()
+        if self.limiter.acquire(timeout):
+            return True
+        self.circuit_breaker.record(None)
+        return False
+
+    async def async_acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits, without blocking the event loop, until a request to the host is allowed to be made.
+        :param timeout: seconds to wait (forever if `None`)
+        :return: `True` if the request is allowed else `False` if it was not allowed in time
+        :raises ShinobiCircuitOpenError: if the host's circuit breaker is open
+        """
+        self.circuit_breaker.check()
+        try:
+            allowed = await self.limiter.async_acquire(timeout)
+        except BaseException:
+            self.circuit_breaker.record(None)
+            raise
+        if not allowed:
+            self.circuit_breaker.record(None)
+        return allowed
+
+    def record(self, started_at: float, status: Optional[int], failed_without_response: bool = False):
+        """
+        Records the outcome of a request, releasing it from the limiter. The outcome is that of the HTTP response only
+        (an `"ok": false` response body is not seen).
+        :param started_at: time (`time.monotonic`) that the request started
+        :param status: status of the response else `None` if there was no response
+        :param failed_without_response: whether the request failed without a response as the host is overloaded or
+                                        down (e.g. the connection was refused or timed out), rather than being cancelled
+        """
+        overloaded = status >= 500 if status is not None else (True if failed_without_response else None)
+        self.limiter.release(started_at, overloaded)
+        self.circuit_breaker.record(overloaded)
+
+
+class ShinobiFlowControl:
+    """
+    Flow control of the requests that clients make to Shinobi, to keep each Shinobi host near its best throughput
+    without pushing it into failure. Each host has its own adaptive concurrency limit (see
+    `AdaptiveConcurrencyLimiter`) and circuit breaker (see `CircuitBreaker`), and idempotent reads are retried with
+    backoff (see `RetryPolicy`).
+
+    Only the HTTP outcome of a request is seen: 5xx responses and requests that fail without a response count as the
+    host being overloaded. Responses that Shinobi rejects in their body (`"ok": false`, with an HTTP 200 status), such
+    as a wrong password or an invalid monitor configuration, are errors of the request rather than of the host, so
+    count as successful and are not retried.
+
+    Can be shared between many clients (sync and async). Thread safe.
+    """
+    def __init__(self, retry_policy: RetryPolicy = RetryPolicy(),
+                 limiter_factory: Callable[[], AdaptiveConcurrencyLimiter] = AdaptiveConcurrencyLimiter,
+                 circuit_breaker_factory: Callable[[str], CircuitBreaker] = CircuitBreaker):
+        """
+        Constructor.
+        :param retry_policy: policy for retrying requests (`RetryPolicy(max_attempts=1)` to never retry)
+        :param limiter_factory: creates the concurrency limiter of a host
+        :param circuit_breaker_factory: creates the circuit breaker of the given host
+        """
+        self.retry_policy = retry_policy
+        self.limiter_factory = limiter_factory
+        self.circuit_breaker_factory = circuit_breaker_factory
+        self._hosts: Dict[str, HostFlowControl] = {}
+        self._lock = Lock()
+
+    def get_host(self, url: str) -> HostFlowControl:
+        """
+        Gets the flow control of the host of the given URL.
+        :param url: URL requested
+        :return: flow control of the URL's host
+        """
+        host = urlsplit(url).netloc
+        host_flow_control = self._hosts.get(host)
+        if host_flow_control is None:
+            with self._lock:
+                host_flow_control = self._hosts.get(host)
+                if host_flow_control is None:
+                    host_flow_control = HostFlowControl(
+                        host, self.limiter_factory(), self.circuit_breaker_factory(host))
+                    self._hosts[host] = host_flow_control
+        return host_flow_control
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Gets a snapshot of the flow control of each host.
+        :return: concurrency limit, requests in progress and circuit state, keyed by host
+        """
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: dict(limit=flow_control.limiter.limit, in_flight=flow_control.limiter.in_flight,
+                           circuit=flow_control.circuit_breaker.state)
+                for host, flow_control in sorted(hosts.items())}
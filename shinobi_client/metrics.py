@@ -0,0 +1,221 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, Optional, Tuple, List, Iterable
+from urllib.parse import urlsplit
+
+from requests import Response
+
+from shinobi_client._common import decode
+
+# Upper bounds (in seconds) of the buckets of the request latency histograms
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Status recorded for requests that failed without a response (e.g. the connection was refused)
+NO_RESPONSE_STATUS = "none"
+
+# Endpoint template of URLs that do not match any of Shinobi's endpoints
+_OTHER_ENDPOINT = "other"
+
+
+def get_endpoint_template(url: str) -> str:
+    """
+    Gets the template of the Shinobi endpoint that the given URL is for, with the values that vary between requests
+    (e.g. API keys, group keys and monitor IDs) replaced by placeholders, so that metrics have a bounded number of
+    endpoints and never contain credentials.
+
+    Deliberately not cached, as the URLs contain credentials.
+    :param url: URL requested
+    :return: endpoint template, e.g. `configureMonitor/{ke}/{mid}` or `super/accounts/list`
+    """
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+    if len(segments) == 0:
+        # Posted to when logging in
+        return "/"
+    if segments[0] == "super":
+        # e.g. /super/{token}/accounts/list
+        return "/".join(["super"] + segments[2:4]) if len(segments) >= 3 else _OTHER_ENDPOINT
+    if len(segments) < 2:
+        return _OTHER_ENDPOINT
+    # e.g. /{api_key}/configureMonitor/{ke}/{mid}/delete
+    action, parameters = segments[1], segments[2:]
+    template = [action] + ["{ke}", "{mid}"][:len(parameters)] + parameters[2:3]
+    return "/".join(template) if len(parameters) <= 3 else _OTHER_ENDPOINT
+
+
+class _EndpointMetrics:
+    """
+    Metrics of the requests made to an endpoint, with a method.
+    """
+    __slots__ = ("statuses", "not_ok", "request_bytes", "response_bytes", "latency_buckets", "latency_sum")
+
+    def __init__(self, buckets: int):
+        self.statuses: Dict[str, int] = {}
+        self.not_ok = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        # Count of latencies in each bucket (not cumulative), with a final bucket for latencies above all bounds
+        self.latency_buckets = [0] * (buckets + 1)
+        self.latency_sum = 0.0
+
+
+class ShinobiMetrics:
+    """
+    Metrics of the requests made to Shinobi: request counts and latency histograms (keyed by endpoint template and
+    method), status code counts, `"ok": false` response counts and bytes transferred.
+
+    Can be shared between many clients. Thread safe.
+    """
+    def __init__(self, latency_buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS, namespace: str = "shinobi_client"):
+        """
+        Constructor.
+        :param latency_buckets: upper bounds (in seconds) of the buckets of the latency histograms
+        :param namespace: prefix of the names of the metrics when exported
+        """
+        self.latency_buckets = tuple(sorted(latency_buckets))
+        self.namespace = namespace
+        self._lock = Lock()
+        self._endpoints: Dict[Tuple[str, str], _EndpointMetrics] = {}
+
+    def record_request(self, method: str, url: str, response: Optional[Response], elapsed: float):
+        """
+        Records a request made to Shinobi (a transport request hook).
+        :param method: HTTP method
+        :param url: URL requested
+        :param response: response from Shinobi else `None` if the request failed without a response
+        :param elapsed: seconds taken to get the response (or fail)
+        """
+        endpoint = get_endpoint_template(url)
+        if response is not None:
+            status = str(response.status_code)
+            request_bytes = get_request_size(response)
+            response_bytes, not_ok = _inspect_response(response)
+        else:
+            status, request_bytes, response_bytes, not_ok = NO_RESPONSE_STATUS, 0, 0, False
+        bucket = bisect_left(self.latency_buckets, elapsed)
+
+        with self._lock:
+            metrics = self._endpoints.get((endpoint, method))
+            if metrics is None:
+                metrics = _EndpointMetrics(len(self.latency_buckets))
+                self._endpoints[(endpoint, method)] = metrics
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            if not_ok:
+                metrics.not_ok += 1
+            metrics.request_bytes += request_bytes
+            metrics.response_bytes += response_bytes
+            metrics.latency_buckets[bucket] += 1
+            metrics.latency_sum += elapsed
+
+    def as_dict(self) -> Dict[str, Dict]:
+        """
+        Gets a snapshot of the metrics.
+        :return: metrics keyed by `"<METHOD> <endpoint template>"`, each with the count of requests, count by status,
+                 count of `"ok": false` responses, bytes sent and received and the total latency in seconds
+        """
+        with self._lock:
+            return {f"{method} {endpoint}": dict(
+                requests=sum(metrics.statuses.values()),
+                statuses=dict(metrics.statuses),
+                not_ok=metrics.not_ok,
+                request_bytes=metrics.request_bytes,
+                response_bytes=metrics.response_bytes,
+                latency_seconds=metrics.latency_sum)
+                for (endpoint, method), metrics in sorted(self._endpoints.items())}
+
+    def reset(self):
+        """
+        Forgets all recorded requests.
+        """
+        with self._lock:
+            self._endpoints = {}
+
+    def to_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format (e.g. to be served on a `/metrics` endpoint).
+        :return: metrics in Prometheus text format
+        """
+        with self._lock:
+            endpoints = [(endpoint, method, metrics.statuses.copy(), metrics.not_ok, metrics.request_bytes,
+                          metrics.response_bytes, list(metrics.latency_buckets), metrics.latency_sum)
+                         for (endpoint, method), metrics in sorted(self._endpoints.items())]
+
+        requests, not_ok, request_bytes, response_bytes, durations = [], [], [], [], []
+        for endpoint, method, statuses, endpoint_not_ok, endpoint_request_bytes, endpoint_response_bytes, \
+                latency_buckets, latency_sum in endpoints:
+            labels = f'endpoint="{_escape(endpoint)}",method="{method}"'
+            for status, count in sorted(statuses.items()):
+                requests.append(f'{{{labels},status="{status}"}} {count}')
+            not_ok.append(f"{{{labels}}} {endpoint_not_ok}")
+            request_bytes.append(f"{{{labels}}} {endpoint_request_bytes}")
+            response_bytes.append(f"{{{labels}}} {endpoint_response_bytes}")
+            cumulative = 0
+            for bound, count in zip(self.latency_buckets + (float("inf"), ), latency_buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                durations.append(f'_bucket{{{labels},le="{le}"}} {cumulative}')
+            durations.append(f"_sum{{{labels}}} {latency_sum!r}")
+            durations.append(f"_count{{{labels}}} {cumulative}")
+
+        lines: List[str] = []
+        for name, metric_type, description, samples in (
+                ("requests_total", "counter", "Requests made to Shinobi, by status code", requests),
+                ("request_duration_seconds", "histogram", "Latency of requests made to Shinobi", durations),
+                ("not_ok_responses_total", "counter", 'Responses from Shinobi with "ok": false', not_ok),
+                ("request_bytes_total", "counter", "Bytes of request bodies sent to Shinobi", request_bytes),
+                ("response_bytes_total", "counter", "Bytes of response bodies received from Shinobi", response_bytes)):
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {description}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            lines.extend(f"{full_name}{sample}" for sample in samples)
+        return "\n".join(lines) + "\n"
+
+
+def get_request_size(response: Response) -> int:
+    """
+    Gets the size of the body of the request that got the given response.
+    :param response: response to the request
+    :return: size in bytes
+    """
+    body = response.request.body if response.request is not None else None
+    if body is None:
+        return 0
+    return len(body.encode() if isinstance(body, str) else body) if isinstance(body, (str, bytes)) else 0
+
+
+def get_response_size(response: Response) -> int:
+    """
+    Gets the size of the body of the given response.
+
+    Streamed responses that have not been read yet are not read: their size is taken from their headers.
+    :param response: the response
+    :return: size in bytes
+    """
+    if response._content is False:
+        return int(response.headers.get("Content-Length", 0) or 0)
+    return len(response.content or b"")
+
+
+def _inspect_response(response: Response) -> Tuple[int, bool]:
+    """
+    Gets the size of the body of the given response and whether it is a JSON response with `"ok": false`.
+
+    Streamed responses that have not been read yet are not checked for `"ok": false`.
+    """
+    if response._content is False:
+        return get_response_size(response), False
+    content = response.content or b""
+    # Checked before decoding, as most responses do not contain `ok` (the decoded response is kept for the ORMs).
+    # Error statuses are counted by status, so are not decoded
+    if not response.ok or b'"ok"' not in content:
+        return len(content), False
+    try:
+        return len(content), not decode(response, ok_if_missing=True).ok
+    except ValueError:
+        return len(content), False
+
+
+def _escape(label_value: str) -> str:
+    """
+    Escapes a Prometheus label value.
+    """
+    return label_value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,308 @@
+import asyncio
+from copy import deepcopy
+from typing import Dict, Optional, Tuple, Callable, Awaitable, Set
+
+from requests import Response
+
+from shinobi_client.async_client import AsyncShinobiClient
+from shinobi_client._common import raise_if_errors, is_not_authorized, decode, ShinobiNotAuthorizedError
+from shinobi_client.orms.monitor_record import ShinobiMonitor
+from shinobi_client.orms.monitor_diff import diff_monitor_configuration
+from shinobi_client.orms.monitor import ShinobiMonitorOrm, ShinobiMonitorAlreadyExistsError, \
+    ShinobiMonitorDoesNotExistError
+from shinobi_client.polling import async_poll, PollResult
+from shinobi_client.deadlines import accepts_deadline
+from shinobi_client.profiling import profiled
+
+
+class AsyncShinobiMonitorOrm:
+    """
+    Asyncio Shinobi monitor ORM.
+
+    The asyncio equivalent of `ShinobiMonitorOrm`. As a constructor cannot be awaited, the user's credentials are used
+    to log in on first use, rather than on construction.
+    """
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.shinobi_client.host}:{self.shinobi_client.port}/{self.api_key}"
+
+    def __init__(self, shinobi_client: AsyncShinobiClient, email: str, password: str):
+        """
+        Constructor.
+        :param shinobi_client: client connected to Shinobi installation
+        :param email: email of user to setup monitors for
+        :param password: password of user to setup monitors for
+        """
+        self.shinobi_client = shinobi_client
+        self.email = email
+        self._password = password
+        self._user: Optional[Dict] = None
+        self._login_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def api_key(self) -> str:
+        return self._user["auth_token"]
+
+    @property
+    def group_key(self) -> str:
+        return self._user["ke"]
+
+    async def get_user(self) -> Dict:
+        """
+        Gets the user account that the monitors are setup for.
+        :return: details about the user
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        await self._login()
+        return deepcopy(self._user)
+
+    @profiled("monitor.get")
+    @accepts_deadline("monitor.get")
+    async def get(self, monitor_id: str) -> Optional[ShinobiMonitor]:
+        """
+        Gets the monitor with the given ID.
+
+        Uses the client's monitor cache, if it has one.
+        :param monitor_id: ID of the monitor to get
+        :return: details about the monitor else `None` if not found
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        monitor_cache = self.shinobi_client.monitor_cache
+        if monitor_cache is None:
+            return await self._get(monitor_id)
+        await self._login()
+        found, monitor = monitor_cache.lookup(self.group_key, monitor_id)
+        if found:
+            return monitor
+        generation = monitor_cache.generation(self.group_key)
+        monitor = await self._get(monitor_id)
+        monitor_cache.put(self.group_key, monitor_id, deepcopy(monitor), generation)
+        return monitor
+
+    @profiled("monitor.get_all")
+    @accepts_deadline("monitor.get_all")
+    async def get_all(self) -> Tuple[ShinobiMonitor, ...]:
+        """
+        Gets details about all monitors.
+
+        Uses the client's monitor cache, if it has one.
+        :return: monitors
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        monitor_cache = self.shinobi_client.monitor_cache
+        if monitor_cache is None:
+            return await self._get_all()
+        await self._login()
+        monitors = monitor_cache.lookup_all(self.group_key)
+        if monitors is not None:
+            return monitors
+        generation = monitor_cache.generation(self.group_key)
+        monitors = await self._get_all()
+        monitor_cache.put_all(self.group_key, deepcopy(monitors), generation)
+        return monitors
+
+    @profiled("monitor.create")
+    @accepts_deadline("monitor.create")
+    async def create(self, monitor_id: str, configuration: Dict, verify: bool = True) -> Dict:
+        """
+        Creates a monitor with the given ID and configuration.
+        :param monitor_id: ID of monitor
+        :param configuration: configuration of monitor
+        :param verify: wait and verify that the monitor has been created if `True`
+        :return: details about the created monitor
+        :raises MonitorAlreadyExistsError: raised if a monitor with the given ID already exists
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        if "-" in monitor_id:
+            # Shinobi silently removes dashes so just making them illegal
+            raise ValueError("\"monitor_id\" cannot contain \"-\"")
+
+        configuration = ShinobiMonitorOrm.filter_only_supported_keys(configuration)
+        ShinobiMonitorOrm.validate_configuration(configuration)
+        if await self._get(monitor_id):
+            raise ShinobiMonitorAlreadyExistsError(monitor_id)
+
+        await self._configure(monitor_id, configuration)
+
+        if verify:
+            result = await self._poll(lambda: self._get(monitor_id), lambda monitor: monitor is not None)
+            if not result.converged:
+                raise RuntimeError(f"Could not create monitor \"{monitor_id}\" with configuration: ${configuration}")
+            return result.value
+        else:
+            return await self._get(monitor_id)
+
+    @profiled("monitor.modify")
+    @accepts_deadline("monitor.modify")
+    async def modify(self, monitor_id: str, configuration: Dict, verify: bool = True) -> bool:
+        """
+        Modified a monitor with the given ID with the given configuration.
+        :param monitor_id: ID of the monitor
+        :param configuration: updated configuration of the monitor (fields that are not given keep their current values)
+        :param verify: wait and verify that the monitor has been modified if `True`
+        :return: `True` if the monitor has been modified
+        :raises ShinobiMonitorDoesNotExistError: raised if a monitor with the given ID does not exist
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        configuration = ShinobiMonitorOrm.filter_only_supported_keys(configuration)
+        ShinobiMonitorOrm.validate_configuration(configuration)
+        current_configuration = await self._get(monitor_id)
+        if not current_configuration:
+            raise ShinobiMonitorDoesNotExistError(monitor_id)
+
+        changes = diff_monitor_configuration(configuration, current_configuration)
+        if not changes:
+            return False
+
+        await self._configure(
+            monitor_id, ShinobiMonitorOrm._create_patched_configuration(current_configuration, changes))
+
+        if verify:
+            result = await self._poll(
+                lambda: self._get(monitor_id),
+                lambda monitor: monitor is not None and not ShinobiMonitorOrm.would_configuration_change(
+                    configuration, monitor))
+            if not result.converged:
+                raise RuntimeError(f"Could not change configuration of monitor \"{monitor_id}\". "
+                                   f"Got {result.value} expected {configuration}")
+
+        return True
+
+    @profiled("monitor.delete")
+    @accepts_deadline("monitor.delete")
+    async def delete(self, monitor_id: str, verify: bool = True) -> bool:
+        """
+        Deletes the monitor with the given ID.
+
+        NoOp if the monitor does not exist.
+        :param monitor_id: ID of the monitor
+        :param verify: wait and verify that the monitor has been deleted if `True`
+        :return: `True` if the monitor was deleted
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        # Note: Shinobi errors (and the connection hangs) if asked to remove a non-existent monitor
+        if not await self._get(monitor_id):
+            return False
+
+        response = await self._request("POST", "configureMonitor", f"{monitor_id}/delete")
+        self._invalidate_monitor_cache()
+        raise_if_errors(response)
+
+        if verify and not (await self._poll(lambda: self._get(monitor_id), lambda monitor: monitor is None)).converged:
+            raise RuntimeError(f"Could not delete monitor: {monitor_id}")
+
+        return True
+
+    @profiled("monitor.check_drift")
+    @accepts_deadline("monitor.check_drift")
+    async def check_drift(self, configurations: Dict[str, Dict]) -> Set[str]:
+        """
+        Determines which of the monitors with the given IDs have drifted from the given configurations, i.e. would
+        change if the configurations were applied, or do not exist.
+
+        All of the user's monitors are read with one request, then compared by fingerprint.
+        :param configurations: map of monitor ID to the monitor's desired configuration
+        :return: IDs of the monitors that have drifted
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        return ShinobiMonitorOrm._find_drifted(configurations, await self._get_all())
+
+    async def _get(self, monitor_id: str) -> Optional[ShinobiMonitor]:
+        """
+        Gets the monitor with the given ID from Shinobi (never from the cache).
+        :param monitor_id: ID of the monitor to get
+        :return: details about the monitor else `None` if not found
+        """
+        response = await self._request("GET", "monitor", monitor_id)
+        return ShinobiMonitorOrm._parse_get_response(decode(response, ok_if_missing=True).payload)
+
+    async def _get_all(self) -> Tuple[ShinobiMonitor, ...]:
+        """
+        Gets details about all monitors from Shinobi (never from the cache).
+        :return: monitors
+        """
+        response = await self._request("GET", "monitor")
+        return ShinobiMonitorOrm._parse_get_all_response(decode(response, ok_if_missing=True).payload)
+
+    def _invalidate_monitor_cache(self):
+        """
+        Invalidates the group's entries in the client's monitor cache (if it has one), after a monitor has been changed.
+        """
+        if self.shinobi_client.monitor_cache is not None:
+            self.shinobi_client.monitor_cache.invalidate(self.group_key)
+
+    async def _configure(self, monitor_id: str, configuration: Dict):
+        """
+        Configures the monitor with the given ID with the given configuration.
+
+        Will create the monitor if it does not exist.
+        :param monitor_id: ID of the monitor
+        :param configuration: configuration of the monitor
+        """
+        response = await self._request(
+            "POST", "configureMonitor", monitor_id, json=ShinobiMonitorOrm._create_configure_payload(configuration))
+        self._invalidate_monitor_cache()
+        raise_if_errors(response)
+
+    async def _request(self, method: str, endpoint: str, path: Optional[str] = None, **kwargs) -> Response:
+        """
+        Makes a request to an endpoint of the user's group, logging in first if required and again (once) if the user's
+        API key is rejected, e.g. as it came from an expired cached login.
+        :param method: HTTP method
+        :param endpoint: endpoint to request (e.g. `monitor`)
+        :param path: path to request under the group's endpoint
+        :param kwargs: key word arguments to pass to the transport
+        :return: response from Shinobi
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        :raises ShinobiNotAuthorizedError: raised if the API key is rejected after logging in again
+        """
+        await self._login()
+        for attempt in range(2):
+            api_key = self.api_key
+            url = f"{self.base_url}/{endpoint}/{self.group_key}" + (f"/{path}" if path is not None else "")
+            response = await self.shinobi_client.transport.request(method, url, **kwargs)
+            if not is_not_authorized(response):
+                return response
+            if attempt == 0:
+                await self._login(rejected_api_key=api_key)
+        raise ShinobiNotAuthorizedError(f"API key of user \"{self.email}\" was not authorized")
+
+    async def _poll(self, probe: Callable[[], Awaitable[Optional[Dict]]],
+                    predicate: Callable[[Optional[Dict]], bool]) -> PollResult:
+        """
+        Polls until the probed monitor satisfies the predicate, according to the client's polling policy.
+        :param probe: coroutine function that gets the monitor
+        :param predicate: callable that returns `True` if the monitor is in the state being waited for
+        :return: result of polling
+        """
+        return await async_poll(probe, predicate, policy=self.shinobi_client.poll_policy,
+                                statistics=self.shinobi_client.poll_statistics)
+
+    async def _login(self, rejected_api_key: Optional[str] = None):
+        """
+        Logs in as the user, if not already logged in or if the user's API key has been rejected.
+        :param rejected_api_key: API key that was rejected, so must not be used again (nor a cached login)
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        if self._user is not None and rejected_api_key is None:
+            return
+        if self._login_lock is None:
+            # Created lazily so that the lock belongs to the event loop the ORM is used in
+            self._login_lock = asyncio.Lock()
+        async with self._login_lock:
+            if rejected_api_key is not None and self._user is not None and self.api_key == rejected_api_key:
+                if self.shinobi_client.credential_cache is not None:
+                    self.shinobi_client.credential_cache.invalidate(self.email)
+                self._user = await self._do_login(use_cache=False)
+            elif self._user is None:
+                self._user = await self._do_login()
+
+    @profiled("monitor.login")
+    async def _do_login(self, use_cache: bool = True) -> Dict:
+        """
+        Logs in as the user.
+        :param use_cache: whether a cached login can be used
+        :return: details about the logged in user
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        return await self.shinobi_client.user._get_as_user(self.email, self._password, use_cache=use_cache)
@@ -0,0 +1,229 @@
+from typing import Optional, Dict, Tuple, Callable, Awaitable
+
+from shinobi_client.async_client import AsyncShinobiClient
+from shinobi_client._common import raise_if_errors, ShinobiSuperUserCredentialsRequiredError
+from shinobi_client.orms.user import ShinobiUserOrm, ShinobiWrongPasswordError, ShinobiUserAlreadyExistsError, \
+    ShinobiUserDoesNotExistError
+from shinobi_client.polling import async_poll, PollResult
+from shinobi_client.deadlines import accepts_deadline
+from shinobi_client.profiling import profiled
+
+
+class AsyncShinobiUserOrm:
+    """
+    Asyncio Shinobi user ORM.
+
+    The asyncio equivalent of `ShinobiUserOrm`.
+    """
+    @property
+    def _base_url(self) -> str:
+        if self.shinobi_client.super_user_token is None:
+            raise ShinobiSuperUserCredentialsRequiredError()
+        return f"http://{self.shinobi_client.host}:{self.shinobi_client.port}" \
+               f"/super/{self.shinobi_client.super_user_token}/accounts"
+
+    def __init__(self, shinobi_client: AsyncShinobiClient):
+        """
+        Constructor.
+        :param shinobi_client: client connected to Shinobi installation
+        """
+        self.shinobi_client = shinobi_client
+
+    @profiled("user.get")
+    @accepts_deadline("user.get")
+    async def get(self, email: str, password: str = None) -> Optional[Dict]:
+        """
+        Gets details about the user with the given email address.
+        :param email: user's email address
+        :param password: password of the user - if supplied will get the details as the user opposed to the super user
+        :return: details about user else `None` if the user does not exist
+        :raises ShinobiWrongPasswordError: raised if an incorrect email/password pair is supplied
+        """
+        return await self._get_as_user(email, password) if password else await self._get_as_super_user(email)
+
+    async def _get_as_user(self, email: str, password: str, use_cache: bool = True) -> Dict:
+        """
+        Gets details about the user with the given email address, using the user's own credentials.
+
+        Uses the client's credential cache, if it has one, to avoid logging in.
+        :param email: user's email address
+        :param password: user's password
+        :param use_cache: whether a cached login can be used (the login is always cached)
+        :return: details about user
+        :raises ShinobiWrongPasswordError: raised if an incorrect email/password pair is supplied
+        """
+        credential_cache = self.shinobi_client.credential_cache
+        if use_cache and credential_cache is not None:
+            user = credential_cache.get(email, password)
+            if user is not None:
+                return user
+
+        response = await self.shinobi_client.transport.post(
+            f"http://{self.shinobi_client.host}:{self.shinobi_client.port}/?json=true",
+            data={
+                "mail": email,
+                "pass": password
+            })
+        envelope = raise_if_errors(response, raise_if_json_not_ok=False)
+        user = ShinobiUserOrm._parse_login_response(envelope.payload, email, password)
+        if credential_cache is not None:
+            credential_cache.put(email, password, user)
+        return user
+
+    async def _get_as_super_user(self, email: str, refresh: bool = False) -> Optional[Dict]:
+        """
+        Gets details about the user with the given email address, using the super user's credentials.
+
+        Uses the client's user directory, if it has one.
+        :param email: user's email address
+        :param refresh: whether to refresh the user directory, even if it is not stale
+        :return: details about user else `None` if the user does not exist
+        """
+        directory = self.shinobi_client.user_directory
+        if directory is None:
+            return ShinobiUserOrm._select_user_with_email(await self._list_users(), email)
+
+        if refresh or directory.is_stale:
+            await self._list_users()
+        user = directory.get_by_email(email)
+        return ShinobiUserOrm._create_improved_user_entry(user) if user is not None else None
+
+    @profiled("user.get_all")
+    @accepts_deadline("user.get_all")
+    async def get_all(self) -> Tuple:
+        """
+        Gets details about all users.
+        :return: tuple where each element contains details about a specific user
+        """
+        return tuple(ShinobiUserOrm._create_improved_user_entry(user) for user in await self._list_users())
+
+    async def _list_users(self) -> Tuple[Dict, ...]:
+        """
+        Lists all users, refreshing the client's user directory (if it has one).
+        :return: details about all users, as listed by Shinobi
+        """
+        directory = self.shinobi_client.user_directory
+        generation = directory.generation if directory is not None else None
+        response = await self.shinobi_client.transport.get(f"{self._base_url}/list")
+        users = tuple(raise_if_errors(response).payload["users"])
+        if directory is not None:
+            directory.refresh(users, generation)
+        return users
+
+    def _invalidate_user_directory(self):
+        """
+        Invalidates the client's user directory (if it has one), after a user has been changed.
+        """
+        if self.shinobi_client.user_directory is not None:
+            self.shinobi_client.user_directory.invalidate()
+
+    def _invalidate_credential_cache(self, email: str):
+        """
+        Invalidates the cached logins of the user with the given email address (if the client has a credential cache),
+        after the user's password has been changed or the user has been deleted.
+        :param email: user's email address
+        """
+        if self.shinobi_client.credential_cache is not None:
+            self.shinobi_client.credential_cache.invalidate(email)
+
+    @profiled("user.create")
+    @accepts_deadline("user.create")
+    async def create(self, email: str, password: str, verify: bool = True) -> Dict:
+        """
+        Creates a user with the given details.
+        :param email: email address of the user
+        :param password: password for the user
+        :param verify: whether to wait to confirm that the user has been created
+        :return: details about created user
+        """
+        if await self.get(email):
+            raise ShinobiUserAlreadyExistsError(email)
+
+        response = await self.shinobi_client.transport.post(
+            f"{self._base_url}/registerAdmin", json=ShinobiUserOrm._create_register_payload(email, password))
+        self._invalidate_user_directory()
+        create_user = raise_if_errors(response).payload
+
+        if verify and not (await self._poll(
+                lambda: self._get_as_super_user(email, refresh=True), lambda user: user is not None)).converged:
+            raise RuntimeError("Unable to verify created user")
+
+        return ShinobiUserOrm._create_improved_user_entry(create_user["user"])
+
+    @profiled("user.modify")
+    @accepts_deadline("user.modify")
+    async def modify(self, email: str, *, password: str) -> bool:
+        """
+        Modify a user.
+        :param email: the email address of the user to modify
+        :param password: new password
+        :return: whether the user was modified
+        """
+        try:
+            # Not using a cached login, as the password may have been changed elsewhere
+            user = await self._get_as_user(email, password, use_cache=False)
+            assert user is not None
+            return False
+        except ShinobiWrongPasswordError:
+            pass
+
+        user = await self.get(email)
+        if user is None:
+            raise ShinobiUserDoesNotExistError(email)
+
+        data = {
+            "mail": email,
+            "pass": password,
+            "password_again": password,
+        }
+        account = {
+            "mail": email,
+            "uid": user["uid"],
+            "ke": user["ke"]
+        }
+        response = await self.shinobi_client.transport.post(
+            f"{self._base_url}/editAdmin", json=dict(data=data, account=account))
+        self._invalidate_user_directory()
+        self._invalidate_credential_cache(email)
+        raise_if_errors(response)
+
+        return True
+
+    @profiled("user.delete")
+    @accepts_deadline("user.delete")
+    async def delete(self, email: str, verify: bool = True, delete_monitors: bool = False) -> bool:
+        """
+        Deletes the user with the given email address.
+        :param email: email address of user
+        :param verify: whether to wait to confirm that the user has been deleted
+        :param delete_monitors: whether to also delete the user's monitors (which Shinobi otherwise keeps)
+        :return: `True` if the user has been deleted, else `False` if they haven't because they didn't exist
+        """
+        user = await self.get(email)
+        if user is None:
+            return False
+
+        response = await self.shinobi_client.transport.post(
+            f"{self._base_url}/deleteAdmin", json=ShinobiUserOrm._create_delete_payload(user, delete_monitors))
+        self._invalidate_user_directory()
+        self._invalidate_credential_cache(email)
+        if delete_monitors and self.shinobi_client.monitor_cache is not None:
+            self.shinobi_client.monitor_cache.invalidate(user["ke"])
+        raise_if_errors(response)
+
+        if verify and not (await self._poll(
+                lambda: self._get_as_super_user(email, refresh=True), lambda user: user is None)).converged:
+            raise RuntimeError(f"User with email \"{email}\" was not deleted")
+
+        return True
+
+    async def _poll(self, probe: Callable[[], Awaitable[Optional[Dict]]],
+                    predicate: Callable[[Optional[Dict]], bool]) -> PollResult:
+        """
+        Polls until the probed user satisfies the predicate, according to the client's polling policy.
+        :param probe: coroutine function that gets the user
+        :param predicate: callable that returns `True` if the user is in the state being waited for
+        :return: result of polling
+        """
+        return await async_poll(probe, predicate, policy=self.shinobi_client.poll_policy,
+                                statistics=self.shinobi_client.poll_statistics)
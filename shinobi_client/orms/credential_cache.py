@@ -0,0 +1,161 @@
+import hmac
+import json
+import os
+import secrets
+import stat
+from copy import deepcopy
+from hashlib import sha256
+from threading import Lock
+from time import time
+from typing import Dict, Optional, Tuple, Callable
+
+from logzero import logger
+
+DEFAULT_CREDENTIAL_CACHE_TTL = 300.0
+
+_PASSWORD_KEYS = ("pass", "password")
+_FILE_VERSION = 1
+
+
+class ShinobiCredentialCache:
+    """
+    Cache of users' logins, keyed by email address and (a keyed hash of) password, so that ORMs acting as a user (e.g.
+    monitor ORMs) can get the user's API key (`auth_token`) and group key (`ke`) without logging in every time.
+
+    Entries expire `ttl` seconds after the login. Passwords are never stored.
+
+    Optionally persisted to a file, readable and writable only by its owner, so that short lived processes (e.g. the
+    CLI) can share logins. A persisted file that can be accessed by anyone else is ignored. Processes that share the
+    file merge their logins into it when saving. Persisting is best effort: a file that cannot be written is logged and
+    otherwise ignored.
+
+    Thread safe.
+    """
+    def __init__(self, ttl: float = DEFAULT_CREDENTIAL_CACHE_TTL, location: Optional[str] = None):
+        """
+        Constructor.
+        :param ttl: number of seconds after logging in that a login expires
+        :param location: location of the file to persist logins to, `None` to not persist them
+        """
+        self.ttl = ttl
+        self.location = os.path.expanduser(location) if location is not None else None
+        self._lock = Lock()
+        self._hash_key = secrets.token_bytes(32)
+        self._entries: Dict[str, Dict] = {}
+        if self.location is not None:
+            self._load()
+
+    def get(self, email: str, password: str) -> Optional[Dict]:
+        """
+        Gets the cached login of the user with the given credentials.
+        :param email: user's email address
+        :param password: user's password
+        :return: details about the logged in user (including the password) else `None` if there is no unexpired login
+        """
+        key = self._key(email, password)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires_at"] <= time():
+                del self._entries[key]
+                return None
+            user = deepcopy(entry["user"])
+        for password_key in _PASSWORD_KEYS:
+            user[password_key] = password
+        return user
+
+    def put(self, email: str, password: str, user: Dict):
+        """
+        Caches the login of the user with the given credentials.
+        :param email: user's email address
+        :param password: user's password
+        :param user: details about the logged in user (passwords are not cached)
+        """
+        user = {key: value for key, value in deepcopy(user).items() if key not in _PASSWORD_KEYS}
+        with self._lock:
+            self._entries[self._key(email, password)] = dict(email=email, expires_at=time() + self.ttl, user=user)
+            self._save(lambda entry: False)
+
+    def invalidate(self, email: Optional[str] = None):
+        """
+        Forgets the logins of the user with the given email address (e.g. after their password has changed or their
+        API key has been rejected).
+        :param email: user's email address, `None` to forget all logins
+        """
+        with self._lock:
+            self._entries = {key: entry for key, entry in self._entries.items()
+                             if email is not None and entry["email"] != email}
+            self._save(lambda entry: email is None or entry["email"] == email)
+
+    def _key(self, email: str, password: str) -> str:
+        return hmac.new(self._hash_key, f"{email}\0{password}".encode(), sha256).hexdigest()
+
+    def _load(self):
+        """
+        Loads unexpired logins from the persisted file, if it exists and is private. A malformed file is treated as
+        empty.
+        """
+        persisted = self._read()
+        if persisted is not None:
+            self._hash_key, self._entries = persisted
+
+    def _read(self) -> Optional[Tuple[bytes, Dict[str, Dict]]]:
+        """
+        Reads the unexpired logins from the persisted file.
+        :return: tuple where the first element is the key that the logins are hashed with and the second is the logins,
+                 else `None` if the file does not exist, is not private or is malformed
+        """
+        try:
+            with open(self.location, "r") as file:
+                if os.fstat(file.fileno()).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+                    return None
+                content = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(content, dict) or content.get("version") != _FILE_VERSION:
+            return None
+        now = time()
+        try:
+            hash_key = bytes.fromhex(content["hash_key"])
+            entries = {key: entry for key, entry in content["entries"].items()
+                       if entry["expires_at"] > now and isinstance(entry["email"], str)
+                       and isinstance(entry["user"], dict)}
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return None
+        return hash_key, entries
+
+    def _save(self, invalidated: Callable[[Dict], bool]):
+        """
+        Persists unexpired logins to file (if the cache is persisted), merged with those persisted by other processes.
+        Must be called with the lock held.
+
+        Best effort: errors writing the file are logged rather than raised.
+        :param invalidated: whether a login persisted by another process has been invalidated, so must not be kept
+        """
+        if self.location is None:
+            return
+        now = time()
+        persisted = self._read()
+        # Logins persisted by a process that hashes with a different key cannot be used, so are replaced
+        if persisted is not None and persisted[0] == self._hash_key:
+            entries = {key: entry for key, entry in persisted[1].items() if not invalidated(entry)}
+            entries.update(self._entries)
+            self._entries = entries
+        content = dict(version=_FILE_VERSION, hash_key=self._hash_key.hex(), entries={
+            key: entry for key, entry in self._entries.items() if entry["expires_at"] > now})
+        # Written to a private temporary file then moved into place, so the file is never partially written or public
+        temporary_location = f"{self.location}.{secrets.token_hex(4)}.tmp"
+        try:
+            file_descriptor = os.open(temporary_location, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                                      stat.S_IRUSR | stat.S_IWUSR)
+            try:
+                with os.fdopen(file_descriptor, "w") as file:
+                    json.dump(content, file)
+                os.replace(temporary_location, self.location)
+            except BaseException:
+                if os.path.exists(temporary_location):
+                    os.remove(temporary_location)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not persist credential cache to {self.location}: {e}")
@@ -1,13 +1,23 @@
-import json
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from dataclasses import dataclass
+from enum import Enum, unique
 from json import JSONDecodeError
-from typing import Dict, Optional, Set, Tuple, Union
+from threading import Lock
+from typing import Dict, Optional, Set, Tuple, Union, Callable, Iterator, Iterable
 
-import requests
+from requests import Response
 
 from shinobi_client.client import ShinobiClient
-from shinobi_client._common import raise_if_errors, wait_and_verify
+from shinobi_client.orms.monitor_record import ShinobiMonitor, parse_details
+from shinobi_client.orms.monitor_diff import MonitorConfigurationDiff, diff_monitor_configuration, \
+    normalise_configuration, select_fields, fingerprint_normalised_configuration
+from shinobi_client._common import raise_if_errors, is_not_authorized, decode, ShinobiNotAuthorizedError, \
+    ShinobiEnvelope
+from shinobi_client._streaming import StreamedJsonArray, DEFAULT_CHUNK_SIZE
+from shinobi_client.polling import poll, PollResult
+from shinobi_client.deadlines import accepts_deadline, ShinobiTimeoutError
+from shinobi_client.profiling import profiled, in_current_context
 
 
 @dataclass
@@ -32,13 +42,48 @@ class ShinobiUnsupportedKeysInConfigurationError(InvalidConfigurationError):
     unsupported_keys: Set[str]
 
 
+@unique
+class MonitorApplyAction(Enum):
+    """
+    Action taken to apply a monitor's configuration.
+    """
+    CREATE = "create"
+    MODIFY = "modify"
+    NONE = "none"
+
+
+@dataclass
+class MonitorApplyResult:
+    """
+    Result of applying a monitor's configuration.
+
+    `verified` is `None` if the change was not verified (or there was no change to verify). `changes` is set to the
+    changes made to an existing monitor's configuration.
+    """
+    monitor_id: str
+    action: MonitorApplyAction
+    verified: Optional[bool] = None
+    error: Optional[Exception] = None
+    changes: Optional[MonitorConfigurationDiff] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and self.verified is not False
+
+
+DEFAULT_APPLY_WORKERS = 8
+
+
 class ShinobiMonitorOrm:
     """
     Shinobi monitor ORM.
 
     Uses API: https://shinobi.video/docs/api#content-add-edit-or-delete-a-monitor
 
-    Not thread safe.
+    Operations (other than `iter_all`) accept a keyword only `deadline`: the seconds that the operation can take in
+    total, including any verification (see `shinobi_client.deadlines`).
+
+    Thread safe.
     """
     SUPPORTED_KEYS = {"name", "details", "type", "ext", "protocol", "host", "path", "port", "fps", "mode", "width",
                       "height"}
@@ -56,26 +101,30 @@ class ShinobiMonitorOrm:
     def would_configuration_change(configuration: Dict, existing_configuration: Dict) -> bool:
         """
         Determines whether the existing configuration would change if Shinobi is given the new configuration.
+
+        See `diff_monitor_configuration` for the changes that would be made.
         :param configuration: new configuration
         :param existing_configuration: existing configuration
         :return: `True` if the existing configuration would change
         """
-        new_keys = set(configuration.keys()) - set(existing_configuration.keys())
-        if len(new_keys) > 0:
-            return True
-        for key, value in configuration.items():
-            if key == "details":
-                break
-            if str(existing_configuration[key]) != str(value):
-                return True
+        return diff_monitor_configuration(configuration, existing_configuration).has_changes
 
-        if "details" not in configuration:
-            return False
-
-        # Note: details that are missing with either take default values or will not change
-        configuration_details = ShinobiMonitorOrm._parse_details(configuration["details"])
-        existing_configuration_details = ShinobiMonitorOrm._parse_details(existing_configuration["details"])
-        return ShinobiMonitorOrm.would_configuration_change(configuration_details, existing_configuration_details)
+    @staticmethod
+    def fingerprint_configuration(configuration: Dict, fields: Optional[Dict] = None) -> str:
+        """
+        Computes the canonical fingerprint of the given configuration: a stable hash of its supported fields (with
+        parsed `details`), normalised to the form that Shinobi stores them in. Configurations that Shinobi would store
+        the same have the same fingerprint.
+        :param configuration: configuration of (or details about) a monitor
+        :param fields: configuration whose fields (including the fields of its `details`) are the only fields to
+                       fingerprint if given, e.g. to fingerprint a monitor for comparison with a partial configuration
+        :return: fingerprint
+        """
+        normalised = normalise_configuration(ShinobiMonitorOrm.filter_only_supported_keys(configuration))
+        if fields is not None:
+            normalised = select_fields(
+                normalised, normalise_configuration(ShinobiMonitorOrm.filter_only_supported_keys(fields)))
+        return fingerprint_normalised_configuration(normalised)
 
     @staticmethod
     def validate_configuration(configuration: Dict):
@@ -103,20 +152,14 @@ class ShinobiMonitorOrm:
             raise ShinobiUnsupportedKeysInConfigurationError(unsupported_keys)
 
     @staticmethod
-    def _create_improved_monitor_entry(monitor: Dict) -> Dict:
+    def _create_improved_monitor_entry(monitor: Dict) -> ShinobiMonitor:
         """
-        Creates a copy of the given monitor details with extra information.
-        :param monitor: monitor details to improve
+        Creates a record of the given monitor details with extra information.
+        :param monitor: monitor details from Shinobi's decoded response (not copied, so must not be modified afterwards)
         :return: improved monitor details
         """
-        monitor = deepcopy(monitor)
-        assert "id" not in monitor
-        monitor["id"] = monitor["mid"]
-        if "ok" in monitor:
-            del monitor["ok"]
-        # Shinobi UI returns JSON but the API returns a string - parsing JSON string
-        monitor["details"] = ShinobiMonitorOrm._parse_details(monitor["details"])
-        return monitor
+        # Shinobi UI returns JSON but the API returns a string - the record parses the JSON string when first accessed
+        return ShinobiMonitor(monitor)
 
     @staticmethod
     def _parse_details(details: Union[Dict, str]) -> Dict:
@@ -126,12 +169,90 @@ class ShinobiMonitorOrm:
         :return: parsed details (may not be a copy)
         :raises ValueError: if the parsed details are not a dictionary
         """
-        # Note: in older versions of Shinobi the details were stored in a JSON dumped string.
-        #       Newer config is in JSON.
-        parsed_details = json.loads(details) if isinstance(details, str) else details
-        if not isinstance(parsed_details, dict):
-            raise ValueError(f"Details is not a valid JSON object: {parsed_details}")
-        return parsed_details
+        return parse_details(details)
+
+    @staticmethod
+    def _parse_get_response(content: Union[Dict, list]) -> Optional[ShinobiMonitor]:
+        """
+        Parses Shinobi's response to a request for a single monitor.
+        :param content: JSON decoded response
+        :return: details about the monitor else `None` if not found
+        """
+        if isinstance(content, list):
+            # Newer versions of Shinobi return a list (even though a single ID was given!)
+            if len(content) == 0:
+                content = None
+            elif len(content) == 1:
+                content = content[0]
+            else:
+                raise AssertionError(f"Request for single monitor returned more than one: {content}")
+        if not content:
+            return None
+        return ShinobiMonitorOrm._create_improved_monitor_entry(content)
+
+    @staticmethod
+    def _parse_get_all_response(json_response: Union[Dict, list]) -> Tuple[ShinobiMonitor, ...]:
+        """
+        Parses Shinobi's response to a request for all monitors.
+        :param json_response: JSON decoded response
+        :return: monitors
+        """
+        # Yes, the type of response weirdly changes depending on the number of monitors currently set...
+        if isinstance(json_response, Dict):
+            if len(json_response) == 0:
+                return tuple()
+            else:
+                return (ShinobiMonitorOrm._create_improved_monitor_entry(json_response), )
+        else:
+            return tuple(ShinobiMonitorOrm._create_improved_monitor_entry(entry) for entry in json_response)
+
+    @staticmethod
+    def _find_drifted(configurations: Dict[str, Dict], monitors: Iterable[Dict]) -> Set[str]:
+        """
+        Finds the monitors that have drifted from the given configurations, comparing them as they are fingerprinted.
+        :param configurations: map of monitor ID to the monitor's desired configuration
+        :param monitors: details about all of the user's monitors
+        :return: IDs of the monitors that have drifted (or do not exist)
+        """
+        existing_monitors = {monitor["mid"]: monitor for monitor in monitors}
+        drifted = set()
+        for monitor_id, configuration in configurations.items():
+            existing_monitor = existing_monitors.get(monitor_id)
+            if existing_monitor is None:
+                drifted.add(monitor_id)
+                continue
+            desired = normalise_configuration(ShinobiMonitorOrm.filter_only_supported_keys(configuration))
+            # Note: only the fields being compared are normalised
+            existing = normalise_configuration(
+                {key: existing_monitor[key] for key in desired.keys() if key in existing_monitor})
+            # Note: fingerprints are equal if and only if the normalised configurations are equal, which is cheaper to
+            #       check than hashing both (and cheaper still if the monitor has no fields other than those desired)
+            if existing != desired and select_fields(existing, desired) != desired:
+                drifted.add(monitor_id)
+        return drifted
+
+    @staticmethod
+    def _create_patched_configuration(existing_configuration: Dict, changes: MonitorConfigurationDiff) -> Dict:
+        """
+        Creates the configuration to give Shinobi to make the given changes to the existing configuration.
+        :param existing_configuration: existing configuration of the monitor (not modified)
+        :param changes: changes to make
+        :return: existing configuration with the changes applied
+        """
+        # Note: Shinobi replaces the whole configuration (resetting anything omitted) so only the changed fields are
+        #       taken from the new configuration
+        return changes.apply_to(ShinobiMonitorOrm.filter_only_supported_keys(existing_configuration))
+
+    @staticmethod
+    def _create_configure_payload(configuration: Dict) -> Dict:
+        """
+        Creates the payload required to configure a monitor.
+        :param configuration: configuration of the monitor (not modified)
+        :return: payload to post to the `configureMonitor` endpoint
+        """
+        # Note: Shinobi used to represent "details" as a JSON dumped string but now needs to be JSON
+        data = dict(configuration, details=ShinobiMonitorOrm._parse_details(configuration["details"]))
+        return dict(data=data)
 
     @property
     def base_url(self) -> str:
@@ -150,49 +271,87 @@ class ShinobiMonitorOrm:
         :raises ShinobiWrongPasswordError: if the email and password given is incorrect
         """
         self.shinobi_client = shinobi_client
-        self._user = self.shinobi_client.user.get(email, password)
-        self.api_key = self._user["auth_token"]
-        self.group_key = self._user["ke"]
-
-    def get(self, monitor_id: str) -> Optional[Dict]:
+        self.email = email
+        self._password = password
+        self._login_lock = Lock()
+        self._login(email, password)
+
+    @profiled("monitor.get")
+    @accepts_deadline("monitor.get")
+    def get(self, monitor_id: str) -> Optional[ShinobiMonitor]:
         """
         Gets the monitor with the given ID.
+
+        Uses the client's monitor cache, if it has one.
         :param monitor_id: ID of the monitor to get
         :return: details about the monitor else `None` if not found
         """
-        response = requests.get(f"{self.base_url}/monitor/{self.group_key}/{monitor_id}")
-        response.raise_for_status()
-        content = response.json()
-        if isinstance(content, list):
-            # Newer versions of Shinobi return a list (even though a single ID was given!)
-            if len(content) == 0:
-                content = None
-            elif len(content) == 1:
-                content = content[0]
-            else:
-                raise AssertionError(f"Request for single monitor returned more than one: {content}")
-        if not content:
-            return None
-        return ShinobiMonitorOrm._create_improved_monitor_entry(content)
+        monitor_cache = self.shinobi_client.monitor_cache
+        if monitor_cache is None:
+            return self._get(monitor_id)
+        found, monitor = monitor_cache.lookup(self.group_key, monitor_id)
+        if found:
+            return monitor
+        generation = monitor_cache.generation(self.group_key)
+        monitor = self._get(monitor_id)
+        monitor_cache.put(self.group_key, monitor_id, deepcopy(monitor), generation)
+        return monitor
 
-    def get_all(self) -> Tuple[Dict]:
+    @profiled("monitor.get_all")
+    @accepts_deadline("monitor.get_all")
+    def get_all(self) -> Tuple[ShinobiMonitor, ...]:
         """
         Gets details about all monitors.
+
+        Uses the client's monitor cache, if it has one.
         :return: monitors
         """
-        response = requests.get(f"{self.base_url}/monitor/{self.group_key}")
-        response.raise_for_status()
-        json_response = response.json()
-
-        # Yes, the type of response weirdly changes depending on the number of monitors currently set...
-        if isinstance(json_response, Dict):
-            if len(json_response) == 0:
-                return tuple()
-            else:
-                return (ShinobiMonitorOrm._create_improved_monitor_entry(json_response), )
-        else:
-            return tuple(ShinobiMonitorOrm._create_improved_monitor_entry(entry) for entry in json_response)
+        monitor_cache = self.shinobi_client.monitor_cache
+        if monitor_cache is None:
+            return self._get_all()
+        monitors = monitor_cache.lookup_all(self.group_key)
+        if monitors is not None:
+            return monitors
+        generation = monitor_cache.generation(self.group_key)
+        monitors = self._get_all()
+        monitor_cache.put_all(self.group_key, deepcopy(monitors), generation)
+        return monitors
+
+    def iter_all(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[ShinobiMonitor]:
+        """
+        Iterates all monitors, as they are received from Shinobi.
 
+        Unlike `get_all`, Shinobi's response is parsed incrementally, so only one monitor (and one chunk of the
+        response) need be held in memory at once. Does not use the client's monitor cache.
+        :param chunk_size: number of bytes of the response to read at once
+        :return: iterator of monitors
+        :raises ShinobiNotAuthorizedError: raised if the API key is rejected after logging in again
+        """
+        for attempt in range(2):
+            api_key = self.api_key
+            with self.shinobi_client.transport.get(
+                    f"{self.base_url}/monitor/{self.group_key}", stream=True) as response:
+                response.raise_for_status()
+                stream = StreamedJsonArray(response.iter_content(chunk_size))
+                for monitor in stream:
+                    yield ShinobiMonitorOrm._create_improved_monitor_entry(monitor)
+            if stream.value is None:
+                return
+
+            # Shinobi returns a single monitor (or an error) as an object, rather than a list
+            envelope = ShinobiEnvelope.from_payload(stream.value, ok_if_missing=True)
+            if envelope.is_not_authorized:
+                if attempt == 0:
+                    self._relogin(api_key)
+                    continue
+                raise ShinobiNotAuthorizedError(f"API key of user \"{self.email}\" was not authorized")
+            if not envelope.ok:
+                raise RuntimeError(envelope.msg if envelope.msg is not None else envelope.payload)
+            yield from ShinobiMonitorOrm._parse_get_all_response(envelope.payload)
+            return
+
+    @profiled("monitor.create")
+    @accepts_deadline("monitor.create")
     def create(self, monitor_id: str,  configuration: Dict, verify: bool = True) -> Dict:
         """
         Creates a monitor with the given ID and configuration.
@@ -208,54 +367,55 @@ class ShinobiMonitorOrm:
 
         configuration = ShinobiMonitorOrm.filter_only_supported_keys(configuration)
         ShinobiMonitorOrm.validate_configuration(configuration)
-        if self.get(monitor_id):
+        if self._get(monitor_id):
             raise ShinobiMonitorAlreadyExistsError(monitor_id)
 
         self._configure(monitor_id, configuration)
 
-        retrieved_monitor = None
-
-        def retrieve_monitor():
-            nonlocal retrieved_monitor
-            retrieved_monitor = self.get(monitor_id)
-            return retrieved_monitor is not None
-
         if verify:
-            if not wait_and_verify(retrieve_monitor):
+            result = self._poll(lambda: self._get(monitor_id), lambda monitor: monitor is not None)
+            if not result.converged:
                 raise RuntimeError(f"Could not create monitor \"{monitor_id}\" with configuration: ${configuration}")
-            assert retrieved_monitor is not None
+            return result.value
         else:
-            retrieved_monitor = self.get(monitor_id)
-
-        return retrieved_monitor
+            return self._get(monitor_id)
 
+    @profiled("monitor.modify")
+    @accepts_deadline("monitor.modify")
     def modify(self, monitor_id: str, configuration: Dict, verify: bool = True) -> bool:
         """
         Modified a monitor with the given ID with the given configuration.
         :param monitor_id: ID of the monitor
-        :param configuration: updated configuration of the monitor
+        :param configuration: updated configuration of the monitor (fields that are not given keep their current values)
         :param verify: wait and verify that the monitor has been modified if `True`
         :return: `True` if the monitor has been modified
         :raises ShinobiMonitorDoesNotExistError: raised if a monitor with the given ID does not exist
         """
         configuration = ShinobiMonitorOrm.filter_only_supported_keys(configuration)
         ShinobiMonitorOrm.validate_configuration(configuration)
-        current_configuration = self.get(monitor_id)
+        current_configuration = self._get(monitor_id)
         if not current_configuration:
             raise ShinobiMonitorDoesNotExistError(monitor_id)
 
-        if not ShinobiMonitorOrm.would_configuration_change(configuration, current_configuration):
+        changes = diff_monitor_configuration(configuration, current_configuration)
+        if not changes:
             return False
 
-        self._configure(monitor_id, configuration)
+        self._configure(monitor_id, ShinobiMonitorOrm._create_patched_configuration(current_configuration, changes))
 
-        if verify and not wait_and_verify(lambda: not ShinobiMonitorOrm.would_configuration_change(
-                configuration, self.get(monitor_id))):
-            raise RuntimeError(f"Could not change configuration of monitor \"{monitor_id}\". "
-                               f"Got {self.get(monitor_id)} expected {configuration}")
+        if verify:
+            result = self._poll(
+                lambda: self._get(monitor_id),
+                lambda monitor: monitor is not None and not ShinobiMonitorOrm.would_configuration_change(
+                    configuration, monitor))
+            if not result.converged:
+                raise RuntimeError(f"Could not change configuration of monitor \"{monitor_id}\". "
+                                   f"Got {result.value} expected {configuration}")
 
         return True
 
+    @profiled("monitor.delete")
+    @accepts_deadline("monitor.delete")
     def delete(self, monitor_id: str, verify: bool = True) -> bool:
         """
         Deletes the monitor with the given ID.
@@ -267,16 +427,134 @@ class ShinobiMonitorOrm:
         """
         # Note: if we don"t do this check, Shinobi errors (and the connection hangs) if asked to remove a non-existent
         #       monitor
-        if not self.get(monitor_id):
+        if not self._get(monitor_id):
             return False
 
-        response = requests.post(f"{self.base_url}/configureMonitor/{self.group_key}/{monitor_id}/delete")
+        response = self._request("POST", "configureMonitor", f"{monitor_id}/delete")
+        self._invalidate_monitor_cache()
         raise_if_errors(response)
-        if verify and not wait_and_verify(lambda: self.get(monitor_id) is None):
+        if verify and not self._poll(lambda: self._get(monitor_id), lambda monitor: monitor is None).converged:
             raise RuntimeError(f"Could not delete monitor: {monitor_id}")
 
         return True
 
+    @profiled("monitor.apply_many")
+    @accepts_deadline("monitor.apply_many")
+    def apply_many(self, configurations: Dict[str, Dict], verify: bool = True,
+                   max_workers: int = DEFAULT_APPLY_WORKERS) -> Dict[str, MonitorApplyResult]:
+        """
+        Applies the given configurations to the monitors with the given IDs, creating monitors that do not exist and
+        modifying those whose configuration would change.
+
+        Existing monitors are read once, the required writes are made concurrently and then all the changes are
+        verified together. Failure to apply one monitor's configuration does not stop the others from being applied.
+        If the deadline passes while verifying, the results are still returned, with the error set on the results of
+        the monitors that could not be verified.
+        :param configurations: map of monitor ID to the monitor's configuration
+        :param verify: wait and verify that all the monitors have been created/modified if `True`
+        :param max_workers: maximum number of writes to make concurrently
+        :return: map of monitor ID to the result of applying the monitor's configuration
+        """
+        existing_monitors = {monitor["mid"]: monitor for monitor in self._get_all()}
+
+        results: Dict[str, MonitorApplyResult] = {}
+        to_write: Dict[str, Dict] = {}
+        for monitor_id, configuration in configurations.items():
+            existing_monitor = existing_monitors.get(monitor_id)
+            action = MonitorApplyAction.CREATE if existing_monitor is None else MonitorApplyAction.MODIFY
+            results[monitor_id] = MonitorApplyResult(monitor_id, action)
+            try:
+                if action == MonitorApplyAction.CREATE and "-" in monitor_id:
+                    # Shinobi silently removes dashes so just making them illegal
+                    raise ValueError("\"monitor_id\" cannot contain \"-\"")
+                configuration = ShinobiMonitorOrm.filter_only_supported_keys(configuration)
+                ShinobiMonitorOrm.validate_configuration(configuration)
+            except ValueError as e:
+                results[monitor_id].error = e
+                continue
+            if action == MonitorApplyAction.MODIFY:
+                changes = diff_monitor_configuration(configuration, existing_monitor)
+                results[monitor_id].changes = changes
+                if not changes:
+                    results[monitor_id].action = MonitorApplyAction.NONE
+                    continue
+                configuration = ShinobiMonitorOrm._create_patched_configuration(existing_monitor, changes)
+            to_write[monitor_id] = configuration
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            configure = in_current_context(self._configure)
+            futures = {monitor_id: executor.submit(configure, monitor_id, configuration)
+                       for monitor_id, configuration in to_write.items()}
+        for monitor_id, future in futures.items():
+            error = future.exception()
+            if error is not None:
+                results[monitor_id].error = error
+                del to_write[monitor_id]
+
+        if verify and len(to_write) > 0:
+            def is_applied(monitor_id: str, monitors: Dict[str, Dict]) -> bool:
+                monitor = monitors.get(monitor_id)
+                return monitor is not None \
+                    and not ShinobiMonitorOrm.would_configuration_change(to_write[monitor_id], monitor)
+
+            # Kept outside of polling so that what was verified is known if the deadline passes
+            probed_monitors: Dict[str, Dict] = {}
+
+            def probe() -> Dict[str, Dict]:
+                nonlocal probed_monitors
+                probed_monitors = {monitor["mid"]: monitor for monitor in self._get_all()}
+                return probed_monitors
+
+            timeout_error = None
+            try:
+                self._poll(probe, lambda monitors: all(is_applied(monitor_id, monitors) for monitor_id in to_write))
+            except ShinobiTimeoutError as e:
+                timeout_error = e
+            for monitor_id in to_write:
+                results[monitor_id].verified = is_applied(monitor_id, probed_monitors)
+                if not results[monitor_id].verified:
+                    results[monitor_id].error = timeout_error
+
+        return results
+
+    @profiled("monitor.check_drift")
+    @accepts_deadline("monitor.check_drift")
+    def check_drift(self, configurations: Dict[str, Dict]) -> Set[str]:
+        """
+        Determines which of the monitors with the given IDs have drifted from the given configurations, i.e. would
+        change if the configurations were applied, or do not exist.
+
+        All of the user's monitors are read with one request, then compared by fingerprint (see
+        `fingerprint_configuration`).
+        :param configurations: map of monitor ID to the monitor's desired configuration
+        :return: IDs of the monitors that have drifted
+        """
+        return ShinobiMonitorOrm._find_drifted(configurations, self._get_all())
+
+    def _get(self, monitor_id: str) -> Optional[ShinobiMonitor]:
+        """
+        Gets the monitor with the given ID from Shinobi (never from the cache).
+        :param monitor_id: ID of the monitor to get
+        :return: details about the monitor else `None` if not found
+        """
+        response = self._request("GET", "monitor", monitor_id)
+        return ShinobiMonitorOrm._parse_get_response(decode(response, ok_if_missing=True).payload)
+
+    def _get_all(self) -> Tuple[ShinobiMonitor, ...]:
+        """
+        Gets details about all monitors from Shinobi (never from the cache).
+        :return: monitors
+        """
+        response = self._request("GET", "monitor")
+        return ShinobiMonitorOrm._parse_get_all_response(decode(response, ok_if_missing=True).payload)
+
+    def _invalidate_monitor_cache(self):
+        """
+        Invalidates the group's entries in the client's monitor cache (if it has one), after a monitor has been changed.
+        """
+        if self.shinobi_client.monitor_cache is not None:
+            self.shinobi_client.monitor_cache.invalidate(self.group_key)
+
     def _configure(self, monitor_id: str, configuration: Dict):
         """
         Configures the monitor with the given ID with the given configuration.
@@ -285,8 +563,66 @@ class ShinobiMonitorOrm:
         :param monitor_id: ID of the monitor
         :param configuration: configuration of the monitor
         """
-        # Note: Shinobi used to represent "details" as a JSON dumped string but now needs to be JSON
-        configuration["details"] = ShinobiMonitorOrm._parse_details(configuration["details"])
-        response = requests.post(f"{self.base_url}/configureMonitor/{self.group_key}/{monitor_id}",
-                                 json=dict(data=configuration))
+        response = self._request(
+            "POST", "configureMonitor", monitor_id, json=ShinobiMonitorOrm._create_configure_payload(configuration))
+        self._invalidate_monitor_cache()
         raise_if_errors(response)
+
+    def _request(self, method: str, endpoint: str, path: Optional[str] = None, **kwargs) -> Response:
+        """
+        Makes a request to an endpoint of the user's group, logging in again (once) if the user's API key is rejected,
+        e.g. as it came from an expired cached login.
+        :param method: HTTP method
+        :param endpoint: endpoint to request (e.g. `monitor`)
+        :param path: path to request under the group's endpoint
+        :param kwargs: key word arguments to pass to the transport
+        :return: response from Shinobi
+        :raises ShinobiNotAuthorizedError: raised if the API key is rejected after logging in again
+        """
+        for attempt in range(2):
+            api_key = self.api_key
+            url = f"{self.base_url}/{endpoint}/{self.group_key}" + (f"/{path}" if path is not None else "")
+            response = self.shinobi_client.transport.request(method, url, **kwargs)
+            if not is_not_authorized(response):
+                return response
+            if attempt == 0:
+                self._relogin(api_key)
+        raise ShinobiNotAuthorizedError(f"API key of user \"{self.email}\" was not authorized")
+
+    @profiled("monitor.login")
+    def _login(self, email: str, password: str, use_cache: bool = True):
+        """
+        Logs in as the given user, which the ORM then acts as.
+        :param email: user's email address
+        :param password: user's password
+        :param use_cache: whether a cached login can be used
+        :raises ShinobiWrongPasswordError: if the email and password given is incorrect
+        """
+        user = self.shinobi_client.user._get_as_user(email, password, use_cache=use_cache)
+        self._user = user
+        self.api_key = user["auth_token"]
+        self.group_key = user["ke"]
+
+    def _relogin(self, rejected_api_key: str):
+        """
+        Logs in again, without using a cached login, after the given API key was rejected.
+        :param rejected_api_key: API key that was rejected
+        :raises ShinobiWrongPasswordError: if the user's email and password is no longer correct
+        """
+        with self._login_lock:
+            if self.api_key != rejected_api_key:
+                # Another thread has already logged in again
+                return
+            if self.shinobi_client.credential_cache is not None:
+                self.shinobi_client.credential_cache.invalidate(self.email)
+            self._login(self.email, self._password, use_cache=False)
+
+    def _poll(self, probe: Callable[[], Optional[Dict]], predicate: Callable[[Optional[Dict]], bool]) -> PollResult:
+        """
+        Polls until the probed monitor(s) satisfies the predicate, according to the client's polling policy.
+        :param probe: callable that gets the monitor(s)
+        :param predicate: callable that returns `True` if the monitor(s) is in the state being waited for
+        :return: result of polling
+        """
+        return poll(probe, predicate, policy=self.shinobi_client.poll_policy,
+                    statistics=self.shinobi_client.poll_statistics)
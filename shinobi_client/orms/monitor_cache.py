@@ -0,0 +1,174 @@
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock
+from time import monotonic
+from typing import Dict, Optional, Tuple, Any
+
+DEFAULT_MONITOR_CACHE_TTL = 5.0
+DEFAULT_MONITOR_CACHE_SIZE = 1024
+
+# Key of a group's whole inventory of monitors, rather than of a single monitor
+_INVENTORY = None
+
+
+class ShinobiMonitorCacheStatistics:
+    """
+    Counters for a monitor cache.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def record_lookup(self, hit: bool):
+        """
+        Records a lookup.
+        :param hit: whether the lookup was answered from the cache
+        """
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_eviction(self):
+        with self._lock:
+            self.evictions += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Gets a snapshot of the statistics.
+        :return: statistics, including the proportion of lookups that were hits
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                hit_ratio=self.hits / lookups if lookups else 0.0,
+                evictions=self.evictions,
+                invalidations=self.invalidations)
+
+
+class ShinobiMonitorCache:
+    """
+    Read-through cache of monitors, holding both single monitors and groups' whole inventories of monitors.
+
+    Entries expire `ttl` seconds after being cached and the least recently used entries are evicted once there are more
+    than `max_size` (an inventory counts as one entry). A group's entries are invalidated when a monitor in the group is
+    changed through the client.
+
+    Thread safe.
+    """
+    def __init__(self, ttl: float = DEFAULT_MONITOR_CACHE_TTL, max_size: int = DEFAULT_MONITOR_CACHE_SIZE):
+        """
+        Constructor.
+        :param ttl: number of seconds after being cached that an entry expires
+        :param max_size: maximum number of entries to hold
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.statistics = ShinobiMonitorCacheStatistics()
+        self._lock = Lock()
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], Tuple[float, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    def generation(self, group_key: str) -> int:
+        """
+        Gets the number of times the given group's entries have been invalidated, which should be got before getting
+        monitors from Shinobi to cache.
+        :param group_key: the group's key (`ke`)
+        :return: the group's generation
+        """
+        return self._generations.get(group_key, 0)
+
+    def lookup(self, group_key: str, monitor_id: str) -> Tuple[bool, Optional[Dict]]:
+        """
+        Looks up the monitor with the given ID, from its own entry or its group's inventory.
+        :param group_key: the group's key (`ke`)
+        :param monitor_id: ID of the monitor
+        :return: tuple where the first element is whether the monitor is cached and the second is a copy of the monitor
+                 (`None` if it is cached as not existing)
+        """
+        with self._lock:
+            found, monitor = self._get((group_key, monitor_id))
+            if not found:
+                found, inventory = self._get((group_key, _INVENTORY))
+                if found:
+                    monitor = inventory[1].get(monitor_id)
+        self.statistics.record_lookup(found)
+        return found, deepcopy(monitor)
+
+    def lookup_all(self, group_key: str) -> Optional[Tuple[Dict, ...]]:
+        """
+        Looks up all the monitors in the group with the given key.
+        :param group_key: the group's key (`ke`)
+        :return: copies of the monitors else `None` if the group's inventory is not cached
+        """
+        with self._lock:
+            found, inventory = self._get((group_key, _INVENTORY))
+        self.statistics.record_lookup(found)
+        return deepcopy(inventory[0]) if found else None
+
+    def put(self, group_key: str, monitor_id: str, monitor: Optional[Dict], generation: int):
+        """
+        Caches the monitor with the given ID.
+        :param group_key: the group's key (`ke`)
+        :param monitor_id: ID of the monitor
+        :param monitor: details about the monitor (not copied, so must not be modified afterwards), `None` if the
+                        monitor does not exist
+        :param generation: generation of the group before the monitor was got. If the group has since been invalidated,
+                           the monitor may be out of date so is not cached
+        """
+        self._put((group_key, monitor_id), monitor, generation)
+
+    def put_all(self, group_key: str, monitors: Tuple[Dict, ...], generation: int):
+        """
+        Caches all the monitors in the group with the given key.
+        :param group_key: the group's key (`ke`)
+        :param monitors: details about the monitors (not copied, so must not be modified afterwards)
+        :param generation: generation of the group before the monitors were got (see `put`)
+        """
+        self._put((group_key, _INVENTORY), (monitors, {monitor["mid"]: monitor for monitor in monitors}), generation)
+
+    def invalidate(self, group_key: str):
+        """
+        Invalidates the entries of the group with the given key, after one of its monitors has been changed.
+        :param group_key: the group's key (`ke`)
+        """
+        with self._lock:
+            self._generations[group_key] = self._generations.get(group_key, 0) + 1
+            for key in [key for key in self._entries if key[0] == group_key]:
+                del self._entries[key]
+        self.statistics.record_invalidation()
+
+    def _get(self, key: Tuple[str, Optional[str]]) -> Tuple[bool, Any]:
+        """
+        Gets the unexpired entry with the given key. Must be called with the lock held.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, entry[1]
+
+    def _put(self, key: Tuple[str, Optional[str]], value: Any, generation: int):
+        with self._lock:
+            if generation != self._generations.get(key[0], 0):
+                return
+            self._entries[key] = (monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            evictions = max(len(self._entries) - self.max_size, 0)
+            for _ in range(evictions):
+                self._entries.popitem(last=False)
+        for _ in range(evictions):
+            self.statistics.record_eviction()
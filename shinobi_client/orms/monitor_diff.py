@@ -0,0 +1,235 @@
+from copy import deepcopy
+from dataclasses import dataclass
+from hashlib import sha256
+from typing import Dict, Any, Tuple, Iterator, List, Set
+
+from shinobi_client._common import dumps_canonical
+from shinobi_client.orms.monitor_record import parse_details
+
+# Keys of a monitor's configuration that Shinobi stores as integers (blank values are stored as 0)
+INTEGER_KEYS = frozenset({"port", "fps", "width", "height"})
+
+# Marks a key that is not in the existing configuration
+_MISSING = object()
+# Types of values that are already normalised
+_NORMALISED_TYPES = frozenset({str, type(None)})
+
+
+def normalise_value(value: Any) -> Any:
+    """
+    Normalises a value in a monitor's configuration to the form that Shinobi stores it in, so that equivalent values
+    (e.g. `25` and `"25"`) compare equal.
+    :param value: value to normalise (not modified)
+    :return: normalised value (may not be a copy)
+    """
+    if type(value) is str or value is None:
+        return value
+    if isinstance(value, dict):
+        # Note: most objects only contain strings, which are already normalised (checking types without a Python loop)
+        if set(map(type, value.values())) <= _NORMALISED_TYPES:
+            return value
+        return {key: normalise_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalise_value(item) for item in value]
+    if isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    # Values are posted from forms, so Shinobi stores them as strings
+    return str(value)
+
+
+def normalise_configuration(configuration: Dict) -> Dict:
+    """
+    Normalises a monitor's configuration to the form that Shinobi stores it in, with parsed details.
+    :param configuration: configuration to normalise (not modified)
+    :return: normalised configuration
+    :raises ValueError: if the configuration's details are not a JSON object
+    """
+    return {key: _normalise_field(key, value) for key, value in configuration.items()}
+
+
+def select_fields(normalised_configuration: Dict, fields: Dict) -> Dict:
+    """
+    Selects only the given fields of a normalised configuration, recursing into JSON objects (e.g. `details`).
+
+    Fields that are not in the configuration are not selected.
+    :param normalised_configuration: normalised configuration to select from (not modified)
+    :param fields: (normalised) configuration with the fields to select
+    :return: selected fields (may not be a copy)
+    """
+    nested_keys = [key for key, value in fields.items()
+                   if type(value) is dict and type(normalised_configuration.get(key)) is dict] \
+        if dict in set(map(type, fields.values())) else []
+    if len(nested_keys) == 0 and fields.keys() >= normalised_configuration.keys():
+        return normalised_configuration
+    selected = {key: normalised_configuration[key] for key in fields.keys() & normalised_configuration.keys()}
+    for key in nested_keys:
+        selected[key] = select_fields(normalised_configuration[key], fields[key])
+    return selected
+
+
+def fingerprint_normalised_configuration(normalised_configuration: Dict) -> str:
+    """
+    Computes the canonical fingerprint of a normalised configuration: a hash of its canonical JSON encoding.
+    :param normalised_configuration: normalised configuration
+    :return: fingerprint (hex digest)
+    """
+    return sha256(dumps_canonical(normalised_configuration)).hexdigest()
+
+
+@dataclass(frozen=True)
+class MonitorConfigurationChange:
+    """
+    Change to a single field of a monitor's configuration.
+
+    `path` is the key of the field, followed by the keys of any nested field (e.g. `("details", "muser")`). `old` is
+    `None` if the field is being added.
+    """
+    path: Tuple[str, ...]
+    old: Any
+    new: Any
+    added: bool = False
+
+    @property
+    def key(self) -> str:
+        return ".".join(self.path)
+
+    def __str__(self) -> str:
+        if self.added:
+            return f"+ {self.key} = {self.new!r}"
+        return f"~ {self.key}: {self.old!r} -> {self.new!r}"
+
+
+@dataclass(frozen=True)
+class MonitorConfigurationDiff:
+    """
+    Field level changes that would be made to a monitor's configuration.
+
+    Falsy if there are no changes. Fields that are not in the new configuration do not change.
+    """
+    changes: Tuple[MonitorConfigurationChange, ...] = ()
+
+    @property
+    def has_changes(self) -> bool:
+        return len(self.changes) > 0
+
+    @property
+    def changed_keys(self) -> Set[str]:
+        """
+        Top level keys of the configuration that would change.
+        """
+        return {change.path[0] for change in self.changes}
+
+    def to_patch(self) -> Dict:
+        """
+        Gets the changes as a (nested) configuration, containing only the fields that would change.
+        :return: configuration patch
+        """
+        patch: Dict = {}
+        for change in self.changes:
+            target = patch
+            for key in change.path[:-1]:
+                target = target.setdefault(key, {})
+            target[change.path[-1]] = deepcopy(change.new)
+        return patch
+
+    def apply_to(self, configuration: Dict) -> Dict:
+        """
+        Applies the changes to the given configuration.
+        :param configuration: configuration to apply the changes to (not modified)
+        :return: changed configuration, with parsed details
+        """
+        changed = {key: deepcopy(value) for key, value in configuration.items()}
+        if "details" in changed:
+            changed["details"] = parse_details(changed["details"])
+        for change in self.changes:
+            target = changed
+            for key in change.path[:-1]:
+                if not isinstance(target.get(key), dict):
+                    target[key] = {}
+                target = target[key]
+            target[change.path[-1]] = deepcopy(change.new)
+        return changed
+
+    def __bool__(self) -> bool:
+        return self.has_changes
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def __iter__(self) -> Iterator[MonitorConfigurationChange]:
+        return iter(self.changes)
+
+    def __str__(self) -> str:
+        return "\n".join(str(change) for change in self.changes)
+
+
+def diff_monitor_configuration(configuration: Dict, existing_configuration: Dict) -> MonitorConfigurationDiff:
+    """
+    Determines the field level changes that would be made to the existing configuration if Shinobi is given the new
+    configuration.
+
+    Values are compared in the form that Shinobi stores them and `details` are compared field by field. Fields that
+    are missing from the new configuration either take default values or will not change, so are not changes.
+    :param configuration: new configuration (not modified)
+    :param existing_configuration: existing configuration (not modified)
+    :return: changes that would be made
+    :raises ValueError: if the details of either configuration are not a JSON object
+    """
+    changes = []
+    for key, value in configuration.items():
+        existing_value = existing_configuration.get(key, _MISSING)
+        if key == "details":
+            details = parse_details(value)
+            existing_details = parse_details(existing_value) if existing_value is not _MISSING else _MISSING
+            _diff_values(("details", ), details, existing_details, changes)
+        elif existing_value is _MISSING:
+            changes.append(MonitorConfigurationChange((key, ), None, value, added=True))
+        elif _normalise_field(key, value) != _normalise_field(key, existing_value):
+            changes.append(MonitorConfigurationChange((key, ), existing_value, value))
+    return MonitorConfigurationDiff(tuple(changes))
+
+
+def _diff_values(path: Tuple[str, ...], value: Any, existing_value: Any,
+                 changes: List[MonitorConfigurationChange]):
+    """
+    Adds the changes from the existing value to the new value to the given list, recursing into JSON objects.
+    """
+    if existing_value is _MISSING:
+        changes.append(MonitorConfigurationChange(path, None, value, added=True))
+    elif isinstance(value, dict) and isinstance(existing_value, dict):
+        for key, item in value.items():
+            _diff_values(path + (key, ), item, existing_value.get(key, _MISSING), changes)
+    elif normalise_value(value) != normalise_value(existing_value):
+        changes.append(MonitorConfigurationChange(path, existing_value, value))
+
+
+def _normalise_field(key: str, value: Any) -> Any:
+    """
+    Normalises the value of the top level field of a monitor's configuration with the given key.
+    """
+    if key == "details":
+        return normalise_value(parse_details(value))
+    if key in INTEGER_KEYS:
+        return _normalise_integer(value)
+    return None if value is None else str(value)
+
+
+def _normalise_integer(value: Any) -> Any:
+    """
+    Normalises a value that Shinobi stores as an integer.
+    """
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, int):
+        return value
+    text = "" if value is None else str(value).strip()
+    if text == "":
+        return 0
+    try:
+        return int(text)
+    except ValueError:
+        return text
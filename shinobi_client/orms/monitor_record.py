@@ -0,0 +1,177 @@
+from copy import deepcopy
+from typing import Dict, Union, Any, Iterator, Tuple, Iterable
+
+from shinobi_client._common import loads
+
+# Keys in Shinobi's responses that are not details about the monitor
+_HIDDEN_KEYS = frozenset({"ok"})
+
+
+def parse_details(details: Union[Dict, str]) -> Dict:
+    """
+    Parses the details out of the given details.
+    :param details: representation of configuration details
+    :return: parsed details (may not be a copy)
+    :raises ValueError: if the parsed details are not a dictionary
+    """
+    # Note: in older versions of Shinobi the details were stored in a JSON dumped string.
+    #       Newer config is in JSON.
+    parsed_details = loads(details) if isinstance(details, str) else details
+    if not isinstance(parsed_details, dict):
+        raise ValueError(f"Details is not a valid JSON object: {parsed_details}")
+    return parsed_details
+
+
+class ShinobiMonitor(dict):
+    """
+    Details about a monitor, as returned by Shinobi.
+
+    A dictionary (with the monitor's ID also available as `id`) that holds a shallow copy of Shinobi's decoded response,
+    which is never modified: `details` are only parsed when first accessed, and copies share them until then.
+
+    Operations on the whole monitor (e.g. `items`, comparison, `json.dumps` or `dict(monitor)`) parse `details` first,
+    so see the same values as the dictionary previously used to represent a monitor. `to_dict` gets an independent copy
+    as a plain dictionary.
+    """
+    __slots__ = ("_details_parsed", )
+
+    def __init__(self, raw: Dict):
+        """
+        Constructor.
+        :param raw: details about the monitor from Shinobi's decoded response (not copied deeply, so must not be
+                    modified afterwards)
+        """
+        super().__init__(raw)
+        for key in _HIDDEN_KEYS:
+            dict.pop(self, key, None)
+        if "id" not in raw and "mid" in raw:
+            dict.__setitem__(self, "id", raw["mid"])
+        self._details_parsed = "details" not in raw
+
+    def to_dict(self) -> Dict:
+        """
+        Gets the monitor as a dictionary.
+        :return: independent copy of the monitor's details
+        """
+        return {key: deepcopy(value) for key, value in self.items()}
+
+    def _parse_details(self):
+        """
+        Parses the monitor's details, if they have not already been parsed.
+        :raises ValueError: if the parsed details are not a dictionary
+        """
+        if self._details_parsed:
+            return
+        details = dict.__getitem__(self, "details")
+        # Details that are already decoded belong to the (shared) response so must be copied
+        dict.__setitem__(self, "details",
+                         parse_details(details) if isinstance(details, str) else deepcopy(parse_details(details)))
+        self._details_parsed = True
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "details":
+            self._parse_details()
+        return dict.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "details":
+            self._parse_details()
+        return dict.get(self, key, default)
+
+    def __setitem__(self, key: str, value: Any):
+        if key == "details":
+            self._details_parsed = True
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: str):
+        if key == "details":
+            self._details_parsed = True
+        dict.__delitem__(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        # Overridden so that `dict(monitor)` and `{**monitor}` get values through `__getitem__`
+        return dict.__iter__(self)
+
+    def __eq__(self, other: Any) -> bool:
+        self._parse_details()
+        if isinstance(other, ShinobiMonitor):
+            other._parse_details()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other: Any) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __or__(self, other: Any) -> Dict:
+        return dict(self.items()) | other
+
+    def __ror__(self, other: Any) -> Dict:
+        return other | dict(self.items())
+
+    def __ior__(self, other: Any) -> "ShinobiMonitor":
+        self.update(other)
+        return self
+
+    def items(self):
+        self._parse_details()
+        return dict.items(self)
+
+    def values(self):
+        self._parse_details()
+        return dict.values(self)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key == "details":
+            self._parse_details()
+        return dict.pop(self, key, *default)
+
+    def popitem(self) -> Tuple[str, Any]:
+        self._parse_details()
+        return dict.popitem(self)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key == "details":
+            self._parse_details()
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args: Union[Dict, Iterable[Tuple[str, Any]]], **kwargs: Any):
+        self._parse_details()
+        dict.update(self, *args, **kwargs)
+
+    def clear(self):
+        dict.clear(self)
+        self._details_parsed = True
+
+    def __copy__(self) -> "ShinobiMonitor":
+        return ShinobiMonitor._from_items(dict.items(self), self._details_parsed)
+
+    def __deepcopy__(self, memo: Dict) -> "ShinobiMonitor":
+        # Unparsed details belong to the (shared) response, so are copied when parsed rather than now
+        return ShinobiMonitor._from_items(
+            ((key, value if key == "details" and not self._details_parsed else deepcopy(value, memo))
+             for key, value in dict.items(self)), self._details_parsed)
+
+    def __reduce__(self):
+        return ShinobiMonitor._from_dict, (self.to_dict(), )
+
+    def __repr__(self) -> str:
+        self._parse_details()
+        return f"{type(self).__name__}({dict.__repr__(self)})"
+
+    def copy(self) -> "ShinobiMonitor":
+        return self.__copy__()
+
+    @staticmethod
+    def _from_items(items: Iterable[Tuple[str, Any]], details_parsed: bool) -> "ShinobiMonitor":
+        """
+        Creates a record with the given (already processed) items.
+        """
+        record = ShinobiMonitor.__new__(ShinobiMonitor)
+        dict.update(record, items)
+        record._details_parsed = details_parsed
+        return record
+
+    @staticmethod
+    def _from_dict(monitor: Dict) -> "ShinobiMonitor":
+        # As the dictionary has already been processed, it has parsed details
+        return ShinobiMonitor._from_items(monitor.items(), True)
@@ -2,12 +2,15 @@ import json
 from copy import deepcopy
 from dataclasses import dataclass
 
-from typing import Optional, Dict, Tuple
-
-import requests
+from typing import Optional, Dict, Tuple, Callable, Iterator
 
 from shinobi_client import ShinobiClient
-from shinobi_client._common import raise_if_errors, ShinobiSuperUserCredentialsRequiredError, wait_and_verify
+from shinobi_client._common import raise_if_errors, ShinobiSuperUserCredentialsRequiredError, ShinobiEnvelope
+from shinobi_client._streaming import StreamedJsonArray, DEFAULT_CHUNK_SIZE
+from shinobi_client.polling import poll, PollResult
+from shinobi_client.deadlines import accepts_deadline
+from shinobi_client.profiling import profiled
+from shinobi_client.orms.user_directory import ShinobiDuplicateUserError
 
 
 @dataclass
@@ -30,7 +33,10 @@ class ShinobiUserOrm:
     """
     Shinobi user ORM.
 
-    Not thread safe.
+    Operations (other than `iter_all`) accept a keyword only `deadline`: the seconds that the operation can take in
+    total, including any verification (see `shinobi_client.deadlines`).
+
+    Thread safe.
     """
     @staticmethod
     def _create_improved_user_entry(user: Dict) -> Dict:
@@ -49,6 +55,79 @@ class ShinobiUserOrm:
             del user["ok"]
         return user
 
+    @staticmethod
+    def _create_register_payload(email: str, password: str) -> Dict:
+        """
+        Creates the payload required to register a user.
+        :param email: email address of the user
+        :param password: password for the user
+        :return: payload to post to the `registerAdmin` endpoint
+        """
+        # The required post does not align with the API documentation (https://shinobi.video/docs/api)
+        # Exploiting the undocumented API successfully used by UI.
+        # See source: https://gitlab.com/Shinobi-Systems/Shinobi/-/blob/dev/libs/webServerSuperPaths.js
+        data = {
+            "mail": email,
+            "pass": password,
+            "password_again": password,
+            "details": json.dumps({
+                "factorAuth": "0", "size": "", "days": "", "event_days": "", "log_days": "", "max_camera": "",
+                "permissions": "all", "edit_size": "1", "edit_days": "1", "edit_event_days": "1",
+                "edit_log_days": "1", "use_admin": "1", "use_aws_s3": "1", "use_whcs": "1", "use_sftp": "1",
+                "use_webdav": "1", "use_discordbot": "1", "use_ldap": "1", "aws_use_global": "0",
+                "b2_use_global": "0", "webdav_use_global": "0"})
+        }
+        return dict(data=data)
+
+    @staticmethod
+    def _create_delete_payload(user: Dict, delete_monitors: bool) -> Dict:
+        """
+        Creates the payload required to delete a user.
+        :param user: details about the user
+        :param delete_monitors: whether to also delete the user's monitors (and their videos and events)
+        :return: payload to post to the `deleteAdmin` endpoint
+        """
+        # Odd interface, defined here:
+        # https://gitlab.com/Shinobi-Systems/Shinobi/-/blob/dev/libs/webServerSuperPaths.js#L385
+        payload = dict(account={"uid": user["uid"], "ke": user["ke"], "mail": user["mail"]})
+        if delete_monitors:
+            payload.update(deleteMonitors="1", deleteVideos="1", deleteEvents="1")
+        return payload
+
+    @staticmethod
+    def _select_user_with_email(users: Tuple[Dict, ...], email: str) -> Optional[Dict]:
+        """
+        Selects the user with the given email address from the given users.
+        :param users: users to select from
+        :param email: user's email address
+        :return: the selected user else `None` if there is no user with the email address
+        :raises ShinobiDuplicateUserError: if more than one user has the email address
+        """
+        matched_users = tuple(filter(lambda user: user["mail"] == email, users))
+        if len(matched_users) > 1:
+            raise ShinobiDuplicateUserError(email)
+        if len(matched_users) == 0:
+            return None
+        return ShinobiUserOrm._create_improved_user_entry(matched_users[0])
+
+    @staticmethod
+    def _parse_login_response(json_response: Dict, email: str, password: str) -> Dict:
+        """
+        Parses Shinobi's response to a user logging in.
+        :param json_response: JSON decoded response
+        :param email: email address the user logged in with
+        :param password: password the user logged in with
+        :return: details about the user
+        :raises ShinobiWrongPasswordError: raised if the login failed
+        """
+        if not json_response["ok"]:
+            # We can only assume this means that the password was incorrect/the user doesn't exist...
+            raise ShinobiWrongPasswordError(email, password)
+
+        user = json_response["$user"]
+        user["pass"] = password
+        return ShinobiUserOrm._create_improved_user_entry(user)
+
     @property
     def _base_url(self) -> str:
         if self.shinobi_client.super_user_token is None:
@@ -63,6 +142,8 @@ class ShinobiUserOrm:
         """
         self.shinobi_client = shinobi_client
 
+    @profiled("user.get")
+    @accepts_deadline("user.get")
     def get(self, email: str, password: str = None) -> Optional[Dict]:
         """
         Gets details about the user with the given email address.
@@ -73,53 +154,112 @@ class ShinobiUserOrm:
         """
         return self._get_as_user(email, password) if password else self._get_as_super_user(email)
 
-    def _get_as_user(self, email: str, password: str) -> Dict:
+    def _get_as_user(self, email: str, password: str, use_cache: bool = True) -> Dict:
         """
         Gets details about the user with the given email address, using the user's own credentials.
+
+        Uses the client's credential cache, if it has one, to avoid logging in.
         :param email: user's email address
         :param password: user's password
+        :param use_cache: whether a cached login can be used (the login is always cached)
         :return: details about user
         :raises ShinobiWrongPasswordError: raised if an incorrect email/password pair is supplied
         """
-        response = requests.post(
+        credential_cache = self.shinobi_client.credential_cache
+        if use_cache and credential_cache is not None:
+            user = credential_cache.get(email, password)
+            if user is not None:
+                return user
+
+        response = self.shinobi_client.transport.post(
             f"http://{self.shinobi_client.host}:{self.shinobi_client.port}/?json=true",
             data={
                 "mail": email,
                 "pass": password
             })
-        raise_if_errors(response, raise_if_json_not_ok=False)
-
-        if not response.json()["ok"]:
-            # We can only assume this means that the password was incorrect/the user doesn't exist...
-            raise ShinobiWrongPasswordError(email, password)
-
-        user = response.json()["$user"]
-        user["pass"] = password
-        return ShinobiUserOrm._create_improved_user_entry(user)
+        envelope = raise_if_errors(response, raise_if_json_not_ok=False)
+        user = ShinobiUserOrm._parse_login_response(envelope.payload, email, password)
+        if credential_cache is not None:
+            credential_cache.put(email, password, user)
+        return user
 
-    def _get_as_super_user(self, email: str) -> Optional[Dict]:
+    def _get_as_super_user(self, email: str, refresh: bool = False) -> Optional[Dict]:
         """
         Gets details about the user with the given email address, using the super user's credentials.
+
+        Uses the client's user directory, if it has one.
         :param email: user's email address
+        :param refresh: whether to refresh the user directory, even if it is not stale
         :return: details about user else `None` if the user does not exist
         """
-        # XXX: For some reason, Shinobi doesn't have an endpoint to query an individual user as superuser
-        users = self.get_all()
-        matched_users = tuple(filter(lambda user: user["mail"] == email, users))
-        assert len(matched_users) <= 1, f"More than one user found with the email address: {email}"
-        if len(matched_users) == 0:
-            return None
-        return ShinobiUserOrm._create_improved_user_entry(matched_users[0])
+        directory = self.shinobi_client.user_directory
+        if directory is None:
+            # XXX: For some reason, Shinobi doesn't have an endpoint to query an individual user as superuser
+            return ShinobiUserOrm._select_user_with_email(self._list_users(), email)
+
+        directory.refresh_using(self._list_users, force=refresh)
+        user = directory.get_by_email(email)
+        return ShinobiUserOrm._create_improved_user_entry(user) if user is not None else None
 
+    @profiled("user.get_all")
+    @accepts_deadline("user.get_all")
     def get_all(self) -> Tuple:
         """
         Gets details about all users.
         :return: tuple where each element contains details about a specific user
         """
-        response = requests.get(f"{self._base_url}/list")
-        raise_if_errors(response)
-        return tuple(ShinobiUserOrm._create_improved_user_entry(user) for user in response.json()["users"])
+        return tuple(ShinobiUserOrm._create_improved_user_entry(user) for user in self._list_users())
+
+    def iter_all(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+        """
+        Iterates details about all users, as they are received from Shinobi.
+
+        Unlike `get_all`, Shinobi's response is parsed incrementally, so only one user (and one chunk of the response)
+        need be held in memory at once. Does not use (or refresh) the client's user directory.
+        :param chunk_size: number of bytes of the response to read at once
+        :return: iterator where each element contains details about a specific user
+        """
+        with self.shinobi_client.transport.get(f"{self._base_url}/list", stream=True) as response:
+            response.raise_for_status()
+            stream = StreamedJsonArray(response.iter_content(chunk_size), key="users")
+            for user in stream:
+                yield ShinobiUserOrm._create_improved_user_entry(user)
+        if stream.value is not None:
+            envelope = ShinobiEnvelope.from_payload(stream.value)
+            if not envelope.ok:
+                raise RuntimeError(envelope.msg if envelope.msg is not None else envelope.payload)
+
+    def _list_users(self) -> Tuple[Dict, ...]:
+        """
+        Lists all users, refreshing the client's user directory (if it has one).
+        :return: details about all users, as listed by Shinobi
+        """
+        directory = self.shinobi_client.user_directory
+        generation = directory.generation if directory is not None else None
+        response = self.shinobi_client.transport.get(f"{self._base_url}/list")
+        users = tuple(raise_if_errors(response).payload["users"])
+        if directory is not None:
+            directory.refresh(users, generation)
+        return users
+
+    def _invalidate_user_directory(self):
+        """
+        Invalidates the client's user directory (if it has one), after a user has been changed.
+        """
+        if self.shinobi_client.user_directory is not None:
+            self.shinobi_client.user_directory.invalidate()
 
+    def _invalidate_credential_cache(self, email: str):
+        """
+        Invalidates the cached logins of the user with the given email address (if the client has a credential cache),
+        after the user's password has been changed or the user has been deleted.
+        :param email: user's email address
+        """
+        if self.shinobi_client.credential_cache is not None:
+            self.shinobi_client.credential_cache.invalidate(email)
+
+    @profiled("user.create")
+    @accepts_deadline("user.create")
     def create(self, email: str, password: str, verify: bool = True) -> Dict:
         """
         Creates a user with the given details.
@@ -132,30 +272,19 @@ class ShinobiUserOrm:
         if self.get(email):
             raise ShinobiUserAlreadyExistsError(email)
 
-        # The required post does not align with the API documentation (https://shinobi.video/docs/api)
-        # Exploiting the undocumented API successfully used by UI.
-        # See source: https://gitlab.com/Shinobi-Systems/Shinobi/-/blob/dev/libs/webServerSuperPaths.js
-        data = {
-            "mail": email,
-            "pass": password,
-            "password_again": password,
-            "details": json.dumps({
-                "factorAuth": "0", "size": "", "days": "", "event_days": "", "log_days": "", "max_camera": "",
-                "permissions": "all", "edit_size": "1", "edit_days": "1", "edit_event_days": "1",
-                "edit_log_days": "1", "use_admin": "1", "use_aws_s3": "1", "use_whcs": "1", "use_sftp": "1",
-                "use_webdav": "1", "use_discordbot": "1", "use_ldap": "1", "aws_use_global": "0",
-                "b2_use_global": "0", "webdav_use_global": "0"})
-        }
-        response = requests.post(f"{self._base_url}/registerAdmin", json=dict(data=data))
-        raise_if_errors(response)
-        create_user = response.json()
+        response = self.shinobi_client.transport.post(
+            f"{self._base_url}/registerAdmin", json=ShinobiUserOrm._create_register_payload(email, password))
+        self._invalidate_user_directory()
+        create_user = raise_if_errors(response).payload
 
-        if verify:
-            if not wait_and_verify(lambda: self.get(email) is not None):
-                raise RuntimeError("Unable to verify created user")
+        if verify and not self._poll(
+                lambda: self._get_as_super_user(email, refresh=True), lambda user: user is not None).converged:
+            raise RuntimeError("Unable to verify created user")
 
         return ShinobiUserOrm._create_improved_user_entry(create_user["user"])
 
+    @profiled("user.modify")
+    @accepts_deadline("user.modify")
     def modify(self, email: str, *, password: str) -> bool:
         """
         Modify a user.
@@ -164,7 +293,8 @@ class ShinobiUserOrm:
         :return: whether the user was modified
         """
         try:
-            user = self.get(email, password)
+            # Not using a cached login, as the password may have been changed elsewhere
+            user = self._get_as_user(email, password, use_cache=False)
             # The user can't be none as otherwise their credentials shouldn't have worked at getting the user's details
             assert user is not None
             return False
@@ -185,35 +315,56 @@ class ShinobiUserOrm:
             "uid": user["uid"],
             "ke": user["ke"]
         }
-        response = requests.post(f"{self._base_url}/editAdmin", json=dict(data=data, account=account))
+        response = self.shinobi_client.transport.post(
+            f"{self._base_url}/editAdmin", json=dict(data=data, account=account))
+        self._invalidate_user_directory()
+        self._invalidate_credential_cache(email)
         raise_if_errors(response)
 
         return True
 
-    def delete(self, email: str, verify: bool = True) -> bool:
+    @profiled("user.delete")
+    @accepts_deadline("user.delete")
+    def delete(self, email: str, verify: bool = True, delete_monitors: bool = False) -> bool:
         """
         Deletes the user with the given email address.
         :param email: email address of user
         :param verify: whether to wait to confirm that the user has been deleted
+        :param delete_monitors: whether to also delete the user's monitors (which Shinobi otherwise keeps)
         :return: `True` if the user has been deleted, else `False` if they haven't because they didn't exist
         """
         user = self.get(email)
         if user is None:
             return False
 
-        account = {
-            "uid": user["uid"],
-            "ke": user["ke"],
-            "mail": email
-        }
-
-        # Odd interface, defined here:
-        # https://gitlab.com/Shinobi-Systems/Shinobi/-/blob/dev/libs/webServerSuperPaths.js#L385
-        response = requests.post(f"{self._base_url}/deleteAdmin", json=dict(account=account))
-        raise_if_errors(response)
+        self._delete(user, delete_monitors)
 
-        if verify:
-            if not wait_and_verify(lambda: self.get(email) is None):
-                raise RuntimeError(f"User with email \"{email}\" was not deleted")
+        if verify and not self._poll(
+                lambda: self._get_as_super_user(email, refresh=True), lambda user: user is None).converged:
+            raise RuntimeError(f"User with email \"{email}\" was not deleted")
 
         return True
+
+    def _delete(self, user: Dict, delete_monitors: bool):
+        """
+        Deletes the given user, without verifying.
+        :param user: details about the user
+        :param delete_monitors: whether to also delete the user's monitors
+        """
+        response = self.shinobi_client.transport.post(
+            f"{self._base_url}/deleteAdmin", json=ShinobiUserOrm._create_delete_payload(user, delete_monitors))
+        self._invalidate_user_directory()
+        self._invalidate_credential_cache(user["mail"])
+        if delete_monitors and self.shinobi_client.monitor_cache is not None:
+            self.shinobi_client.monitor_cache.invalidate(user["ke"])
+        raise_if_errors(response)
+
+    def _poll(self, probe: Callable[[], Optional[Dict]], predicate: Callable[[Optional[Dict]], bool]) -> PollResult:
+        """
+        Polls until the probed user satisfies the predicate, according to the client's polling policy.
+        :param probe: callable that gets the user
+        :param predicate: callable that returns `True` if the user is in the state being waited for
+        :return: result of polling
+        """
+        return poll(probe, predicate, policy=self.shinobi_client.poll_policy,
+                    statistics=self.shinobi_client.poll_statistics)
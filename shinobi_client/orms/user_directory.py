@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Iterable, Optional, Tuple, FrozenSet
+
+DEFAULT_USER_DIRECTORY_TTL = 30.0
+
+
+@dataclass
+class ShinobiDuplicateUserError(AssertionError):
+    """
+    Raised if more than one user has the email address looked up (Shinobi does not enforce unique email addresses).
+    """
+    email: str
+
+    def __str__(self) -> str:
+        return f"More than one user found with the email address: {self.email}"
+
+
+class ShinobiUserDirectory:
+    """
+    In-memory directory of Shinobi users, indexed by email address, user ID (`uid`) and group key (`ke`).
+
+    Populated from a single list of all users and considered stale once `ttl` seconds have passed, or once it has been
+    invalidated (e.g. after a user has been created, modified or deleted). Lookups are constant time.
+
+    Thread safe.
+    """
+    def __init__(self, ttl: float = DEFAULT_USER_DIRECTORY_TTL):
+        """
+        Constructor.
+        :param ttl: number of seconds after being refreshed that the directory becomes stale
+        """
+        self.ttl = ttl
+        self._lock = Lock()
+        self._refresh_lock = Lock()
+        self._generation = 0
+        self._refreshed_at: Optional[float] = None
+        self._by_email: Dict[str, Dict] = {}
+        self._duplicate_emails: FrozenSet[str] = frozenset()
+        self._by_uid: Dict[str, Dict] = {}
+        self._by_group_key: Dict[str, Tuple[Dict, ...]] = {}
+
+    @property
+    def is_stale(self) -> bool:
+        refreshed_at = self._refreshed_at
+        return refreshed_at is None or monotonic() - refreshed_at >= self.ttl
+
+    @property
+    def generation(self) -> int:
+        """
+        Number of times the directory has been invalidated, which should be got before listing users to refresh it.
+        """
+        return self._generation
+
+    def refresh(self, users: Iterable[Dict], generation: Optional[int] = None):
+        """
+        Replaces the contents of the directory with the given users.
+        :param users: details about all users, as listed by Shinobi (not copied, so must not be modified afterwards)
+        :param generation: generation of the directory before the users were listed. If the directory has since been
+                           invalidated, the users may be out of date so the directory remains stale
+        """
+        by_email = {}
+        duplicate_emails = set()
+        by_uid = {}
+        by_group_key = {}
+        for user in users:
+            if user["mail"] in by_email:
+                # Only an error if the email address is looked up
+                duplicate_emails.add(user["mail"])
+            by_email[user["mail"]] = user
+            by_uid[user["uid"]] = user
+            by_group_key.setdefault(user["ke"], []).append(user)
+        for email in duplicate_emails:
+            del by_email[email]
+
+        with self._lock:
+            self._by_email = by_email
+            self._duplicate_emails = frozenset(duplicate_emails)
+            self._by_uid = by_uid
+            self._by_group_key = {group_key: tuple(users) for group_key, users in by_group_key.items()}
+            if generation is None or generation == self._generation:
+                self._refreshed_at = monotonic()
+
+    def refresh_using(self, list_users: Callable[[], None], force: bool = False):
+        """
+        Refreshes the directory, if stale, using the given callable.
+
+        Concurrent refreshes are coalesced: callers waiting on a refresh that completes after they called do not list
+        users again.
+        :param list_users: callable that lists users and then refreshes this directory with them
+        :param force: whether to refresh the directory even if it is not stale
+        """
+        requested_at = monotonic()
+        if not force and not self.is_stale:
+            return
+        with self._refresh_lock:
+            refreshed_at = self._refreshed_at
+            if refreshed_at is not None and refreshed_at >= requested_at:
+                return
+            if not force and not self.is_stale:
+                return
+            list_users()
+
+    def invalidate(self):
+        """
+        Marks the directory as stale, so that it is refreshed before it is next used.
+        """
+        with self._lock:
+            self._generation += 1
+            self._refreshed_at = None
+
+    def get_by_email(self, email: str) -> Optional[Dict]:
+        """
+        Gets the user with the given email address.
+        :param email: user's email address
+        :return: details about the user (not a copy) else `None` if the user is not in the directory
+        :raises ShinobiDuplicateUserError: if more than one user has the email address
+        """
+        with self._lock:
+            user, duplicate_emails = self._by_email.get(email), self._duplicate_emails
+        if email in duplicate_emails:
+            raise ShinobiDuplicateUserError(email)
+        return user
+
+    def get_by_uid(self, uid: str) -> Optional[Dict]:
+        """
+        Gets the user with the given user ID.
+        :param uid: user's ID
+        :return: details about the user (not a copy) else `None` if the user is not in the directory
+        """
+        return self._by_uid.get(uid)
+
+    def get_by_group_key(self, group_key: str) -> Tuple[Dict, ...]:
+        """
+        Gets the users in the group with the given key.
+        :param group_key: the group's key (`ke`)
+        :return: details about the users in the group (not copies)
+        """
+        return self._by_group_key.get(group_key, ())
@@ -0,0 +1,197 @@
+import asyncio
+import random
+from dataclasses import dataclass, replace
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable, Awaitable, TypeVar, Generic, Optional, Dict, Tuple
+
+from shinobi_client.deadlines import get_deadline_scope, deadline_phase, DeadlineScope
+
+T = TypeVar("T")
+
+# Phase of an operation reported if its deadline passes while polling (typically to verify a change)
+_DEADLINE_PHASE = "polling"
+
+
+@dataclass(frozen=True)
+class PollPolicy:
+    """
+    Policy that determines how often, and for how long, to poll for a state to converge.
+
+    The interval between polls starts at `initial_interval` and is multiplied by `multiplier` after each poll, up to
+    `max_interval`. Each interval is randomly varied by up to `jitter` (a fraction of the interval) so that many callers
+    polling at once do not do so in lock-step. Polling stops once `deadline` seconds have passed since it started.
+    """
+    initial_interval: float = 0.1
+    max_interval: float = 2.0
+    multiplier: float = 2.0
+    jitter: float = 0.2
+    deadline: float = 10.0
+
+    def interval(self, attempt: int) -> float:
+        """
+        Gets the interval to wait after the given attempt.
+        :param attempt: number of the attempt that has just been made (starting at 1)
+        :return: interval in seconds
+        """
+        interval = min(self.initial_interval * self.multiplier ** (attempt - 1), self.max_interval)
+        return max(0.0, interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+@dataclass
+class PollResult(Generic[T]):
+    """
+    Result of polling.
+    """
+    converged: bool
+    value: Optional[T]
+    attempts: int
+    elapsed: float
+
+
+class PollStatistics:
+    """
+    Counters for polling, which can be shared between many concurrent pollers.
+    """
+    def __init__(self):
+        self._lock = Lock()
+        self.polls = 0
+        self.converged = 0
+        self.timed_out = 0
+        self.attempts = 0
+        self.probe_seconds = 0.0
+        self.elapsed_seconds = 0.0
+
+    def record_attempt(self, probe_seconds: float):
+        """
+        Records an attempt.
+        :param probe_seconds: time the probe took
+        """
+        with self._lock:
+            self.attempts += 1
+            self.probe_seconds += probe_seconds
+
+    def record_poll(self, result: PollResult):
+        """
+        Records the result of a complete poll.
+        :param result: result of the poll
+        """
+        with self._lock:
+            self.polls += 1
+            if result.converged:
+                self.converged += 1
+            else:
+                self.timed_out += 1
+            self.elapsed_seconds += result.elapsed
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Gets a snapshot of the statistics.
+        :return: statistics, including the mean number of attempts per poll
+        """
+        with self._lock:
+            return dict(
+                polls=self.polls,
+                converged=self.converged,
+                timed_out=self.timed_out,
+                attempts=self.attempts,
+                attempts_per_poll=self.attempts / self.polls if self.polls else 0.0,
+                probe_seconds=self.probe_seconds,
+                elapsed_seconds=self.elapsed_seconds)
+
+
+def poll(probe: Callable[[], T], predicate: Callable[[T], bool] = bool, policy: PollPolicy = PollPolicy(),
+         statistics: PollStatistics = None) -> PollResult[T]:
+    """
+    Polls until the value returned by the probe satisfies the predicate, or the policy's deadline passes.
+
+    Within a deadline scope (see `shinobi_client.deadlines`), polling also stops when the scope's deadline passes.
+    :param probe: callable that gets the current state
+    :param predicate: callable that returns `True` if the given state is the state being waited for
+    :param policy: polling policy
+    :param statistics: optional statistics to record polling in
+    :return: result of polling, including the last value probed
+    :raises ShinobiTimeoutError: if the deadline of the deadline scope passes before the state converges
+    """
+    policy, scope = _bound_by_deadline(policy)
+    with deadline_phase(_DEADLINE_PHASE):
+        started_at = monotonic()
+        attempts = 0
+        while True:
+            attempts += 1
+            probe_started_at = monotonic()
+            value = probe()
+            probed_at = monotonic()
+            if statistics is not None:
+                statistics.record_attempt(probed_at - probe_started_at)
+            converged = predicate(value)
+            remaining = policy.deadline - (probed_at - started_at)
+            if converged or remaining <= 0:
+                return _complete(PollResult(converged, value, attempts, probed_at - started_at), statistics, scope)
+            sleep(min(policy.interval(attempts), remaining))
+
+
+async def async_poll(probe: Callable[[], Awaitable[T]], predicate: Callable[[T], bool] = bool,
+                     policy: PollPolicy = PollPolicy(), statistics: PollStatistics = None) -> PollResult[T]:
+    """
+    Polls, without blocking the event loop, until the value returned by the probe satisfies the predicate, or the
+    policy's deadline passes.
+
+    Within a deadline scope (see `shinobi_client.deadlines`), polling also stops when the scope's deadline passes.
+    :param probe: coroutine function that gets the current state
+    :param predicate: callable that returns `True` if the given state is the state being waited for
+    :param policy: polling policy
+    :param statistics: optional statistics to record polling in
+    :return: result of polling, including the last value probed
+    :raises ShinobiTimeoutError: if the deadline of the deadline scope passes before the state converges
+    """
+    policy, scope = _bound_by_deadline(policy)
+    with deadline_phase(_DEADLINE_PHASE):
+        started_at = monotonic()
+        attempts = 0
+        while True:
+            attempts += 1
+            probe_started_at = monotonic()
+            value = await probe()
+            probed_at = monotonic()
+            if statistics is not None:
+                statistics.record_attempt(probed_at - probe_started_at)
+            converged = predicate(value)
+            remaining = policy.deadline - (probed_at - started_at)
+            if converged or remaining <= 0:
+                return _complete(PollResult(converged, value, attempts, probed_at - started_at), statistics, scope)
+            await asyncio.sleep(min(policy.interval(attempts), remaining))
+
+
+def _bound_by_deadline(policy: PollPolicy) -> Tuple[PollPolicy, Optional[DeadlineScope]]:
+    """
+    Bounds the policy's deadline by the deadline of the current deadline scope, if it is sooner.
+    :param policy: polling policy
+    :return: the bounded policy and the deadline scope if it bounds the policy's deadline (else `None`)
+    """
+    scope = get_deadline_scope()
+    if scope is None:
+        return policy, None
+    remaining = scope.remaining
+    if remaining <= 0:
+        raise scope.timeout_error(_DEADLINE_PHASE)
+    if remaining >= policy.deadline:
+        return policy, None
+    return replace(policy, deadline=remaining), scope
+
+
+def _complete(result: PollResult, statistics: Optional[PollStatistics],
+              scope: Optional[DeadlineScope] = None) -> PollResult:
+    """
+    Completes polling.
+    :param result: result of polling
+    :param statistics: optional statistics to record polling in
+    :param scope: deadline scope that bounds the polling deadline, if any
+    :return: the given result
+    :raises ShinobiTimeoutError: if polling did not converge before the deadline scope's deadline
+    """
+    if statistics is not None:
+        statistics.record_poll(result)
+    if not result.converged and scope is not None:
+        raise scope.timeout_error(_DEADLINE_PHASE)
+    return result
@@ -0,0 +1,246 @@
+import asyncio
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar, copy_context, Token
+from dataclasses import dataclass, field
+from functools import wraps
+from threading import Lock
+from time import perf_counter
+from typing import Optional, Dict, Tuple, Callable, TypeVar, Iterator, List, TextIO, Any
+
+from requests import Response
+
+from shinobi_client.metrics import get_endpoint_template, get_request_size, get_response_size
+
+F = TypeVar("F", bound=Callable)
+
+# Client, or transport, whose requests can be profiled
+Profileable = Any
+
+# Profiler and call tree node that requests made in the current context are attributed to
+_current: ContextVar[Optional[Tuple["ShinobiProfiler", "ProfileNode"]]] = ContextVar(
+    "shinobi_client_profile", default=None)
+# Stack of the tokens (and start times) of the profilers entered in the current context, so that each is exited in the
+# context it was entered in
+_entered: ContextVar[Tuple[Tuple[Token, float], ...]] = ContextVar("shinobi_client_profilers_entered", default=())
+
+
+@dataclass
+class ProfileNode:
+    """
+    Node in a profile's call tree: an operation (e.g. `user.create`) called within its parent operation, aggregated
+    over all of its calls.
+
+    `requests`, `request_seconds`, `request_bytes`, `response_bytes` and `endpoints` count only the requests made
+    directly by the operation, whereas their `total_` equivalents include those made by the operations it called.
+    """
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    requests: int = 0
+    request_seconds: float = 0.0
+    request_bytes: int = 0
+    response_bytes: int = 0
+    endpoints: Dict[str, int] = field(default_factory=dict)
+    children: Dict[str, "ProfileNode"] = field(default_factory=dict)
+
+    @property
+    def total_requests(self) -> int:
+        return self.requests + sum(child.total_requests for child in self.children.values())
+
+    @property
+    def total_request_seconds(self) -> float:
+        return self.request_seconds + sum(child.total_request_seconds for child in self.children.values())
+
+    @property
+    def total_bytes(self) -> int:
+        return self.request_bytes + self.response_bytes \
+            + sum(child.total_bytes for child in self.children.values())
+
+    @property
+    def total_endpoints(self) -> Dict[str, int]:
+        """
+        Number of requests made to each endpoint (template), most requested first.
+        """
+        endpoints = dict(self.endpoints)
+        for child in self.children.values():
+            for endpoint, count in child.total_endpoints.items():
+                endpoints[endpoint] = endpoints.get(endpoint, 0) + count
+        return dict(sorted(endpoints.items(), key=lambda item: (-item[1], item[0])))
+
+    def walk(self, depth: int = 0) -> Iterator[Tuple[int, "ProfileNode"]]:
+        """
+        Walks the call tree below (and including) this node, depth first.
+        :param depth: depth of this node
+        :return: iterator of the depth of each node and the node
+        """
+        yield depth, self
+        for child in self.children.values():
+            yield from child.walk(depth + 1)
+
+    def __str__(self) -> str:
+        total_requests = self.total_requests
+        endpoints = ", ".join(f"{count} {endpoint}" for endpoint, count in self.total_endpoints.items())
+        description = f"{self.name}: {total_requests} request{'' if total_requests == 1 else 's'}"
+        if total_requests > 0:
+            description += f" ({endpoints})"
+        return f"{description}, {self.calls} call{'' if self.calls == 1 else 's'} in {self.seconds * 1000:.1f}ms, " \
+               f"{self.total_request_seconds * 1000:.1f}ms in requests, {self.total_bytes / 1024:.1f}KiB transferred"
+
+
+class ShinobiProfiler(ContextDecorator):
+    """
+    Profiles the HTTP requests that clients make to Shinobi, attributing each request (and its time and bytes) to the
+    ORM operation that caused it (see `profiled`), as a call tree. Used as a context manager or decorator, e.g.
+    ```
+    with ShinobiProfiler(shinobi_client) as profiler:
+        shinobi_client.user.create(email, password)
+    print(profiler)
+    ```
+    Requests made outside of any operation are attributed to the root of the call tree. The profile accumulates if the
+    profiler is used more than once (including concurrently). Requests are only attributed in the context (thread or
+    asyncio task) that the profiler is used in and contexts created from it (see `in_current_context`).
+
+    Thread safe.
+    """
+    def __init__(self, *clients: Profileable, name: str = "profile", output: Optional[TextIO] = None):
+        """
+        Constructor.
+        :param clients: clients (sync or async), or their transports, whose requests are profiled
+        :param name: name of the root of the call tree
+        :param output: stream to write the profile to on exiting the profiler (not written if `None`)
+        """
+        self.root = ProfileNode(name)
+        self.output = output
+        self._lock = Lock()
+        for client in clients:
+            transport = getattr(client, "transport", client)
+            if _record_request not in transport.hooks:
+                transport.add_hook(_record_request)
+
+    def __enter__(self) -> "ShinobiProfiler":
+        _entered.set(_entered.get() + ((_current.set((self, self.root)), perf_counter()), ))
+        return self
+
+    def __exit__(self, *args):
+        entered = _entered.get()
+        token, started_at = entered[-1]
+        _entered.set(entered[:-1])
+        _current.reset(token)
+        with self._lock:
+            self.root.calls += 1
+            self.root.seconds += perf_counter() - started_at
+        if self.output is not None:
+            print(self, file=self.output)
+
+    def summary(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Summarises the operations that made the most requests.
+        :param limit: maximum number of operations to summarise (all if `None`)
+        :return: summary of each operation, e.g. `user.create: 12 requests (11 super/accounts/list, ...), ...`, with
+                 the operations that made the most requests first
+        """
+        with self._lock:
+            nodes = [node for _, node in self.root.walk() if node is not self.root]
+            ordered = sorted(nodes, key=lambda node: -node.total_requests)
+            return [str(node) for node in ordered[:limit]]
+
+    def __str__(self) -> str:
+        with self._lock:
+            return "\n".join(f"{'  ' * depth}{node}" for depth, node in self.root.walk())
+
+    @contextmanager
+    def _operation(self, parent: ProfileNode, name: str) -> Iterator[ProfileNode]:
+        """
+        Attributes the requests made within a `with` statement to the given operation, called within its parent.
+        """
+        with self._lock:
+            node = parent.children.get(name)
+            if node is None:
+                node = ProfileNode(name)
+                parent.children[name] = node
+            node.calls += 1
+        token = _current.set((self, node))
+        started_at = perf_counter()
+        try:
+            yield node
+        finally:
+            elapsed = perf_counter() - started_at
+            _current.reset(token)
+            with self._lock:
+                node.seconds += elapsed
+
+    def _record(self, node: ProfileNode, url: str, response: Optional[Response], elapsed: float):
+        """
+        Records a request made by the given operation.
+        """
+        endpoint = get_endpoint_template(url)
+        request_bytes = get_request_size(response) if response is not None else 0
+        response_bytes = get_response_size(response) if response is not None else 0
+        with self._lock:
+            node.requests += 1
+            node.request_seconds += elapsed
+            node.request_bytes += request_bytes
+            node.response_bytes += response_bytes
+            node.endpoints[endpoint] = node.endpoints.get(endpoint, 0) + 1
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """
+    Decorates a function (or coroutine function) as an operation, to which the requests it causes are attributed when
+    profiling (see `ShinobiProfiler`). Has negligible overhead when not profiling.
+    :param name: name of the operation, e.g. `user.create`
+    :return: decorator
+    """
+    def decorator(function: F) -> F:
+        if asyncio.iscoroutinefunction(function):
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                current = _current.get()
+                if current is None:
+                    return await function(*args, **kwargs)
+                profiler, parent = current
+                with profiler._operation(parent, name):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            current = _current.get()
+            if current is None:
+                return function(*args, **kwargs)
+            profiler, parent = current
+            with profiler._operation(parent, name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def in_current_context(function: F) -> F:
+    """
+    Wraps a function so that it runs in (a copy of) the current context, wherever it is called. Used to attribute
+    requests made in worker threads (e.g. of a `ThreadPoolExecutor`) to the operation that started the work.
+    :param function: function to wrap
+    :return: wrapped function
+    """
+    context = copy_context()
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        # Copied for each call, as a context cannot be entered by more than one thread at once
+        return context.copy().run(function, *args, **kwargs)
+
+    return wrapper
+
+
+def _record_request(method: str, url: str, response: Optional[Response], elapsed: float):
+    """
+    Transport request hook that records requests made while profiling.
+    """
+    current = _current.get()
+    if current is not None:
+        profiler, node = current
+        profiler._record(node, url, response, elapsed)
+
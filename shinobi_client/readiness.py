@@ -0,0 +1,160 @@
+import socket
+from dataclasses import dataclass, replace
+from time import monotonic
+from typing import Callable, Optional, Tuple, Sequence, Dict
+
+from shinobi_client._common import raise_if_errors, generate_random_string
+from shinobi_client.client import ShinobiClient
+from shinobi_client.polling import PollPolicy, PollStatistics, poll
+
+# Stages of readiness, in the order that they are checked: accepting TCP connections, serving HTTP, listing accounts as
+# the super user (requires the database) and answering a login (requires the database and user API)
+READINESS_STAGES = ("tcp", "http", "accounts", "login")
+
+# Polls quickly at first, as most stages become ready soon after the previous one, giving up after 5 minutes overall
+DEFAULT_READINESS_POLICY = PollPolicy(initial_interval=0.05, max_interval=1.0, multiplier=1.5, jitter=0.1,
+                                      deadline=300.0)
+
+# Maximum seconds that a single check can take
+_CHECK_TIMEOUT = 5.0
+
+
+@dataclass(frozen=True)
+class ReadinessStageResult:
+    """
+    Result of waiting for a stage of readiness.
+
+    `error` is the error from the last check if the stage did not become ready.
+    """
+    stage: str
+    ready: bool
+    attempts: int
+    elapsed: float
+    error: Optional[str] = None
+
+    def __str__(self) -> str:
+        status = "ready" if self.ready else f"not ready ({self.error})"
+        return f"{self.stage:8} {self.elapsed:8.3f}s  attempts={self.attempts:<4} {status}"
+
+
+@dataclass(frozen=True)
+class ReadinessReport:
+    """
+    Report of waiting for a Shinobi installation to become ready, with the result of each stage waited for.
+    """
+    stages: Tuple[ReadinessStageResult, ...]
+    elapsed: float
+
+    @property
+    def ready(self) -> bool:
+        return all(stage.ready for stage in self.stages)
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """
+        Seconds taken by each stage, in the order that they were waited for.
+        """
+        return {stage.stage: stage.elapsed for stage in self.stages}
+
+    def __str__(self) -> str:
+        return "\n".join([str(stage) for stage in self.stages] + [f"{'total':8} {self.elapsed:8.3f}s"])
+
+
+@dataclass
+class ShinobiNotReadyError(TimeoutError):
+    """
+    Raised if a Shinobi installation does not become ready before the deadline.
+    """
+    report: ReadinessReport
+
+    def __str__(self) -> str:
+        return f"Shinobi did not become ready within {self.report.elapsed:.1f}s:\n{self.report}"
+
+
+def wait_until_ready(shinobi_client: ShinobiClient, policy: PollPolicy = DEFAULT_READINESS_POLICY,
+                     stages: Sequence[str] = READINESS_STAGES,
+                     statistics: Optional[PollStatistics] = None) -> ReadinessReport:
+    """
+    Blocks until a Shinobi installation can serve requests, checking each stage of readiness in turn with exponential
+    backoff. The policy's deadline applies to all of the stages together.
+
+    The `accounts` stage is skipped if the client does not have a super user token.
+    :param shinobi_client: client connected to the Shinobi installation
+    :param policy: policy for polling each stage (the backoff restarts for each stage)
+    :param stages: stages to wait for, in order (see `READINESS_STAGES`)
+    :param statistics: optional statistics to record polling in
+    :return: report of the time taken by each stage
+    :raises ShinobiNotReadyError: if the installation does not become ready before the deadline
+    :raises ValueError: if a stage is not known
+    """
+    unknown_stages = [stage for stage in stages if stage not in _CHECKS]
+    if len(unknown_stages) > 0:
+        raise ValueError(f"Unknown readiness stages: {unknown_stages}")
+
+    started_at = monotonic()
+    results = []
+    for stage in stages:
+        if stage == "accounts" and shinobi_client.super_user_token is None:
+            continue
+        deadline_at = started_at + policy.deadline
+        check = _CHECKS[stage]
+
+        def attempt() -> Optional[str]:
+            try:
+                check(shinobi_client, min(_CHECK_TIMEOUT, max(deadline_at - monotonic(), 0.001)))
+                return None
+            except (OSError, ValueError, RuntimeError) as e:
+                return f"{type(e).__name__}: {e}"
+
+        stage_policy = replace(policy, deadline=max(deadline_at - monotonic(), 0.0))
+        result = poll(attempt, lambda error: error is None, policy=stage_policy, statistics=statistics)
+        results.append(ReadinessStageResult(stage, result.converged, result.attempts, result.elapsed, result.value))
+        if not result.converged:
+            raise ShinobiNotReadyError(ReadinessReport(tuple(results), monotonic() - started_at))
+
+    return ReadinessReport(tuple(results), monotonic() - started_at)
+
+
+def _check_tcp(shinobi_client: ShinobiClient, timeout: float):
+    """
+    Checks that the installation accepts TCP connections.
+    """
+    socket.create_connection((shinobi_client.host, int(shinobi_client.port)), timeout=timeout).close()
+
+
+def _check_http(shinobi_client: ShinobiClient, timeout: float):
+    """
+    Checks that the installation serves its web UI.
+    """
+    shinobi_client.transport.get(shinobi_client.url, timeout=timeout).raise_for_status()
+
+
+def _check_accounts(shinobi_client: ShinobiClient, timeout: float):
+    """
+    Checks that the installation lists accounts for the super user.
+    """
+    response = shinobi_client.transport.get(
+        f"{shinobi_client.url}/super/{shinobi_client.super_user_token}/accounts/list", timeout=timeout)
+    response.raise_for_status()
+    raise_if_errors(response)
+
+
+def _check_login(shinobi_client: ShinobiClient, timeout: float):
+    """
+    Checks that the installation answers a login (of a user that does not exist, so the login fails without side
+    effects).
+    """
+    response = shinobi_client.transport.post(
+        f"{shinobi_client.url}/?json=true", timeout=timeout,
+        data={"mail": f"readiness-{generate_random_string()}@example.com", "pass": generate_random_string()})
+    response.raise_for_status()
+    # Raises if the response is not JSON, e.g. an error page
+    raise_if_errors(response, raise_if_json_not_ok=False)
+
+
+_CHECKS: Dict[str, Callable[[ShinobiClient, float], None]] = {
+    "tcp": _check_tcp,
+    "http": _check_http,
+    "accounts": _check_accounts,
+    "login": _check_login,
+}
@@ -0,0 +1,342 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum, unique
+from typing import Dict, List, Optional, Set
+
+import toml
+
+from shinobi_client.client import ShinobiClient
+from shinobi_client.orms.monitor import ShinobiMonitorOrm, DEFAULT_APPLY_WORKERS
+from shinobi_client.orms.monitor_diff import MonitorConfigurationDiff, diff_monitor_configuration
+from shinobi_client.orms.user import ShinobiWrongPasswordError
+from shinobi_client.deadlines import accepts_deadline
+from shinobi_client.profiling import profiled, in_current_context
+
+
+@dataclass
+class DesiredUser:
+    """
+    Desired state of a user and their monitors.
+    """
+    email: str
+    password: str
+    monitors: Dict[str, Dict] = field(default_factory=dict)
+    prune_monitors: bool = False
+
+
+@dataclass
+class DesiredState:
+    """
+    Desired state of a Shinobi installation.
+
+    Users (and monitors) that are not in the desired state are only deleted if pruning is enabled.
+    """
+    users: List[DesiredUser] = field(default_factory=list)
+    prune_users: bool = False
+
+
+def load_desired_state(location: str) -> DesiredState:
+    """
+    Loads desired state from a TOML or JSON file (depending on its extension), e.g.
+    ```
+    prune_users = false
+
+    [[users]]
+    email = "user@example.com"
+    password = "password123"
+    prune_monitors = true
+
+    [users.monitors.camera1]
+    name = "Camera 1"
+    details = { ... }
+    ```
+    :param location: location of the file
+    :return: loaded desired state
+    :raises ValueError: if the desired state is invalid
+    :raises InvalidConfigurationError: if the configuration of a monitor is invalid
+    """
+    with open(location, "r") as file:
+        if os.path.splitext(location)[1].lower() == ".json":
+            raw_desired_state = json.load(file)
+        else:
+            raw_desired_state = toml.load(file)
+
+    users = []
+    for raw_user in raw_desired_state.get("users", []):
+        if "email" not in raw_user or "password" not in raw_user:
+            raise ValueError(f"Users must have an \"email\" and \"password\": {raw_user}")
+        monitors = raw_user.get("monitors", {})
+        for monitor_id, configuration in monitors.items():
+            ShinobiMonitorOrm.validate_configuration(configuration)
+        users.append(DesiredUser(raw_user["email"], raw_user["password"], monitors,
+                                 raw_user.get("prune_monitors", False)))
+
+    emails = [user.email for user in users]
+    if len(set(emails)) != len(emails):
+        raise ValueError(f"Users must only be listed once: {emails}")
+    return DesiredState(users, raw_desired_state.get("prune_users", False))
+
+
+@unique
+class ReconcileAction(Enum):
+    """
+    Action required to reconcile a user or monitor.
+
+    `APPLY` is used for monitors whose current state cannot be read before the plan is applied (e.g. as the user's
+    password is to change), which are created or modified as required.
+    """
+    CREATE = "create"
+    MODIFY = "modify"
+    DELETE = "delete"
+    APPLY = "apply"
+    NONE = "none"
+
+
+_ACTION_SYMBOLS = {
+    ReconcileAction.CREATE: "+",
+    ReconcileAction.MODIFY: "~",
+    ReconcileAction.DELETE: "-",
+    ReconcileAction.APPLY: "?",
+    ReconcileAction.NONE: "=",
+}
+
+
+@dataclass
+class PlannedChange:
+    """
+    Change to a user, or to one of a user's monitors (if `monitor_id` is set).
+
+    `configuration_changes` is set to the field level changes to be made to an existing monitor's configuration.
+    """
+    action: ReconcileAction
+    email: str
+    monitor_id: Optional[str] = None
+    configuration: Optional[Dict] = None
+    configuration_changes: Optional[MonitorConfigurationDiff] = None
+
+    def __str__(self) -> str:
+        subject = f"user {self.email}" if self.monitor_id is None else f"monitor {self.email}/{self.monitor_id}"
+        description = f"{_ACTION_SYMBOLS[self.action]} {self.action.value} {subject}"
+        if self.action == ReconcileAction.MODIFY and self.configuration_changes:
+            description += "".join(f"\n    {change}" for change in self.configuration_changes)
+        return description
+
+
+@dataclass
+class ReconciliationPlan:
+    """
+    Plan of changes required to reconcile a Shinobi installation with its desired state.
+    """
+    desired_state: DesiredState
+    changes: List[PlannedChange] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return any(change.action != ReconcileAction.NONE for change in self.changes)
+
+    def __str__(self) -> str:
+        lines = [str(change) for change in self.changes if change.action != ReconcileAction.NONE]
+        counts = {action: sum(1 for change in self.changes if change.action == action) for action in ReconcileAction}
+        lines.append(", ".join(f"{count} to {action.value}" for action, count in counts.items()
+                               if action != ReconcileAction.NONE) + f" ({counts[ReconcileAction.NONE]} unchanged)")
+        return "\n".join(lines)
+
+
+@dataclass
+class AppliedChange:
+    """
+    Result of applying a planned change.
+    """
+    change: PlannedChange
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    def __str__(self) -> str:
+        return f"{self.change}: " + ("ok" if self.succeeded else f"failed ({self.error!r})")
+
+
+class ShinobiReconciler:
+    """
+    Reconciles the users and monitors of a Shinobi installation with a desired state.
+
+    Requires super user credentials. `plan`, `apply` and `check_drift` accept a keyword only `deadline` (see
+    `shinobi_client.deadlines`), which all of the operations they make share.
+    """
+    def __init__(self, shinobi_client: ShinobiClient, max_workers: int = DEFAULT_APPLY_WORKERS):
+        """
+        Constructor.
+        :param shinobi_client: client connected to Shinobi installation
+        :param max_workers: maximum number of users to read/reconcile concurrently
+        """
+        self.shinobi_client = shinobi_client
+        self.max_workers = max_workers
+
+    @profiled("reconciler.plan")
+    @accepts_deadline("reconciler.plan")
+    def plan(self, desired_state: DesiredState) -> ReconciliationPlan:
+        """
+        Plans the changes required to reconcile Shinobi with the given desired state, without making any changes.
+
+        All users are listed once, then each existing user's monitors are read (concurrently) with one request.
+        :param desired_state: desired state
+        :return: plan of changes
+        """
+        existing_emails = {user["email"] for user in self.shinobi_client.user.get_all()}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            planned_users = executor.map(
+                in_current_context(lambda user: self._plan_user(user, user.email in existing_emails)),
+                desired_state.users)
+            changes = [change for user_changes in planned_users for change in user_changes]
+
+        if desired_state.prune_users:
+            desired_emails = {user.email for user in desired_state.users}
+            changes.extend(PlannedChange(ReconcileAction.DELETE, email)
+                           for email in sorted(existing_emails - desired_emails))
+
+        return ReconciliationPlan(desired_state, changes)
+
+    @profiled("reconciler.apply")
+    @accepts_deadline("reconciler.apply")
+    def apply(self, plan: ReconciliationPlan, verify: bool = True) -> List[AppliedChange]:
+        """
+        Applies the given plan, reconciling users (and their monitors) concurrently.
+        :param plan: plan to apply
+        :param verify: wait and verify that changes have been made if `True`
+        :return: result of applying each change
+        """
+        desired_users = {user.email: user for user in plan.desired_state.users}
+        changes_by_email: Dict[str, List[PlannedChange]] = {}
+        for change in plan.changes:
+            if change.action != ReconcileAction.NONE:
+                changes_by_email.setdefault(change.email, []).append(change)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            applied_by_user = executor.map(
+                in_current_context(
+                    lambda item: self._apply_user(desired_users.get(item[0]), item[0], item[1], verify)),
+                changes_by_email.items())
+            return [applied for applied_changes in applied_by_user for applied in applied_changes]
+
+    @profiled("reconciler.check_drift")
+    @accepts_deadline("reconciler.check_drift")
+    def check_drift(self, desired_state: DesiredState) -> Dict[str, Set[str]]:
+        """
+        Determines which monitors have drifted from the given desired state, without making any changes.
+
+        All users are listed once, then each existing user's monitors are read (concurrently) with one request and
+        compared by fingerprint. All of a user's monitors have drifted if the user does not exist or their password
+        has changed.
+        :param desired_state: desired state
+        :return: map of email address to the IDs of the user's monitors that have drifted (users without drifted
+                 monitors are omitted)
+        """
+        existing_emails = {user["email"] for user in self.shinobi_client.user.get_all()}
+
+        def check_user(desired_user: DesiredUser) -> Set[str]:
+            if desired_user.email in existing_emails:
+                try:
+                    monitor_orm = self.shinobi_client.monitor(desired_user.email, desired_user.password)
+                    return monitor_orm.check_drift(desired_user.monitors)
+                except ShinobiWrongPasswordError:
+                    pass
+            return set(desired_user.monitors.keys())
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            drifted = dict(zip((user.email for user in desired_state.users),
+                               executor.map(in_current_context(check_user), desired_state.users)))
+        return {email: monitor_ids for email, monitor_ids in drifted.items() if len(monitor_ids) > 0}
+
+    def _plan_user(self, desired_user: DesiredUser, exists: bool) -> List[PlannedChange]:
+        """
+        Plans the changes required to reconcile a user and their monitors.
+        :param desired_user: desired state of the user
+        :param exists: whether the user currently exists
+        :return: planned changes
+        """
+        email = desired_user.email
+        if not exists:
+            return [PlannedChange(ReconcileAction.CREATE, email)] + [
+                PlannedChange(ReconcileAction.CREATE, email, monitor_id, configuration)
+                for monitor_id, configuration in desired_user.monitors.items()]
+
+        try:
+            monitor_orm = self.shinobi_client.monitor(email, desired_user.password)
+        except ShinobiWrongPasswordError:
+            return [PlannedChange(ReconcileAction.MODIFY, email)] + [
+                PlannedChange(ReconcileAction.APPLY, email, monitor_id, configuration)
+                for monitor_id, configuration in desired_user.monitors.items()]
+
+        changes = [PlannedChange(ReconcileAction.NONE, email)]
+        existing_monitors = {monitor["mid"]: monitor for monitor in monitor_orm.get_all()}
+        for monitor_id, configuration in desired_user.monitors.items():
+            existing_monitor = existing_monitors.get(monitor_id)
+            configuration_changes = None
+            if existing_monitor is None:
+                action = ReconcileAction.CREATE
+            else:
+                configuration_changes = diff_monitor_configuration(
+                    ShinobiMonitorOrm.filter_only_supported_keys(configuration), existing_monitor)
+                action = ReconcileAction.MODIFY if configuration_changes else ReconcileAction.NONE
+            changes.append(PlannedChange(action, email, monitor_id, configuration, configuration_changes))
+        if desired_user.prune_monitors:
+            changes.extend(PlannedChange(ReconcileAction.DELETE, email, monitor_id)
+                           for monitor_id in sorted(existing_monitors.keys() - desired_user.monitors.keys()))
+        return changes
+
+    def _apply_user(self, desired_user: Optional[DesiredUser], email: str,
+                    changes: List[PlannedChange], verify: bool) -> List[AppliedChange]:
+        """
+        Applies the planned changes to a user and their monitors.
+        :param desired_user: desired state of the user (`None` if the user is to be deleted)
+        :param email: email address of the user
+        :param changes: planned changes to the user and their monitors
+        :param verify: wait and verify that changes have been made if `True`
+        :return: result of applying each change
+        """
+        user_change = next((change for change in changes if change.monitor_id is None), None)
+        monitor_changes = [change for change in changes if change.monitor_id is not None]
+        applied = []
+
+        if user_change is not None:
+            try:
+                if user_change.action == ReconcileAction.CREATE:
+                    self.shinobi_client.user.create(email, desired_user.password, verify=verify)
+                elif user_change.action == ReconcileAction.MODIFY:
+                    self.shinobi_client.user.modify(email, password=desired_user.password)
+                elif user_change.action == ReconcileAction.DELETE:
+                    self.shinobi_client.user.delete(email, verify=verify)
+                applied.append(AppliedChange(user_change))
+            except Exception as e:
+                applied.append(AppliedChange(user_change, e))
+                return applied + [AppliedChange(change, e) for change in monitor_changes]
+
+        if len(monitor_changes) == 0:
+            return applied
+
+        try:
+            monitor_orm = self.shinobi_client.monitor(email, desired_user.password)
+        except Exception as e:
+            return applied + [AppliedChange(change, e) for change in monitor_changes]
+
+        to_configure = {change.monitor_id: change.configuration for change in monitor_changes
+                        if change.action != ReconcileAction.DELETE}
+        results = monitor_orm.apply_many(to_configure, verify=verify) if len(to_configure) > 0 else {}
+        for change in monitor_changes:
+            if change.action == ReconcileAction.DELETE:
+                try:
+                    monitor_orm.delete(change.monitor_id, verify=verify)
+                    applied.append(AppliedChange(change))
+                except Exception as e:
+                    applied.append(AppliedChange(change, e))
+            else:
+                result = results[change.monitor_id]
+                error = result.error if result.verified is not False \
+                    else RuntimeError(f"Could not verify monitor \"{change.monitor_id}\" was configured")
+                applied.append(AppliedChange(change, error))
+        return applied
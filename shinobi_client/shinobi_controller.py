@@ -1,30 +1,72 @@
+import fcntl
+import json
 import os
+import re
+import stat
 
 import docker
 import shutil
 import subprocess
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from hashlib import sha256
 from pathlib import Path
 from tempfile import mkdtemp
-from time import sleep
-from typing import Callable, Optional, Dict
+from time import monotonic
+from typing import Optional, Dict, List, Iterator
 
 import git
-import requests
+import yaml
 from get_port import find_free_port
 
 from shinobi_client._common import generate_random_string
 from shinobi_client.client import ShinobiClient
+from shinobi_client.polling import PollPolicy
+from shinobi_client.readiness import wait_until_ready, DEFAULT_READINESS_POLICY, ReadinessReport
 
 DEFAULT_DOCKER_SHINOBI_GIT_REPO_URL = "https://github.com/colin-nolan/docker-shinobi"
 DEFAULT_DOCKER_SHINOBI_GIT_REPO_BRANCH = "master"
+DEFAULT_CACHE_LOCATION = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "shinobi-client")
 
+# Repository of the images built from docker-shinobi, which are tagged with the hash of the source they are built from
+IMAGE_REPOSITORY_PREFIX = "shinobi-client"
 
-def _requires_docker_shinobi(caller: Callable):
-    def wrapper(self: "ShinobiController", *args, **kwargs):
-        self._clone_docker_shinobi()
-        return caller(self, *args, **kwargs)
+_COMPOSE_FILE_NAMES = ("docker-compose.yml", "docker-compose.yaml")
 
-    return wrapper
+# Environment variables with an installation's credentials, which are stored in its data so must be restored with it
+_CREDENTIAL_ENVIRONMENT_VARIABLES = ("MYSQL_USER_PASSWORD", "MYSQL_ROOT_PASSWORD", "SHINOBI_SUPER_USER_EMAIL",
+                                     "SHINOBI_SUPER_USER_PASSWORD", "SHINOBI_SUPER_USER_TOKEN")
+# Directories (in the temp directory) with the state of an installation that is saved in snapshots
+_SNAPSHOT_DIRECTORY_NAMES = ("data", "videos")
+_SNAPSHOT_METADATA_FILE_NAME = "metadata.json"
+_SNAPSHOT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], phase: str) -> Iterator[None]:
+    """
+    Records the number of seconds taken by the body of a `with` statement as the duration of the given phase.
+    """
+    started_at = monotonic()
+    try:
+        yield
+    finally:
+        timings[phase] = monotonic() - started_at
+
+
+@contextmanager
+def _locked(location: str) -> Iterator[None]:
+    """
+    Holds an exclusive lock on the given lock file (created if it does not exist) during the body of a `with` statement,
+    so that controllers in other processes wait for it.
+    """
+    with open(location, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
 class ShinobiAlreadyRunningError(RuntimeError):
@@ -33,27 +75,37 @@ class ShinobiAlreadyRunningError(RuntimeError):
     """
 
 
+class ShinobiNotRunningError(RuntimeError):
+    """
+    Error raised if it is a problem that Shinobi is not running.
+    """
+
+
+class ShinobiSnapshotNotFoundError(FileNotFoundError):
+    """
+    Error raised if a snapshot of a Shinobi installation does not exist.
+    """
+
+
+class ShinobiRestartError(RuntimeError):
+    """
+    Error raised if a Shinobi installation could not be started again after being stopped to save a snapshot of it.
+    """
+
+
+class ShinobiSnapshotMismatchError(RuntimeError):
+    """
+    Error raised if a snapshot of a Shinobi installation was saved from a different source of docker-shinobi than the
+    one being started, so its data may not be compatible.
+    """
+
+
 class ShinobiController:
     """
     Controls the running of a Shinobi installation from Python.
 
     Designed for temporarily running Shinobi, e.g. for testing.
     """
-    @staticmethod
-    def _wait_for_start(shinobi_client: ShinobiClient):
-        """
-        Blocks until service is ready.
-        :param shinobi_client: client connected to Shinobi installation
-        """
-        interval = 0.05
-        while True:
-            try:
-                requests.get(shinobi_client.url)
-                return
-            except requests.exceptions.ConnectionError:
-                sleep(interval)
-                interval += 0.01
-
     @property
     def _temp_directory(self) -> str:
         if self.__temp_directory is None:
@@ -62,25 +114,58 @@ class ShinobiController:
 
     @property
     def _shinobi_directory(self) -> str:
-        return os.path.join(self._temp_directory, os.path.basename(self.docker_shinobi_git_repo_url))
+        repository_name = os.path.basename(self.docker_shinobi_git_repo_url)
+        if self.cache_location is None:
+            return os.path.join(self._temp_directory, repository_name)
+        # Keyed by URL and branch, as both determine what is cloned
+        key = sha256(f"{self.docker_shinobi_git_repo_url}\n{self.docker_shinobi_git_repo_branch}".encode()).hexdigest()
+        return os.path.join(self.cache_location, "repositories", f"{repository_name}-{key[:16]}")
+
+    @property
+    def _snapshots_location(self) -> str:
+        if self.cache_location is None:
+            raise ValueError("Snapshots are stored in the cache, so require a cache location")
+        return os.path.join(self.cache_location, "snapshots")
 
     def __init__(self, docker_shinobi_git_repo_url: str = DEFAULT_DOCKER_SHINOBI_GIT_REPO_URL,
                  docker_shinobi_git_repo_branch: str = DEFAULT_DOCKER_SHINOBI_GIT_REPO_BRANCH,
-                 temp_root_location: str = "/tmp", name_prefix: str = None):
+                 temp_root_location: str = "/tmp", name_prefix: str = None,
+                 cache_location: Optional[str] = DEFAULT_CACHE_LOCATION, update_cache: bool = False,
+                 snapshot: Optional[str] = None, readiness_policy: PollPolicy = DEFAULT_READINESS_POLICY):
         """
         Constructor.
         :param docker_shinobi_git_repo_url: URL of the Git repository that
         :param docker_shinobi_git_repo_branch: branch (or tag) in Git repository to checkout
         :param temp_root_location: location in which temp files are created (must be mountable using Docker)
-        :param name_prefix: TODO
+        :param name_prefix: name of the Docker Compose project that the installation's containers, networks and
+                            volumes are created in (random if `None`)
+        :param cache_location: location of the cache of cloned repositories, which is shared between controllers (the
+                               repository is cloned for each start if `None`)
+        :param update_cache: whether to fetch the latest commit of the branch into the cached repository on start
+                             (carrying on with the cached commit if it cannot be fetched, e.g. when offline)
+        :param snapshot: name of the snapshot to start installations from (see `save_snapshot`), rather than starting
+                         them empty
+        :param readiness_policy: policy for polling whether a started installation is ready (see `wait_until_ready`),
+                                 including the deadline for it to become ready
         """
         self.temp_root_location = temp_root_location
         self.docker_shinobi_git_repo_url = docker_shinobi_git_repo_url
         self.docker_shinobi_git_repo_branch = docker_shinobi_git_repo_branch
         self.name_prefix = name_prefix if name_prefix is not None else f"shinobi-{generate_random_string()}"
+        self.cache_location = cache_location
+        self.update_cache = update_cache
+        self.snapshot = snapshot
+        self.readiness_policy = readiness_policy
+        # Seconds taken by each phase of the last start, in the order that they happened
+        self.startup_timings: Dict[str, float] = {}
+        # Time taken by each stage of the last wait for the installation to become ready
+        self.readiness_report: Optional[ReadinessReport] = None
 
         self.__temp_directory: Optional[str] = None
         self._stop = None
+        self._compose_command: Optional[List[str]] = None
+        self._environment: Optional[Dict[str, str]] = None
+        self._shinobi_client: Optional[ShinobiClient] = None
 
     def __enter__(self) -> ShinobiClient:
         return self.start()
@@ -88,25 +173,55 @@ class ShinobiController:
     def __exit__(self, *args):
         self.stop()
 
-    @_requires_docker_shinobi
     def start(self) -> ShinobiClient:
         """
         Starts an installation of Shinobi.
+
+        The Git repository is only cloned if it is not cached and images are only built if there is not already an
+        image built from the same source, so only the first start pays for them. The seconds taken by each phase of the
+        start are recorded in `startup_timings`.
+
+        Returns once the installation can serve requests (see `wait_until_ready`), recording the time taken by each
+        stage of readiness in `readiness_report`.
         :return: client for the started installation
         :raises ShinobiAlreadyRunningError: if the instance is already running Shinobi
+        :raises ShinobiSnapshotNotFoundError: if the snapshot to start from does not exist
+        :raises ShinobiSnapshotMismatchError: if the snapshot to start from was saved from a different source
+        :raises ShinobiNotReadyError: if the installation does not become ready before the readiness deadline (it is
+                                      left running, so it can be inspected, until `stop` is called)
         """
         if self._stop:
             raise ShinobiAlreadyRunningError()
-
-        environment = self._create_run_environment()
+        # Read before anything is created, so that a missing snapshot leaves nothing behind
+        snapshot_metadata = self._read_snapshot_metadata(self.snapshot) if self.snapshot is not None else None
+
+        timings: Dict[str, float] = {}
+        self.startup_timings = timings
+        try:
+            with _timed(timings, "clone"):
+                self._clone_docker_shinobi()
+            if snapshot_metadata is not None:
+                self._check_snapshot_source(self.snapshot, snapshot_metadata)
+
+            environment = self._create_run_environment()
+            if snapshot_metadata is not None:
+                with _timed(timings, "restore"):
+                    environment.update(self._restore_snapshot(self.snapshot, snapshot_metadata, environment))
+            compose_command = self._create_compose_command()
+
+            with _timed(timings, "build"):
+                self._build_missing_images(compose_command, environment)
+        except BaseException:
+            self._remove_temp_directory()
+            raise
 
         self._stop = lambda: subprocess.check_output(
-            ["docker-compose", "--project-name", self.name_prefix, "down"],
-            cwd=self._shinobi_directory, env=environment)
+            compose_command + ["down"], cwd=self._shinobi_directory, env=environment)
 
-        subprocess.check_output(
-            ["docker-compose", "--project-name", self.name_prefix, "up", "--build", "--detach", "--renew-anon-volumes"],
-            cwd=self._shinobi_directory, env=environment)
+        with _timed(timings, "up"):
+            subprocess.check_output(
+                compose_command + ["up", "--no-build", "--detach", "--renew-anon-volumes"],
+                cwd=self._shinobi_directory, env=environment)
         shinobi_client = ShinobiClient(
             super_user_email=environment["SHINOBI_SUPER_USER_EMAIL"],
             super_user_password=environment["SHINOBI_SUPER_USER_PASSWORD"],
@@ -115,7 +230,9 @@ class ShinobiController:
             # XXX: hardcoded assumption that the Docker daemon is on the host
             host="0.0.0.0"
         )
-        ShinobiController._wait_for_start(shinobi_client)
+        self._compose_command, self._environment, self._shinobi_client = compose_command, environment, shinobi_client
+        with _timed(timings, "wait"):
+            self.readiness_report = wait_until_ready(shinobi_client, self.readiness_policy)
 
         return shinobi_client
 
@@ -127,16 +244,89 @@ class ShinobiController:
         if not self._stop:
             return False
         self._stop()
-
-        # As the temp directory is written to as root in the containers, it needs to be removed as root
-        client = docker.from_env()
-        client.containers.run("alpine", "rm -rf /data/*", remove=True,
-                              volumes={self._temp_directory: {"bind": "/data", "mode": "rw"}})
-        shutil.rmtree(self._temp_directory, ignore_errors=True)
+        self._remove_temp_directory()
 
         self._stop = None
+        self._compose_command, self._environment, self._shinobi_client = None, None, None
         return True
 
+    def save_snapshot(self, name: str, overwrite: bool = False) -> str:
+        """
+        Saves the state of the running installation (Shinobi's data, including its database, and videos) as a named
+        snapshot in the cache, from which other installations can be started (see the `snapshot` constructor parameter).
+
+        The installation is stopped whilst its state is copied, so that the copy is consistent, then started again.
+        :param name: name of the snapshot (letters, digits, `_`, `.` and `-`)
+        :param overwrite: whether to replace an existing snapshot with the same name
+        :return: location of the snapshot
+        :raises ShinobiNotRunningError: if the installation is not running
+        :raises FileExistsError: if a snapshot with the same name exists and `overwrite` is `False`
+        :raises ShinobiRestartError: if the snapshot was saved but the installation could not be started again (it may
+                                     be left stopped, until `stop` is called)
+        """
+        if not self._stop:
+            raise ShinobiNotRunningError()
+        snapshot_location = self._get_snapshot_location(name)
+        if os.path.exists(snapshot_location) and not overwrite:
+            raise FileExistsError(f"Snapshot already exists: {name}")
+
+        # Saved beside the snapshot then moved into place, so that an installation never starts from a partial snapshot
+        os.makedirs(self._snapshots_location, exist_ok=True)
+        saving_location = mkdtemp(prefix=f".{name}-", dir=self._snapshots_location)
+        subprocess.check_output(self._compose_command + ["stop"], cwd=self._shinobi_directory, env=self._environment)
+        try:
+            for directory_name in _SNAPSHOT_DIRECTORY_NAMES:
+                ShinobiController._copy_as_root(os.path.join(self._temp_directory, directory_name),
+                                                os.path.join(saving_location, directory_name))
+            metadata = dict(
+                credentials={key: self._environment[key] for key in _CREDENTIAL_ENVIRONMENT_VARIABLES},
+                source_hash=self._get_source_hash(), created=datetime.now(timezone.utc).isoformat())
+            # Contains credentials, so only readable by the user
+            file_descriptor = os.open(os.path.join(saving_location, _SNAPSHOT_METADATA_FILE_NAME),
+                                      os.O_WRONLY | os.O_CREAT | os.O_EXCL, stat.S_IRUSR | stat.S_IWUSR)
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(metadata, file)
+            if os.path.exists(snapshot_location):
+                ShinobiController._remove_as_root(snapshot_location)
+            os.rename(saving_location, snapshot_location)
+        except BaseException as e:
+            try:
+                ShinobiController._remove_as_root(saving_location)
+                self._start_stopped()
+            except BaseException as cleanup_error:
+                # The error that stopped the snapshot being saved is the one raised
+                raise e from cleanup_error
+            raise
+
+        try:
+            self._start_stopped()
+        except BaseException as e:
+            raise ShinobiRestartError(
+                f"Snapshot {name} was saved but the installation could not be started again") from e
+        return snapshot_location
+
+    def delete_snapshot(self, name: str) -> bool:
+        """
+        Deletes a snapshot.
+        :param name: name of the snapshot
+        :return: whether the snapshot existed
+        """
+        snapshot_location = self._get_snapshot_location(name)
+        if not os.path.exists(snapshot_location):
+            return False
+        ShinobiController._remove_as_root(snapshot_location)
+        return True
+
+    def get_snapshot_names(self) -> List[str]:
+        """
+        Gets the names of the snapshots in the cache.
+        :return: snapshot names, in alphabetical order
+        """
+        if not os.path.exists(self._snapshots_location):
+            return []
+        return sorted(name for name in os.listdir(self._snapshots_location)
+                      if _SNAPSHOT_NAME_PATTERN.match(name) is not None)
+
     def _create_run_environment(self) -> Dict[str, str]:
         """
         Creates the environment in which the containerised Shinobi can run.
@@ -172,13 +362,209 @@ class ShinobiController:
             SHINOBI_HOST_PORT=str(port)
         )
 
+    def _start_stopped(self):
+        """
+        Starts the installation's stopped containers again, waiting until the installation is ready.
+        :raises ShinobiNotReadyError: if the installation does not become ready before the readiness deadline
+        """
+        subprocess.check_output(self._compose_command + ["start"], cwd=self._shinobi_directory, env=self._environment)
+        self.readiness_report = wait_until_ready(self._shinobi_client, self.readiness_policy)
+
+    def _remove_temp_directory(self):
+        """
+        Removes the temp directory, if it has been created.
+        """
+        if self.__temp_directory is None:
+            return
+        # As the temp directory is written to as root in the containers, it needs to be removed as root
+        ShinobiController._remove_as_root(self.__temp_directory)
+        self.__temp_directory = None
+
+    def _read_snapshot_metadata(self, name: str) -> Dict:
+        """
+        Reads the metadata of a snapshot.
+        :param name: name of the snapshot
+        :return: the snapshot's metadata
+        :raises ShinobiSnapshotNotFoundError: if the snapshot does not exist
+        """
+        metadata_location = os.path.join(self._get_snapshot_location(name), _SNAPSHOT_METADATA_FILE_NAME)
+        if not os.path.exists(metadata_location):
+            raise ShinobiSnapshotNotFoundError(f"Snapshot does not exist: {name}")
+        with open(metadata_location, "r") as file:
+            return json.load(file)
+
+    def _check_snapshot_source(self, name: str, metadata: Dict):
+        """
+        Checks that a snapshot was saved from the same source of docker-shinobi as the one that is checked out.
+        :param name: name of the snapshot
+        :param metadata: the snapshot's metadata
+        :raises ShinobiSnapshotMismatchError: if the snapshot was saved from a different source
+        """
+        source_hash = self._get_source_hash()
+        if metadata["source_hash"] != source_hash:
+            raise ShinobiSnapshotMismatchError(
+                f"Snapshot {name} was saved from docker-shinobi source {metadata['source_hash'][:12]}, not the checked "
+                f"out source {source_hash[:12]} (save the snapshot again from the checked out source)")
+
+    def _restore_snapshot(self, name: str, metadata: Dict, environment: Dict[str, str]) -> Dict[str, str]:
+        """
+        Restores the state saved in a snapshot into the installation's (empty) data and video directories.
+        :param name: name of the snapshot
+        :param metadata: the snapshot's metadata
+        :param environment: environment in which the installation will run
+        :return: environment variables with the credentials of the installation the snapshot was saved from
+        """
+        snapshot_location = self._get_snapshot_location(name)
+        ShinobiController._copy_as_root(os.path.join(snapshot_location, "data"), environment["SHINOBI_DATA_LOCATION"])
+        ShinobiController._copy_as_root(os.path.join(snapshot_location, "videos"),
+                                        environment["SHINOBI_VIDEO_LOCATION"])
+        return metadata["credentials"]
+
+    def _get_snapshot_location(self, name: str) -> str:
+        """
+        Gets the location of the snapshot with the given name.
+        :param name: name of the snapshot
+        :return: location of the snapshot
+        :raises ValueError: if the name is not valid
+        """
+        if _SNAPSHOT_NAME_PATTERN.match(name) is None:
+            raise ValueError(f"Invalid snapshot name (only letters, digits, `_`, `.` and `-` are allowed): {name}")
+        return os.path.join(self._snapshots_location, name)
+
+    @staticmethod
+    def _copy_as_root(source: str, destination: str):
+        """
+        Copies the contents of a directory, keeping ownership and permissions (files written in the containers are owned
+        by root, so are copied as root).
+        :param source: location of the directory to copy from
+        :param destination: location of the directory to copy into
+        """
+        os.makedirs(destination, exist_ok=True)
+        client = docker.from_env()
+        client.containers.run("alpine", "cp -a /source/. /destination/", remove=True, volumes={
+            source: {"bind": "/source", "mode": "ro"}, destination: {"bind": "/destination", "mode": "rw"}})
+
+    @staticmethod
+    def _remove_as_root(location: str):
+        """
+        Removes a directory that contains files written in the containers (as root).
+        :param location: location of the directory
+        """
+        client = docker.from_env()
+        client.containers.run("alpine", "rm -rf /data/*", remove=True,
+                              volumes={location: {"bind": "/data", "mode": "rw"}})
+        shutil.rmtree(location, ignore_errors=True)
+
     def _clone_docker_shinobi(self):
         """
-        Clones repository for running containerised Shinobi.
+        Clones repository for running containerised Shinobi, unless it is already cloned (or cached).
         """
-        if not os.path.exists(self._shinobi_directory):
+        if os.path.exists(self._shinobi_directory):
+            if self.update_cache and self.cache_location is not None:
+                self._update_cached_docker_shinobi()
+            return
+        if self.cache_location is None:
             git.Repo.clone_from(self.docker_shinobi_git_repo_url, self._shinobi_directory,
                                 branch=self.docker_shinobi_git_repo_branch)
+            return
+
+        # Cloned beside the cache entry then moved into place, so that concurrent controllers never see a partial clone
+        cache_directory = os.path.dirname(self._shinobi_directory)
+        os.makedirs(cache_directory, exist_ok=True)
+        clone_location = mkdtemp(prefix=".clone-", dir=cache_directory)
+        try:
+            git.Repo.clone_from(self.docker_shinobi_git_repo_url, clone_location,
+                                branch=self.docker_shinobi_git_repo_branch)
+            try:
+                os.rename(clone_location, self._shinobi_directory)
+            except OSError:
+                # Another controller populated the cache first
+                pass
+        finally:
+            shutil.rmtree(clone_location, ignore_errors=True)
+
+    def _update_cached_docker_shinobi(self):
+        """
+        Updates the cached repository to the latest commit of the branch, if it can be fetched.
+
+        The cache is shared, so the update is made holding a lock that controllers updating the same repository wait
+        for.
+        """
+        with _locked(f"{self._shinobi_directory}.lock"):
+            repository = git.Repo(self._shinobi_directory)
+            try:
+                repository.remotes.origin.fetch(self.docker_shinobi_git_repo_branch)
+            except git.GitCommandError:
+                # Carries on with the cached commit (e.g. when offline)
+                return
+            repository.git.reset("--hard", "FETCH_HEAD")
+
+    def _get_source_hash(self) -> str:
+        """
+        Gets the hash of the source of docker-shinobi (the hash of the checked out Git tree).
+        :return: source hash
+        """
+        return git.Repo(self._shinobi_directory).head.commit.tree.hexsha
+
+    def _get_compose_file_location(self) -> str:
+        """
+        Gets the location of docker-shinobi's Docker Compose file.
+        :return: location of the Compose file
+        """
+        for file_name in _COMPOSE_FILE_NAMES:
+            location = os.path.join(self._shinobi_directory, file_name)
+            if os.path.exists(location):
+                return location
+        raise FileNotFoundError(f"No Docker Compose file in {self._shinobi_directory}")
+
+    def _get_built_images(self) -> Dict[str, str]:
+        """
+        Gets the names of the images that are built for services, which are tagged with the source hash so that they are
+        reused by every installation started from the same source.
+        :return: map from the name of each service that is built to the name of its image
+        """
+        with open(self._get_compose_file_location(), "r") as file:
+            services = yaml.safe_load(file).get("services", {})
+        repository_name = os.path.basename(self.docker_shinobi_git_repo_url).lower()
+        source_hash = self._get_source_hash()[:12]
+        return {service: f"{IMAGE_REPOSITORY_PREFIX}/{repository_name}-{service.lower()}:{source_hash}"
+                for service, configuration in services.items() if "build" in configuration}
+
+    def _create_compose_command(self) -> List[str]:
+        """
+        Creates the start of Docker Compose commands for the installation, naming the images of services that are built
+        (see `_get_built_images`) in an override file.
+        :return: Docker Compose command, to which a subcommand can be added
+        """
+        compose_file_location = self._get_compose_file_location()
+        with open(compose_file_location, "r") as file:
+            version = yaml.safe_load(file).get("version")
+        override = dict(services={service: dict(image=image) for service, image in self._get_built_images().items()})
+        if version is not None:
+            override["version"] = version
+        # JSON is valid YAML
+        override_file_location = os.path.join(self._temp_directory, "docker-compose.override.yml")
+        with open(override_file_location, "w") as file:
+            json.dump(override, file)
+        return ["docker-compose", "--file", compose_file_location, "--file", override_file_location,
+                "--project-name", self.name_prefix]
+
+    def _build_missing_images(self, compose_command: List[str], environment: Dict[str, str]):
+        """
+        Builds the images of services that have not already been built from the same source.
+        :param compose_command: Docker Compose command for the installation
+        :param environment: environment to run Docker Compose in
+        """
+        client = docker.from_env()
+        missing_services = []
+        for service, image in self._get_built_images().items():
+            try:
+                client.images.get(image)
+            except docker.errors.ImageNotFound:
+                missing_services.append(service)
+        if len(missing_services) > 0:
+            subprocess.check_output(compose_command + ["build"] + missing_services,
+                                    cwd=self._shinobi_directory, env=environment)
 
 
 def start_shinobi(*args, **kwargs) -> ShinobiController:
@@ -0,0 +1,277 @@
+import json
+from hashlib import md5
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from random import Random
+from threading import Thread, Lock
+from time import sleep
+from typing import Dict, Tuple, Optional, Any, List
+from urllib.parse import urlparse, parse_qs
+
+from shinobi_client._common import generate_random_string
+from shinobi_client.client import ShinobiClient
+
+# Status of an injected error that drops the connection without responding
+DROP_CONNECTION = 0
+
+_MONITOR_DEFAULTS = {
+    "name": "", "type": "h264", "ext": "mp4", "protocol": "rtsp", "host": "", "path": "", "port": 0, "fps": 1,
+    "mode": "stop", "width": 640, "height": 480,
+}
+_INTEGER_MONITOR_KEYS = {"port", "fps", "width", "height"}
+_NOT_AUTHORIZED = {"ok": False, "msg": "Not Authorized"}
+_INJECTED_ERROR = {"ok": False, "msg": "Injected error"}
+
+
+class StandInShinobi:
+    """
+    Lightweight, in-memory stand-in for the parts of Shinobi's API used by the client, served over HTTP on a local
+    port. Starts in milliseconds, so can be used instead of `ShinobiController` for testing and benchmarking.
+
+    Behaves like Shinobi, including its quirks, e.g. a request for a single monitor returns a list, a request for all
+    monitors returns an object if there is only one, monitor details are returned as a JSON dumped string and dashes
+    are silently removed from monitor IDs.
+
+    Latency can be added to all responses and errors can be injected, either at random (`error_rate`) or for the next
+    requests (`fail_next`).
+    """
+    def __init__(self, super_user_token: str = None, latency: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, seed: Optional[int] = None):
+        """
+        Constructor.
+        :param super_user_token: token to authorise super user requests with (random if not given)
+        :param latency: seconds to wait before responding to each request
+        :param error_rate: probability that a request fails with an injected error
+        :param error_status: HTTP status of injected errors (`DROP_CONNECTION` to drop the connection instead)
+        :param seed: seed of the random choice of requests that fail
+        """
+        self.super_user_token = super_user_token if super_user_token is not None else generate_random_string()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = Random(seed)
+        self._lock = Lock()
+        self._users: Dict[str, Dict] = {}
+        self._monitors: Dict[Tuple[str, str], Dict] = {}
+        self._failures: List[int] = []
+        self.logins = 0
+        self.requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> ShinobiClient:
+        """
+        Starts serving on a free local port.
+        :return: client for the stand-in
+        """
+        stand_in = self
+
+        class Handler(_StandInShinobiRequestHandler):
+            shinobi = stand_in
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self._server.server_address
+        return ShinobiClient(host, str(port), super_user_token=self.super_user_token)
+
+    def stop(self):
+        """
+        Stops serving.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> ShinobiClient:
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def handle(self, method: str, path: str, body: Any) -> Tuple[int, Any]:
+        """
+        Handles an API request.
+        :param method: HTTP method
+        :param path: path requested (including query)
+        :param body: decoded JSON or form body
+        :return: tuple of HTTP status and JSON response (or string for HTML)
+        """
+        parsed = urlparse(path)
+        query = parse_qs(parsed.query)
+        segments = [segment for segment in parsed.path.split("/") if segment]
+
+        with self._lock:
+            if len(segments) == 0:
+                if method == "POST" and query.get("json") == ["true"]:
+                    return 200, self._login(body)
+                return 200, "<html>Shinobi</html>"
+            if segments[0] == "super" and len(segments) == 4 and segments[2] == "accounts":
+                if segments[1] != self.super_user_token:
+                    return 200, _NOT_AUTHORIZED
+                return 200, self._handle_accounts(segments[3], body)
+            user = self._get_user_with_api_key(segments[0])
+            if len(segments) >= 3 and segments[1] in ("monitor", "configureMonitor"):
+                if user is None or user["ke"] != segments[2]:
+                    return 200, _NOT_AUTHORIZED
+                if segments[1] == "monitor" and method == "GET":
+                    return 200, self._get_monitors(user["ke"], segments[3] if len(segments) > 3 else None)
+                if segments[1] == "configureMonitor" and method == "POST" and len(segments) in (4, 5):
+                    if len(segments) == 5 and segments[4] == "delete":
+                        return 200, self._delete_monitor(user["ke"], segments[3])
+                    return 200, self._configure_monitor(user["ke"], segments[3], body)
+        return 404, {"ok": False, "msg": "Not Found"}
+
+    def fail_next(self, count: int = 1, status: Optional[int] = None):
+        """
+        Makes the next requests fail with an injected error.
+        :param count: number of requests to fail
+        :param status: HTTP status of the errors (`DROP_CONNECTION` to drop the connection instead), defaults to
+                       `error_status`
+        """
+        with self._lock:
+            self._failures.extend([status if status is not None else self.error_status] * count)
+
+    def take_failure(self) -> Optional[int]:
+        """
+        Counts a request and determines whether it is to fail with an injected error.
+        :return: status of the injected error else `None` if the request is not to fail
+        """
+        with self._lock:
+            self.requests += 1
+            if len(self._failures) > 0:
+                return self._failures.pop(0)
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+    def rotate_api_key(self, email: str):
+        """
+        Gives the user with the given email address a new API key, rejecting the old one.
+        :param email: user's email address
+        """
+        with self._lock:
+            self._users[email]["auth_token"] = generate_random_string(30)
+
+    def _login(self, form: Dict) -> Dict:
+        self.logins += 1
+        user = self._users.get(form.get("mail"))
+        if user is None or user["pass"] != _hash(form.get("pass", "")):
+            return {"ok": False, "msg": "Failed to login"}
+        logged_in_user = {key: value for key, value in user.items() if key != "pass"}
+        return {"ok": True, "$user": logged_in_user}
+
+    def _handle_accounts(self, operation: str, body: Dict) -> Dict:
+        if operation == "list":
+            return {"ok": True, "users": [
+                {key: value for key, value in user.items() if key != "auth_token"} for user in self._users.values()]}
+        if operation == "registerAdmin":
+            data = body["data"]
+            if data["mail"] in self._users:
+                return {"ok": False, "msg": "Email address is in use."}
+            user = {
+                "mail": data["mail"], "pass": _hash(data["pass"]), "uid": generate_random_string(10),
+                "ke": generate_random_string(7), "auth_token": generate_random_string(30),
+                "details": data.get("details", "{}")
+            }
+            self._users[data["mail"]] = user
+            # Shinobi echoes back the registration form, including the password
+            return {"ok": True, "user": dict(data, uid=user["uid"], ke=user["ke"])}
+        if operation == "editAdmin":
+            user = self._users.get(body["account"]["mail"])
+            if user is None:
+                return {"ok": False, "msg": "User not found"}
+            user["pass"] = _hash(body["data"]["pass"])
+            return {"ok": True}
+        if operation == "deleteAdmin":
+            user = self._users.pop(body["account"]["mail"], None)
+            if user is None:
+                return {"ok": False, "msg": "User not found"}
+            # Shinobi only deletes the user's monitors if asked to
+            if body.get("deleteMonitors") == "1":
+                for key in [key for key in self._monitors if key[0] == user["ke"]]:
+                    del self._monitors[key]
+            return {"ok": True}
+        return {"ok": False, "msg": f"Unknown operation: {operation}"}
+
+    def _get_user_with_api_key(self, api_key: str) -> Optional[Dict]:
+        return next((user for user in self._users.values() if user["auth_token"] == api_key), None)
+
+    def _get_monitors(self, group_key: str, monitor_id: Optional[str]) -> Any:
+        if monitor_id is not None:
+            # Newer versions of Shinobi return a list, even though a single ID was given
+            monitor = self._monitors.get((group_key, monitor_id))
+            return [dict(monitor)] if monitor is not None else []
+        monitors = [dict(monitor) for (ke, _), monitor in self._monitors.items() if ke == group_key]
+        # Shinobi returns a single monitor as an object, rather than a list
+        return monitors[0] if len(monitors) == 1 else monitors
+
+    def _configure_monitor(self, group_key: str, monitor_id: str, body: Dict) -> Dict:
+        # Shinobi silently removes dashes from monitor IDs
+        monitor_id = monitor_id.replace("-", "")
+        configuration = body.get("data", {})
+        if "name" not in configuration:
+            return {"ok": False}
+        monitor = dict(_MONITOR_DEFAULTS)
+        monitor.update({key: value for key, value in configuration.items() if key in _MONITOR_DEFAULTS})
+        for key in _INTEGER_MONITOR_KEYS:
+            monitor[key] = int(monitor[key]) if str(monitor[key]).strip() != "" else 0
+        details = configuration.get("details", {})
+        # The API returns the details as a JSON dumped string
+        monitor["details"] = json.dumps(details) if not isinstance(details, str) else details
+        monitor.update(mid=monitor_id, ke=group_key)
+        is_new = (group_key, monitor_id) not in self._monitors
+        self._monitors[(group_key, monitor_id)] = monitor
+        return {"ok": True, "msg": "Monitor Added by user." if is_new else "Monitor Updated by user."}
+
+    def _delete_monitor(self, group_key: str, monitor_id: str) -> Dict:
+        if self._monitors.pop((group_key, monitor_id), None) is None:
+            return {"ok": False, "msg": "Monitor does not exist"}
+        return {"ok": True, "msg": "Monitor Deleted by user."}
+
+
+class _StandInShinobiRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler for a `StandInShinobi`.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    shinobi: StandInShinobi
+
+    def do_GET(self):
+        self._respond("GET", None)
+
+    def do_POST(self):
+        content_length = int(self.headers.get("Content-Length", 0))
+        raw_body = self.rfile.read(content_length).decode() if content_length else ""
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            body = json.loads(raw_body) if raw_body else {}
+        else:
+            body = {key: values[0] for key, values in parse_qs(raw_body).items()}
+        self._respond("POST", body)
+
+    def _respond(self, method: str, body: Any):
+        failure = self.shinobi.take_failure()
+        if self.shinobi.latency > 0:
+            sleep(self.shinobi.latency)
+        if failure == DROP_CONNECTION:
+            self.close_connection = True
+            return
+        status, content = (failure, _INJECTED_ERROR) if failure is not None \
+            else self.shinobi.handle(method, self.path, body)
+        if isinstance(content, str):
+            encoded, content_type = content.encode(), "text/html"
+        else:
+            encoded, content_type = json.dumps(content).encode(), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, *args):
+        pass
+
+
+def _hash(password: str) -> str:
+    return md5(password.encode()).hexdigest()
+
@@ -1,10 +1,69 @@
+import atexit
+import os
+from importlib.util import find_spec
 import unittest
 from abc import ABCMeta
-from typing import Tuple, ClassVar, Dict
+from threading import Lock
+from typing import Tuple, ClassVar, Dict, ContextManager, Optional
 
 from shinobi_client._common import generate_random_string
-from shinobi_client.shinobi_controller import ShinobiController
 from shinobi_client.client import ShinobiClient
+from shinobi_client.controller_pool import ShinobiControllerPool, create_shinobi_controller
+from shinobi_client.testing import StandInShinobi
+
+# Environment variable that selects what the tests use as Shinobi: `stand-in` (default) or `docker`
+TEST_BACKEND_ENVIRONMENT_VARIABLE = "SHINOBI_CLIENT_TEST_BACKEND"
+DOCKER_TEST_BACKEND = "docker"
+# Environment variable that sets the number of Shinobi installations that each test process keeps warm (default 1)
+TEST_POOL_SIZE_ENVIRONMENT_VARIABLE = "SHINOBI_CLIENT_TEST_POOL_SIZE"
+
+_pool: Optional[ShinobiControllerPool] = None
+_pool_lock = Lock()
+
+
+def is_using_docker() -> bool:
+    """
+    Whether the tests are to use Shinobi running in Docker, rather than the stand-in.
+    :return: `True` if using Shinobi running in Docker
+    """
+    return os.environ.get(TEST_BACKEND_ENVIRONMENT_VARIABLE, "").lower() == DOCKER_TEST_BACKEND
+
+
+def has_async_extra() -> bool:
+    """
+    Whether the optional dependencies of the asyncio client (the `async` extra) are installed.
+    :return: `True` if `AsyncShinobiClient` can be used
+    """
+    return find_spec("aiohttp") is not None
+
+
+ASYNC_SKIP_REASON = "AsyncShinobiClient tests require the async extra (aiohttp)"
+
+
+def start_clean_shinobi() -> ContextManager[ShinobiClient]:
+    """
+    Starts a clean Shinobi installation, using the same backend as the tests, to use in a `with` statement.
+    :return: context manager that gives a client connected to the installation
+    """
+    if is_using_docker():
+        from shinobi_client.shinobi_controller import start_shinobi
+        return start_shinobi()
+    return StandInShinobi()
+
+
+def get_shinobi_pool() -> ShinobiControllerPool:
+    """
+    Gets the pool of warm Shinobi installations shared by the tests in this process (e.g. a pytest-xdist worker).
+    :return: the pool, using the same backend as the tests
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ShinobiControllerPool(
+                size=int(os.environ.get(TEST_POOL_SIZE_ENVIRONMENT_VARIABLE, 1)),
+                controller_factory=create_shinobi_controller if is_using_docker() else StandInShinobi)
+            atexit.register(_pool.close)
+        return _pool
 
 
 def _create_email_and_password() -> Tuple[str, str]:
@@ -20,22 +79,22 @@ class TestWithShinobi(unittest.TestCase, metaclass=ABCMeta):
     """
     Superclass for tests that use Shinobi`.
 
-    Shinobi takes a reasonable amount of time to setup so sharing between all tests in class (at the cost of reduced
-    test isolation) might make sense.
+    Uses `StandInShinobi`, unless the `SHINOBI_CLIENT_TEST_BACKEND` environment variable is set to `docker`, in which
+    case Shinobi is run in Docker. Shinobi takes a reasonable amount of time to setup so installations are shared
+    between all tests in class (at the cost of reduced test isolation) and leased from a pool of warm installations that
+    are reset, rather than restarted, between classes.
     """
-    _shinobi_controller_singleton: ClassVar[ShinobiController]
     _shinobi_client_singleton: ClassVar[ShinobiClient]
 
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
-        cls._shinobi_controller_singleton = ShinobiController()
-        cls._shinobi_client_singleton = cls._shinobi_controller_singleton.start()
+        cls._shinobi_client_singleton = get_shinobi_pool().acquire()
 
     @classmethod
     def tearDownClass(cls):
         super().tearDownClass()
-        cls._shinobi_controller_singleton.stop()
+        get_shinobi_pool().release(cls._shinobi_client_singleton)
 
     def setUp(self):
         super().setUp()
@@ -0,0 +1,147 @@
+import json
+import os
+import shutil
+import stat
+import unittest
+from dataclasses import replace
+from tempfile import mkdtemp
+from time import sleep
+
+from logzero import logger
+
+from shinobi_client.orms.credential_cache import ShinobiCredentialCache
+from shinobi_client.orms.user import ShinobiWrongPasswordError
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+EXAMPLE_USER = {"mail": "a@example.com", "email": "a@example.com", "pass": "password", "password": "password",
+                "uid": "uid-a", "ke": "group-1", "auth_token": "token-a"}
+
+
+class TestShinobiCredentialCache(unittest.TestCase):
+    """
+    Tests for `ShinobiCredentialCache`.
+    """
+    def setUp(self):
+        self.temp_directory = mkdtemp()
+        self.location = os.path.join(self.temp_directory, "credentials.json")
+        self.credential_cache = ShinobiCredentialCache(ttl=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_directory)
+
+    def test_get_when_not_cached(self):
+        self.assertIsNone(self.credential_cache.get("a@example.com", "password"))
+
+    def test_get(self):
+        self.credential_cache.put("a@example.com", "password", EXAMPLE_USER)
+        self.assertEqual(EXAMPLE_USER, self.credential_cache.get("a@example.com", "password"))
+        self.assertIsNone(self.credential_cache.get("a@example.com", "other"))
+
+    def test_expiry(self):
+        credential_cache = ShinobiCredentialCache(ttl=0.01)
+        credential_cache.put("a@example.com", "password", EXAMPLE_USER)
+        sleep(0.02)
+        self.assertIsNone(credential_cache.get("a@example.com", "password"))
+
+    def test_invalidate(self):
+        self.credential_cache.put("a@example.com", "password", EXAMPLE_USER)
+        self.credential_cache.put("b@example.com", "password", dict(EXAMPLE_USER, mail="b@example.com"))
+        self.credential_cache.invalidate("a@example.com")
+        self.assertIsNone(self.credential_cache.get("a@example.com", "password"))
+        self.assertIsNotNone(self.credential_cache.get("b@example.com", "password"))
+
+    def test_persisted(self):
+        ShinobiCredentialCache(ttl=60, location=self.location).put("a@example.com", "password", EXAMPLE_USER)
+        self.assertEqual(stat.S_IRUSR | stat.S_IWUSR, stat.S_IMODE(os.stat(self.location).st_mode))
+        with open(self.location, "r") as file:
+            self.assertNotIn("password", file.read())
+        credential_cache = ShinobiCredentialCache(ttl=60, location=self.location)
+        self.assertEqual(EXAMPLE_USER, credential_cache.get("a@example.com", "password"))
+
+    def test_persisted_file_ignored_if_public(self):
+        ShinobiCredentialCache(ttl=60, location=self.location).put("a@example.com", "password", EXAMPLE_USER)
+        os.chmod(self.location, 0o644)
+        credential_cache = ShinobiCredentialCache(ttl=60, location=self.location)
+        self.assertIsNone(credential_cache.get("a@example.com", "password"))
+
+    def test_persisted_by_many_processes(self):
+        credential_cache = ShinobiCredentialCache(ttl=60, location=self.location)
+        credential_cache.put("a@example.com", "password", EXAMPLE_USER)
+        other_credential_cache = ShinobiCredentialCache(ttl=60, location=self.location)
+        other_credential_cache.put("b@example.com", "password", dict(EXAMPLE_USER, mail="b@example.com"))
+        other_credential_cache.invalidate("a@example.com")
+        credential_cache.put("c@example.com", "password", dict(EXAMPLE_USER, mail="c@example.com"))
+
+        credential_cache = ShinobiCredentialCache(ttl=60, location=self.location)
+        for email in ("b@example.com", "c@example.com"):
+            self.assertEqual(email, credential_cache.get(email, "password")["mail"])
+
+    def test_persisting_best_effort(self):
+        location = os.path.join(self.temp_directory, "missing", "credentials.json")
+        credential_cache = ShinobiCredentialCache(ttl=60, location=location)
+        with self.assertLogs(logger, level="WARNING"):
+            credential_cache.put("a@example.com", "password", EXAMPLE_USER)
+        self.assertEqual(EXAMPLE_USER, credential_cache.get("a@example.com", "password"))
+        with self.assertLogs(logger, level="WARNING"):
+            credential_cache.invalidate("a@example.com")
+        self.assertIsNone(credential_cache.get("a@example.com", "password"))
+
+    def test_persisted_file_ignored_if_malformed(self):
+        ShinobiCredentialCache(ttl=60, location=self.location).put("a@example.com", "password", EXAMPLE_USER)
+        with open(self.location, "r") as file:
+            content = json.load(file)
+        (key, entry), = content["entries"].items()
+        malformed_contents = (
+            dict(content, hash_key=None),
+            {name: value for name, value in content.items() if name != "hash_key"},
+            {name: value for name, value in content.items() if name != "entries"},
+            dict(content, entries=[entry]),
+            dict(content, entries={key: {name: value for name, value in entry.items() if name != "expires_at"}}),
+            dict(content, entries={key: dict(entry, expires_at="never")}),
+        )
+        for malformed_content in malformed_contents:
+            with self.subTest(content=malformed_content):
+                with open(self.location, "w") as file:
+                    json.dump(malformed_content, file)
+                credential_cache = ShinobiCredentialCache(ttl=60, location=self.location)
+                self.assertIsNone(credential_cache.get("a@example.com", "password"))
+                credential_cache.put("a@example.com", "password", EXAMPLE_USER)
+                self.assertEqual(EXAMPLE_USER, credential_cache.get("a@example.com", "password"))
+
+
+class TestCredentialCacheWithOrms(unittest.TestCase):
+    """
+    Tests for use of the client's credential cache by the ORMs.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        self.shinobi_client = replace(self.stand_in_shinobi.start(), credential_cache_ttl=60)
+        self.shinobi_client.user.create("a@example.com", "password")
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_logs_in_once(self):
+        for _ in range(3):
+            self.shinobi_client.monitor("a@example.com", "password")
+            self.shinobi_client.api_key.get("a@example.com", "password")
+        self.assertEqual(1, self.stand_in_shinobi.logins)
+
+    def test_logs_in_again_when_api_key_rejected(self):
+        monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+        self.stand_in_shinobi.rotate_api_key("a@example.com")
+        self.assertEqual((), monitor_orm.get_all())
+        self.assertEqual(2, self.stand_in_shinobi.logins)
+        self.shinobi_client.monitor("a@example.com", "password").create("camera1", get_monitor_configuration(1))
+        self.assertEqual(2, self.stand_in_shinobi.logins)
+
+    def test_invalidated_when_password_changed(self):
+        self.shinobi_client.monitor("a@example.com", "password")
+        self.assertTrue(self.shinobi_client.user.modify("a@example.com", password="new-password"))
+        self.assertRaises(ShinobiWrongPasswordError, self.shinobi_client.monitor, "a@example.com", "password")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,7 @@ from copy import deepcopy
 
 from shinobi_client._common import generate_random_string
 from shinobi_client.orms.monitor import ShinobiMonitorOrm, ShinobiMonitorAlreadyExistsError, \
-    ShinobiMonitorDoesNotExistError
+    ShinobiMonitorDoesNotExistError, MonitorApplyAction
 from shinobi_client.tests._common import TestWithShinobi, _create_email_and_password
 from shinobi_client.tests.resources.metadata import get_monitor_configuration
 
@@ -162,6 +162,39 @@ class TestShinobiMonitorOrm(TestWithShinobi):
         self.assertTrue(self.monitor_orm.delete(monitor_id))
         self.assertIsNone(self.monitor_orm.get(monitor_id))
 
+    def test_apply_many(self):
+        unchanged_monitor_id = self._create_monitor()
+        modified_monitor_id = self._create_monitor()
+        created_monitor_id = _create_monitor_id()
+
+        results = self.monitor_orm.apply_many({
+            unchanged_monitor_id: EXAMPLE_MONITOR_1_CONFIGURATION,
+            modified_monitor_id: EXAMPLE_MONITOR_2_CONFIGURATION,
+            created_monitor_id: EXAMPLE_MONITOR_2_CONFIGURATION
+        })
+
+        self.assertEqual(MonitorApplyAction.NONE, results[unchanged_monitor_id].action)
+        self.assertEqual(MonitorApplyAction.MODIFY, results[modified_monitor_id].action)
+        self.assertEqual(MonitorApplyAction.CREATE, results[created_monitor_id].action)
+        self.assertTrue(all(result.succeeded for result in results.values()))
+        self.assertTrue(results[created_monitor_id].verified)
+        for monitor_id in (modified_monitor_id, created_monitor_id):
+            self.assertEqual(EXAMPLE_MONITOR_2_CONFIGURATION["name"], self.monitor_orm.get(monitor_id)["name"])
+
+    def test_apply_many_with_invalid_configuration(self):
+        valid_monitor_id = _create_monitor_id()
+        invalid_monitor_id = _create_monitor_id()
+
+        results = self.monitor_orm.apply_many({
+            valid_monitor_id: EXAMPLE_MONITOR_1_CONFIGURATION,
+            invalid_monitor_id: {"name": "example"}
+        })
+
+        self.assertTrue(results[valid_monitor_id].succeeded)
+        self.assertFalse(results[invalid_monitor_id].succeeded)
+        self.assertIsInstance(results[invalid_monitor_id].error, ValueError)
+        self.assertIsNone(self.monitor_orm.get(invalid_monitor_id))
+
     def test_get_user(self):
         self.assertEqual(self.user["email"], self.monitor_orm.user["email"])
 
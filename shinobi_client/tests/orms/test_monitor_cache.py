@@ -0,0 +1,111 @@
+import unittest
+from dataclasses import replace
+from time import sleep
+
+from shinobi_client.orms.monitor_cache import ShinobiMonitorCache
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+EXAMPLE_MONITOR_1 = {"mid": "camera1", "ke": "group-1", "name": "Camera 1"}
+EXAMPLE_MONITOR_2 = {"mid": "camera2", "ke": "group-1", "name": "Camera 2"}
+
+
+class TestShinobiMonitorCache(unittest.TestCase):
+    """
+    Tests for `ShinobiMonitorCache`.
+    """
+    def setUp(self):
+        self.monitor_cache = ShinobiMonitorCache(ttl=60, max_size=2)
+
+    def test_lookup_when_not_cached(self):
+        self.assertEqual((False, None), self.monitor_cache.lookup("group-1", "camera1"))
+        self.assertIsNone(self.monitor_cache.lookup_all("group-1"))
+        self.assertEqual(2, self.monitor_cache.statistics.misses)
+
+    def test_lookup(self):
+        self.monitor_cache.put("group-1", "camera1", EXAMPLE_MONITOR_1, 0)
+        self.monitor_cache.put("group-1", "camera3", None, 0)
+        self.assertEqual((True, EXAMPLE_MONITOR_1), self.monitor_cache.lookup("group-1", "camera1"))
+        self.assertEqual((True, None), self.monitor_cache.lookup("group-1", "camera3"))
+        self.assertEqual(2, self.monitor_cache.statistics.hits)
+
+    def test_lookup_returns_copy(self):
+        self.monitor_cache.put("group-1", "camera1", EXAMPLE_MONITOR_1, 0)
+        self.monitor_cache.lookup("group-1", "camera1")[1]["name"] = "Changed"
+        self.assertEqual((True, EXAMPLE_MONITOR_1), self.monitor_cache.lookup("group-1", "camera1"))
+
+    def test_lookup_from_inventory(self):
+        self.monitor_cache.put_all("group-1", (EXAMPLE_MONITOR_1, EXAMPLE_MONITOR_2), 0)
+        self.assertEqual((EXAMPLE_MONITOR_1, EXAMPLE_MONITOR_2), self.monitor_cache.lookup_all("group-1"))
+        self.assertEqual((True, EXAMPLE_MONITOR_2), self.monitor_cache.lookup("group-1", "camera2"))
+        self.assertEqual((True, None), self.monitor_cache.lookup("group-1", "camera3"))
+
+    def test_ttl(self):
+        monitor_cache = ShinobiMonitorCache(ttl=0.01)
+        monitor_cache.put("group-1", "camera1", EXAMPLE_MONITOR_1, 0)
+        sleep(0.02)
+        self.assertEqual((False, None), monitor_cache.lookup("group-1", "camera1"))
+
+    def test_least_recently_used_evicted(self):
+        self.monitor_cache.put("group-1", "camera1", EXAMPLE_MONITOR_1, 0)
+        self.monitor_cache.put("group-1", "camera2", EXAMPLE_MONITOR_2, 0)
+        self.monitor_cache.lookup("group-1", "camera1")
+        self.monitor_cache.put("group-1", "camera3", None, 0)
+        self.assertTrue(self.monitor_cache.lookup("group-1", "camera1")[0])
+        self.assertFalse(self.monitor_cache.lookup("group-1", "camera2")[0])
+        self.assertEqual(1, self.monitor_cache.statistics.evictions)
+
+    def test_invalidate(self):
+        self.monitor_cache.put("group-1", "camera1", EXAMPLE_MONITOR_1, 0)
+        self.monitor_cache.put("group-2", "camera1", EXAMPLE_MONITOR_1, 0)
+        self.monitor_cache.invalidate("group-1")
+        self.assertFalse(self.monitor_cache.lookup("group-1", "camera1")[0])
+        self.assertTrue(self.monitor_cache.lookup("group-2", "camera1")[0])
+
+    def test_put_after_invalidation_ignored(self):
+        generation = self.monitor_cache.generation("group-1")
+        self.monitor_cache.invalidate("group-1")
+        self.monitor_cache.put("group-1", "camera1", EXAMPLE_MONITOR_1, generation)
+        self.assertFalse(self.monitor_cache.lookup("group-1", "camera1")[0])
+
+
+class TestMonitorCacheWithOrm(unittest.TestCase):
+    """
+    Tests for use of the client's monitor cache by the monitor ORM.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        self.shinobi_client = replace(self.stand_in_shinobi.start(), monitor_cache_ttl=60)
+        self.shinobi_client.user.create("a@example.com", "password")
+        self.monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+        self.monitor_orm.create("camera1", get_monitor_configuration(1))
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_reads_served_from_cache(self):
+        monitor = self.monitor_orm.get("camera1")
+        monitors = self.monitor_orm.get_all()
+        # Changed by another client, so only visible if not served from the cache
+        other_shinobi_client = replace(self.shinobi_client, monitor_cache_ttl=None)
+        other_shinobi_client.monitor("a@example.com", "password").create("camera2", get_monitor_configuration(2))
+        other_shinobi_client.close()
+        self.assertEqual(monitor, self.monitor_orm.get("camera1"))
+        self.assertEqual(monitors, self.monitor_orm.get_all())
+        self.assertEqual(2, self.shinobi_client.monitor_cache.statistics.hits)
+
+    def test_invalidated_by_changes(self):
+        self.assertEqual(1, len(self.monitor_orm.get_all()))
+        self.assertIsNone(self.monitor_orm.get("camera2"))
+        self.monitor_orm.create("camera2", get_monitor_configuration(2))
+        self.assertEqual(2, len(self.monitor_orm.get_all()))
+        self.assertIsNotNone(self.monitor_orm.get("camera2"))
+        self.assertTrue(self.monitor_orm.modify("camera2", get_monitor_configuration(1)))
+        self.assertEqual(get_monitor_configuration(1)["name"], self.monitor_orm.get("camera2")["name"])
+        self.assertTrue(self.monitor_orm.delete("camera2"))
+        self.assertIsNone(self.monitor_orm.get("camera2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import unittest
+
+from shinobi_client.orms.monitor import ShinobiMonitorOrm
+from shinobi_client.orms.monitor_diff import diff_monitor_configuration, normalise_configuration, \
+    MonitorConfigurationChange
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+EXISTING_CONFIGURATION = {"mid": "camera1", "name": "Camera 1", "port": 554, "fps": 1, "host": "192.168.0.1",
+                          "details": json.dumps({"muser": "user", "sfps": "25", "detector": {"fps": "2"}})}
+
+
+class TestDiffMonitorConfiguration(unittest.TestCase):
+    """
+    Tests for `diff_monitor_configuration`.
+    """
+    def test_no_changes(self):
+        configuration = {"name": "Camera 1", "port": "554", "fps": 1.0, "details": {"sfps": 25}}
+        changes = diff_monitor_configuration(configuration, EXISTING_CONFIGURATION)
+        self.assertFalse(changes)
+        self.assertEqual("", str(changes))
+
+    def test_keys_after_details_compared(self):
+        configuration = {"name": "Camera 1", "details": {}, "host": "192.168.0.2"}
+        changes = diff_monitor_configuration(configuration, EXISTING_CONFIGURATION)
+        self.assertEqual((MonitorConfigurationChange(("host", ), "192.168.0.1", "192.168.0.2"), ), changes.changes)
+
+    def test_details_diffed_recursively(self):
+        configuration = {"details": {"muser": "other", "detector": {"fps": "2", "scale": "1"}}}
+        changes = diff_monitor_configuration(configuration, EXISTING_CONFIGURATION)
+        self.assertEqual([
+            MonitorConfigurationChange(("details", "muser"), "user", "other"),
+            MonitorConfigurationChange(("details", "detector", "scale"), None, "1", added=True),
+        ], list(changes))
+        self.assertEqual({"details"}, changes.changed_keys)
+        self.assertEqual({"details": {"muser": "other", "detector": {"scale": "1"}}}, changes.to_patch())
+        self.assertEqual("~ details.muser: 'user' -> 'other'\n+ details.detector.scale = '1'", str(changes))
+
+    def test_apply_to(self):
+        changes = diff_monitor_configuration({"port": 80, "details": {"muser": "other"}}, EXISTING_CONFIGURATION)
+        self.assertEqual(dict(EXISTING_CONFIGURATION, port=80,
+                              details={"muser": "other", "sfps": "25", "detector": {"fps": "2"}}),
+                         changes.apply_to(EXISTING_CONFIGURATION))
+        self.assertEqual(554, EXISTING_CONFIGURATION["port"])
+
+    def test_normalise_configuration(self):
+        self.assertEqual({"port": 0, "width": 640, "name": "1", "details": {"sfps": "25", "groups": [None]}},
+                         normalise_configuration(
+                             {"port": "", "width": "640", "name": 1, "details": '{"sfps": 25, "groups": [null]}'}))
+
+
+class TestFingerprintConfiguration(unittest.TestCase):
+    """
+    Tests for `ShinobiMonitorOrm.fingerprint_configuration`.
+    """
+    def test_equivalent_configurations(self):
+        configuration = get_monitor_configuration(1)
+        equivalent_configuration = dict(reversed(list(configuration.items())), port=str(configuration["port"]),
+                                        details=json.dumps(configuration["details"]), mid="camera1")
+        self.assertEqual(ShinobiMonitorOrm.fingerprint_configuration(configuration),
+                         ShinobiMonitorOrm.fingerprint_configuration(equivalent_configuration))
+
+    def test_different_configurations(self):
+        configuration = get_monitor_configuration(1)
+        self.assertNotEqual(ShinobiMonitorOrm.fingerprint_configuration(configuration),
+                            ShinobiMonitorOrm.fingerprint_configuration(dict(configuration, fps=2)))
+        self.assertNotEqual(
+            ShinobiMonitorOrm.fingerprint_configuration(configuration),
+            ShinobiMonitorOrm.fingerprint_configuration(
+                dict(configuration, details=dict(configuration["details"], muser="other"))))
+
+    def test_fingerprint_fields(self):
+        fields = {"name": "Camera 1", "details": {"muser": "user"}}
+        self.assertEqual(ShinobiMonitorOrm.fingerprint_configuration(fields),
+                         ShinobiMonitorOrm.fingerprint_configuration(EXISTING_CONFIGURATION, fields=fields))
+        self.assertNotEqual(ShinobiMonitorOrm.fingerprint_configuration(dict(fields, fps=2)),
+                            ShinobiMonitorOrm.fingerprint_configuration(EXISTING_CONFIGURATION, fields=fields))
+
+
+class TestModifyWithDiff(unittest.TestCase):
+    """
+    Tests that monitors are modified using the configuration diff.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        self.shinobi_client = self.stand_in_shinobi.start()
+        self.shinobi_client.user.create("a@example.com", "password")
+        self.monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+        self.monitor_orm.create("camera1", get_monitor_configuration(1))
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_modify_keeps_fields_not_given(self):
+        self.assertTrue(self.monitor_orm.modify("camera1", {"name": "Camera 1", "details": {"muser": "other"}}))
+        monitor = self.monitor_orm.get("camera1")
+        expected_details = dict(get_monitor_configuration(1)["details"], muser="other")
+        self.assertEqual(expected_details, monitor["details"])
+        self.assertEqual(554, monitor["port"])
+
+    def test_modify_no_op(self):
+        configuration = get_monitor_configuration(1)
+        configuration["port"] = str(configuration["port"])
+        self.assertFalse(self.monitor_orm.modify("camera1", configuration))
+
+    def test_apply_many_reports_changes(self):
+        configuration = dict(get_monitor_configuration(1), fps=2)
+        results = self.monitor_orm.apply_many({"camera1": configuration})
+        self.assertEqual(["fps"], [change.key for change in results["camera1"].changes])
+        self.assertTrue(results["camera1"].verified)
+
+    def test_check_drift(self):
+        self.monitor_orm.create("camera2", get_monitor_configuration(2))
+        configurations = {"camera1": get_monitor_configuration(1), "camera2": get_monitor_configuration(1),
+                          "camera3": get_monitor_configuration(1)}
+        self.assertEqual({"camera2", "camera3"}, self.monitor_orm.check_drift(configurations))
+        self.assertEqual(set(), self.monitor_orm.check_drift({"camera1": {"name": "example-camera", "details": {}}}))
+
+
+if __name__ == "__main__":
+    unittest.main()
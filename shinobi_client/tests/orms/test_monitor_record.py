@@ -0,0 +1,90 @@
+import json
+import pickle
+import unittest
+from copy import copy, deepcopy
+
+from shinobi_client.orms.monitor_record import ShinobiMonitor
+
+EXAMPLE_DETAILS = {"muser": "user", "notes": ""}
+EXAMPLE_MONITOR = {"ok": True, "mid": "camera1", "ke": "group-1", "name": "Camera 1",
+                   "details": json.dumps(EXAMPLE_DETAILS)}
+EXAMPLE_MONITOR_AS_DICT = {"mid": "camera1", "ke": "group-1", "name": "Camera 1", "details": EXAMPLE_DETAILS,
+                           "id": "camera1"}
+
+
+class TestShinobiMonitor(unittest.TestCase):
+    """
+    Tests for `ShinobiMonitor`.
+    """
+    def setUp(self):
+        self.raw = deepcopy(EXAMPLE_MONITOR)
+        self.monitor = ShinobiMonitor(self.raw)
+
+    def test_dictionary_access(self):
+        self.assertEqual(EXAMPLE_MONITOR_AS_DICT, self.monitor)
+        self.assertEqual(list(EXAMPLE_MONITOR_AS_DICT.keys()), list(self.monitor.keys()))
+        self.assertEqual(len(EXAMPLE_MONITOR_AS_DICT), len(self.monitor))
+        self.assertEqual("camera1", self.monitor["id"])
+        self.assertNotIn("ok", self.monitor)
+        self.assertIsNone(self.monitor.get("ok"))
+        self.assertRaises(KeyError, self.monitor.__getitem__, "ok")
+
+    def test_is_dictionary(self):
+        self.assertIsInstance(self.monitor, dict)
+        self.assertEqual(EXAMPLE_MONITOR_AS_DICT, dict(self.monitor))
+        self.assertEqual(EXAMPLE_MONITOR_AS_DICT, {**ShinobiMonitor(self.raw)})
+        self.assertEqual(EXAMPLE_MONITOR_AS_DICT, dict(ShinobiMonitor(self.raw).items()))
+
+    def test_json_serialisable(self):
+        self.assertEqual(EXAMPLE_MONITOR_AS_DICT, json.loads(json.dumps(self.monitor)))
+        self.assertEqual(EXAMPLE_MONITOR_AS_DICT, json.loads(json.dumps(deepcopy(ShinobiMonitor(self.raw)))))
+        self.assertEqual([EXAMPLE_MONITOR_AS_DICT], json.loads(json.dumps([ShinobiMonitor(self.raw)], indent=2)))
+
+    def test_details_parsed_once(self):
+        self.assertIsInstance(dict.__getitem__(self.monitor, "details"), str)
+        self.assertEqual("Camera 1", self.monitor["name"])
+        self.assertIsInstance(dict.__getitem__(self.monitor, "details"), str)
+        self.assertEqual(EXAMPLE_DETAILS, self.monitor["details"])
+        self.assertIs(self.monitor["details"], self.monitor["details"])
+
+    def test_decoded_details(self):
+        raw = dict(self.raw, details=deepcopy(EXAMPLE_DETAILS))
+        monitor = ShinobiMonitor(raw)
+        monitor["details"]["muser"] = "other"
+        self.assertEqual(EXAMPLE_DETAILS, raw["details"])
+        self.assertEqual(EXAMPLE_DETAILS, ShinobiMonitor(raw)["details"])
+
+    def test_set_and_delete(self):
+        self.monitor["name"] = "Camera 2"
+        self.monitor["new"] = "value"
+        del self.monitor["ke"]
+        expected = dict(EXAMPLE_MONITOR_AS_DICT, name="Camera 2", new="value")
+        del expected["ke"]
+        self.assertEqual(expected, self.monitor)
+        self.assertNotIn("ke", self.monitor)
+        self.assertRaises(KeyError, self.monitor.__delitem__, "ke")
+        self.assertEqual(EXAMPLE_MONITOR, self.raw)
+
+    def test_copies_independent(self):
+        self.monitor["details"]["muser"] = "other"
+        copied = deepcopy(self.monitor)
+        copied["details"]["muser"] = "another"
+        copied["name"] = "Camera 2"
+        self.assertEqual("other", self.monitor["details"]["muser"])
+        self.assertEqual("Camera 1", self.monitor["name"])
+        shallow_copied = copy(self.monitor)
+        shallow_copied["name"] = "Camera 3"
+        self.assertEqual("Camera 1", self.monitor["name"])
+
+    def test_to_dict(self):
+        monitor_as_dict = self.monitor.to_dict()
+        self.assertIs(dict, type(monitor_as_dict))
+        self.assertEqual(EXAMPLE_MONITOR_AS_DICT, json.loads(json.dumps(monitor_as_dict)))
+
+    def test_pickle(self):
+        self.monitor["name"] = "Camera 2"
+        self.assertEqual(self.monitor, pickle.loads(pickle.dumps(self.monitor)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,10 @@
 import unittest
+from dataclasses import replace
 
-from shinobi_client.shinobi_controller import start_shinobi
 from shinobi_client.api_key import ShinobiApiKey
 from shinobi_client.orms.user import ShinobiUserOrm, ShinobiWrongPasswordError, ShinobiUserAlreadyExistsError, \
     ShinobiUserDoesNotExistError
-from shinobi_client.tests._common import _create_email_and_password, TestWithShinobi
+from shinobi_client.tests._common import _create_email_and_password, TestWithShinobi, start_clean_shinobi
 from shinobi_client._common import ShinobiSuperUserCredentialsRequiredError
 
 
@@ -17,6 +17,8 @@ class TestShinobiUserOrm(TestWithShinobi):
         self.user_orm = ShinobiUserOrm(self.shinobi_client)
         self.superless_user_orm = ShinobiUserOrm(self.superless_shinobi_client)
         self.api_key = ShinobiApiKey(self.shinobi_client)
+        self.directory_shinobi_client = replace(self.shinobi_client, user_directory_ttl=60)
+        self.directory_user_orm = ShinobiUserOrm(self.directory_shinobi_client)
 
     def test_create(self):
         email, password = _create_email_and_password()
@@ -54,13 +56,13 @@ class TestShinobiUserOrm(TestWithShinobi):
 
     def test_get_all_when_no_users(self):
         # Need to start clean installation to ensure no other users
-        with start_shinobi() as shinobi_client:
+        with start_clean_shinobi() as shinobi_client:
             user_orm = ShinobiUserOrm(shinobi_client)
             self.assertEqual((), user_orm.get_all())
 
     def test_get_all_when_single_user(self):
         # Need to start clean installation to ensure no other users
-        with start_shinobi() as shinobi_client:
+        with start_clean_shinobi() as shinobi_client:
             user_orm = ShinobiUserOrm(shinobi_client)
             user = user_orm.create(*_create_email_and_password())
             users = user_orm.get_all()
@@ -100,6 +102,24 @@ class TestShinobiUserOrm(TestWithShinobi):
         self.user_orm.delete(user["email"])
         self.assertIsNone(self.user_orm.get(user["email"]))
 
+    def test_get_with_user_directory(self):
+        user = self._create_user()
+        retrieved_user = self.directory_user_orm.get(user["email"])
+        self.assertEqual(user["mail"], retrieved_user["mail"])
+        self.assertIs(retrieved_user["uid"], self.directory_shinobi_client.user_directory.get_by_email(
+            user["email"])["uid"])
+
+    def test_get_with_user_directory_when_does_not_exist(self):
+        self.assertIsNone(self.directory_user_orm.get("example@doesnotexist.com"))
+
+    def test_create_and_delete_with_user_directory(self):
+        email, password = _create_email_and_password()
+        self.assertIsNone(self.directory_user_orm.get(email))
+        self.directory_user_orm.create(email, password)
+        self.assertIsNotNone(self.directory_user_orm.get(email))
+        self.directory_user_orm.delete(email)
+        self.assertIsNone(self.directory_user_orm.get(email))
+
 
 if __name__ == "__main__":
     unittest.main()
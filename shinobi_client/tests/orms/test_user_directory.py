@@ -0,0 +1,92 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+
+from shinobi_client.orms.user_directory import ShinobiUserDirectory, ShinobiDuplicateUserError
+
+EXAMPLE_USERS = (
+    {"mail": "a@example.com", "uid": "uid-a", "ke": "group-1"},
+    {"mail": "b@example.com", "uid": "uid-b", "ke": "group-1"},
+    {"mail": "c@example.com", "uid": "uid-c", "ke": "group-2"},
+)
+
+
+class TestShinobiUserDirectory(unittest.TestCase):
+    """
+    Tests for `ShinobiUserDirectory`.
+    """
+    def setUp(self):
+        self.user_directory = ShinobiUserDirectory(ttl=60)
+
+    def test_stale_before_refresh(self):
+        self.assertTrue(self.user_directory.is_stale)
+        self.assertIsNone(self.user_directory.get_by_email(EXAMPLE_USERS[0]["mail"]))
+
+    def test_get_by_email(self):
+        self.user_directory.refresh(EXAMPLE_USERS)
+        self.assertFalse(self.user_directory.is_stale)
+        self.assertEqual(EXAMPLE_USERS[1], self.user_directory.get_by_email("b@example.com"))
+        self.assertIsNone(self.user_directory.get_by_email("does-not@exist.com"))
+
+    def test_get_by_duplicate_email(self):
+        duplicate_user = {"mail": "a@example.com", "uid": "uid-d", "ke": "group-3"}
+        self.user_directory.refresh(EXAMPLE_USERS + (duplicate_user, ))
+        with self.assertRaises(ShinobiDuplicateUserError):
+            self.user_directory.get_by_email("a@example.com")
+        self.assertEqual(EXAMPLE_USERS[1], self.user_directory.get_by_email("b@example.com"))
+        self.assertEqual(duplicate_user, self.user_directory.get_by_uid("uid-d"))
+
+    def test_get_by_uid(self):
+        self.user_directory.refresh(EXAMPLE_USERS)
+        self.assertEqual(EXAMPLE_USERS[2], self.user_directory.get_by_uid("uid-c"))
+
+    def test_get_by_group_key(self):
+        self.user_directory.refresh(EXAMPLE_USERS)
+        self.assertEqual(EXAMPLE_USERS[:2], self.user_directory.get_by_group_key("group-1"))
+        self.assertEqual((), self.user_directory.get_by_group_key("group-3"))
+
+    def test_refresh_replaces_contents(self):
+        self.user_directory.refresh(EXAMPLE_USERS)
+        self.user_directory.refresh(EXAMPLE_USERS[1:])
+        self.assertIsNone(self.user_directory.get_by_email("a@example.com"))
+        self.assertIsNone(self.user_directory.get_by_uid("uid-a"))
+
+    def test_invalidate(self):
+        self.user_directory.refresh(EXAMPLE_USERS)
+        self.user_directory.invalidate()
+        self.assertTrue(self.user_directory.is_stale)
+
+    def test_ttl(self):
+        user_directory = ShinobiUserDirectory(ttl=0.01)
+        user_directory.refresh(EXAMPLE_USERS)
+        sleep(0.02)
+        self.assertTrue(user_directory.is_stale)
+
+    def test_refresh_with_users_listed_before_invalidation(self):
+        generation = self.user_directory.generation
+        self.user_directory.invalidate()
+        self.user_directory.refresh(EXAMPLE_USERS, generation)
+        self.assertTrue(self.user_directory.is_stale)
+
+    def test_refresh_using_when_fresh(self):
+        self.user_directory.refresh(EXAMPLE_USERS)
+        self.user_directory.refresh_using(lambda: self.fail("Refreshed fresh directory"))
+
+    def test_refresh_using_coalesces_concurrent_refreshes(self):
+        list_count = 0
+
+        def list_users():
+            nonlocal list_count
+            list_count += 1
+            sleep(0.05)
+            self.user_directory.refresh(EXAMPLE_USERS)
+
+        with ThreadPoolExecutor(8) as executor:
+            for _ in range(8):
+                executor.submit(self.user_directory.refresh_using, list_users)
+        self.assertEqual(1, list_count)
+        self.assertFalse(self.user_directory.is_stale)
+
+
+if __name__ == "__main__":
+    unittest.main()
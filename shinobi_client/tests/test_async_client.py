@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+from typing import Awaitable, Any
+
+from shinobi_client.orms.monitor import ShinobiMonitorAlreadyExistsError
+from shinobi_client.orms.user import ShinobiWrongPasswordError, ShinobiUserAlreadyExistsError
+from shinobi_client._common import generate_random_string, ShinobiSuperUserCredentialsRequiredError
+from shinobi_client.tests._common import TestWithShinobi, _create_email_and_password, has_async_extra, \
+    ASYNC_SKIP_REASON
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+if has_async_extra():
+    from shinobi_client.async_client import AsyncShinobiClient
+
+EXAMPLE_MONITOR_1_CONFIGURATION = get_monitor_configuration(1)
+EXAMPLE_MONITOR_2_CONFIGURATION = get_monitor_configuration(2)
+
+
+@unittest.skipUnless(has_async_extra(), ASYNC_SKIP_REASON)
+class TestAsyncShinobiClient(TestWithShinobi):
+    """
+    Tests for `AsyncShinobiClient` and its ORMs.
+    """
+    def setUp(self):
+        super().setUp()
+        self.async_shinobi_client = AsyncShinobiClient(
+            self.shinobi_client.host, self.shinobi_client.port, super_user_token=self.shinobi_client.super_user_token,
+            max_concurrency=4)
+        self.superless_async_shinobi_client = AsyncShinobiClient(self.shinobi_client.host, self.shinobi_client.port)
+
+    def test_user_create_get_and_delete(self):
+        async def run():
+            email, password = _create_email_and_password()
+            created = await self.async_shinobi_client.user.create(email, password)
+            retrieved = await self.async_shinobi_client.user.get(email)
+            deleted = await self.async_shinobi_client.user.delete(email)
+            return created, retrieved, deleted, await self.async_shinobi_client.user.get(email)
+
+        created, retrieved, deleted, retrieved_after_delete = self._run(run())
+        self.assertEqual(created["mail"], retrieved["mail"])
+        self.assertTrue(deleted)
+        self.assertIsNone(retrieved_after_delete)
+
+    def test_user_create_when_already_exists(self):
+        user = self._create_user()
+        self.assertRaises(ShinobiUserAlreadyExistsError, self._run,
+                          self.async_shinobi_client.user.create(user["email"], user["password"]))
+
+    def test_user_create_requires_super_user_credentials(self):
+        self.assertRaises(ShinobiSuperUserCredentialsRequiredError, self._run,
+                          self.superless_async_shinobi_client.user.create(*_create_email_and_password()))
+
+    def test_user_get_with_wrong_password(self):
+        user = self._create_user()
+        self.assertRaises(ShinobiWrongPasswordError, self._run,
+                          self.superless_async_shinobi_client.user.get(user["email"], "invalid"))
+
+    def test_user_modify_password(self):
+        user = self._create_user()
+        _, password = _create_email_and_password()
+        self.assertTrue(self._run(self.async_shinobi_client.user.modify(user["email"], password=password)))
+        self.assertIsNotNone(self.shinobi_client.api_key.get(user["email"], password))
+
+    def test_monitor_create_modify_and_delete(self):
+        user = self._create_user()
+
+        async def run():
+            monitor_orm = self.superless_async_shinobi_client.monitor(user["email"], user["password"])
+            monitor_id = generate_random_string()
+            created = await monitor_orm.create(monitor_id, EXAMPLE_MONITOR_1_CONFIGURATION)
+            modified = await monitor_orm.modify(monitor_id, EXAMPLE_MONITOR_2_CONFIGURATION)
+            retrieved = await monitor_orm.get(monitor_id)
+            deleted = await monitor_orm.delete(monitor_id)
+            return monitor_id, created, modified, retrieved, deleted, await monitor_orm.get_all()
+
+        monitor_id, created, modified, retrieved, deleted, monitors = self._run(run())
+        self.assertEqual(monitor_id, created["id"])
+        self.assertTrue(modified)
+        self.assertEqual(EXAMPLE_MONITOR_2_CONFIGURATION["name"], retrieved["name"])
+        self.assertTrue(deleted)
+        self.assertEqual(tuple(), monitors)
+
+    def test_monitor_create_when_already_exists(self):
+        user = self._create_user()
+        monitor_orm = self.superless_async_shinobi_client.monitor(user["email"], user["password"])
+        monitor_id = generate_random_string()
+        self._run(monitor_orm.create(monitor_id, EXAMPLE_MONITOR_1_CONFIGURATION))
+        self.assertRaises(ShinobiMonitorAlreadyExistsError, self._run,
+                          monitor_orm.create(monitor_id, EXAMPLE_MONITOR_1_CONFIGURATION))
+
+    def test_monitor_with_wrong_password(self):
+        user = self._create_user()
+        monitor_orm = self.superless_async_shinobi_client.monitor(user["email"], "invalid")
+        self.assertRaises(ShinobiWrongPasswordError, self._run, monitor_orm.get_all())
+
+    def test_concurrent_operations(self):
+        user = self._create_user()
+
+        async def run():
+            monitor_orm = self.superless_async_shinobi_client.monitor(user["email"], user["password"])
+            monitor_ids = [generate_random_string() for _ in range(10)]
+            await asyncio.gather(*(monitor_orm.create(monitor_id, EXAMPLE_MONITOR_1_CONFIGURATION)
+                                   for monitor_id in monitor_ids))
+            return monitor_ids, await monitor_orm.get_all()
+
+        monitor_ids, monitors = self._run(run())
+        self.assertCountEqual(monitor_ids, (monitor["mid"] for monitor in monitors))
+
+    def _run(self, awaitable: Awaitable) -> Any:
+        """
+        Runs the given awaitable to completion, closing the clients' connections afterwards.
+        :param awaitable: awaitable to run
+        :return: result of the awaitable
+        """
+        async def run():
+            try:
+                return await awaitable
+            finally:
+                await self.async_shinobi_client.close()
+                await self.superless_async_shinobi_client.close()
+
+        return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
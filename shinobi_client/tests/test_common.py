@@ -0,0 +1,72 @@
+import json
+import unittest
+from typing import Any
+from unittest.mock import patch
+
+from requests import Response, HTTPError
+
+from shinobi_client._common import decode, raise_if_errors, is_not_authorized, ShinobiEnvelope, loads, \
+    dumps_canonical
+
+
+def _create_response(content: Any, status_code: int = 200) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = json.dumps(content).encode()
+    return response
+
+
+class TestDecode(unittest.TestCase):
+    """
+    Tests for `decode` and the functions that use it.
+    """
+    def test_decode_object(self):
+        envelope = decode(_create_response({"ok": False, "msg": "Failed"}))
+        self.assertEqual(ShinobiEnvelope(False, "Failed", {"ok": False, "msg": "Failed"}), envelope)
+
+    def test_decode_list(self):
+        self.assertEqual(ShinobiEnvelope(True, None, [1, 2]), decode(_create_response([1, 2])))
+
+    def test_decode_object_without_ok(self):
+        response = _create_response({"mid": "camera1"})
+        self.assertFalse(decode(response).ok)
+        self.assertTrue(decode(response, ok_if_missing=True).ok)
+        self.assertRaises(RuntimeError, raise_if_errors, response)
+
+    def test_decode_once(self):
+        response = _create_response({"ok": True})
+        with patch("shinobi_client._common.loads", wraps=loads) as mock_loads:
+            raise_if_errors(response)
+            decode(response)
+            is_not_authorized(response)
+        self.assertEqual(1, mock_loads.call_count)
+
+    def test_decode_error_status(self):
+        self.assertRaises(HTTPError, decode, _create_response({}, status_code=500))
+
+    def test_raise_if_errors(self):
+        self.assertRaisesRegex(
+            RuntimeError, "Failed", raise_if_errors, _create_response({"ok": False, "msg": "Failed"}))
+        self.assertFalse(raise_if_errors(_create_response({"ok": False}), raise_if_json_not_ok=False).ok)
+
+    def test_is_not_authorized(self):
+        self.assertTrue(is_not_authorized(_create_response({"ok": False, "msg": "Not Authorized"})))
+        self.assertFalse(is_not_authorized(_create_response({"ok": True, "name": "Not Authorized"})))
+        self.assertFalse(is_not_authorized(_create_response([])))
+
+
+class TestDumpsCanonical(unittest.TestCase):
+    """
+    Tests for `dumps_canonical`.
+    """
+    def test_same_with_and_without_orjson(self):
+        value = {"b": ["é", None, True, 1, "\u2028\n\"\\"], "a": {"d": "\x00", "c": False}}
+        with patch("shinobi_client._common.orjson", None):
+            encoded = dumps_canonical(value)
+        self.assertEqual(value, json.loads(encoded))
+        self.assertTrue(encoded.startswith(b'{"a":{"c":false,'))
+        self.assertEqual(encoded, dumps_canonical(value))
+
+
+if __name__ == "__main__":
+    unittest.main()
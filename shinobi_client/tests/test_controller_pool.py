@@ -0,0 +1,119 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+from typing import List
+
+from shinobi_client.controller_pool import ShinobiControllerPool, reset_shinobi, ShinobiResetError
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+
+class TestShinobiControllerPool(unittest.TestCase):
+    """
+    Tests for `ShinobiControllerPool`.
+    """
+    def setUp(self):
+        self.started: List[StandInShinobi] = []
+
+        def create_stand_in() -> StandInShinobi:
+            stand_in_shinobi = StandInShinobi()
+            self.started.append(stand_in_shinobi)
+            return stand_in_shinobi
+
+        self.create_stand_in = create_stand_in
+        self.pool = ShinobiControllerPool(size=2, controller_factory=create_stand_in)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_reuses_installation(self):
+        with self.pool.lease() as shinobi_client:
+            shinobi_client.user.create("a@example.com", "password")
+            shinobi_client.monitor("a@example.com", "password").create("camera1", get_monitor_configuration(1))
+        with self.pool.lease() as reused_shinobi_client:
+            self.assertIs(shinobi_client, reused_shinobi_client)
+            self.assertEqual((), reused_shinobi_client.user.get_all())
+            reused_shinobi_client.user.create("a@example.com", "password")
+            self.assertEqual((), reused_shinobi_client.monitor("a@example.com", "password").get_all())
+        self.assertEqual(1, len(self.started))
+
+    def test_starts_up_to_size(self):
+        first = self.pool.acquire()
+        second = self.pool.acquire()
+        self.assertIsNot(first, second)
+        self.assertRaises(TimeoutError, self.pool.acquire, timeout=0.01)
+        self.pool.release(first)
+        self.assertIs(first, self.pool.acquire(timeout=0.01))
+        self.assertEqual(2, len(self.started))
+
+    def test_close_stops_installations(self):
+        shinobi_client = self.pool.acquire()
+        self.pool.release(shinobi_client)
+        self.pool.close()
+        self.assertRaises(RuntimeError, self.pool.acquire)
+        self.assertRaises(Exception, shinobi_client.user.get_all)
+
+    def test_waiter_starts_installation_after_failed_reset(self):
+        def reset(shinobi_client):
+            raise ShinobiResetError("Users remain after deleting all users")
+
+        pool = ShinobiControllerPool(size=1, controller_factory=self.create_stand_in, reset=reset)
+        shinobi_client = pool.acquire()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            waiter = executor.submit(pool.acquire)
+            sleep(0.05)
+            self.assertRaises(ShinobiResetError, pool.release, shinobi_client)
+            started_shinobi_client = waiter.result(timeout=10)
+        self.assertIsNot(shinobi_client, started_shinobi_client)
+        self.assertEqual(2, len(self.started))
+        self.assertRaises(ShinobiResetError, pool.release, started_shinobi_client)
+
+    def test_waiter_starts_installation_after_failed_start(self):
+        failed = []
+
+        def create_stand_in_that_fails_to_start() -> StandInShinobi:
+            stand_in_shinobi = self.create_stand_in()
+            if len(failed) == 0:
+                failed.append(stand_in_shinobi)
+
+                def start():
+                    sleep(0.1)
+                    raise RuntimeError("Shinobi failed to start")
+                stand_in_shinobi.start = start
+            return stand_in_shinobi
+
+        pool = ShinobiControllerPool(size=1, controller_factory=create_stand_in_that_fails_to_start)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            starter = executor.submit(pool.acquire)
+            sleep(0.05)
+            waiter = executor.submit(pool.acquire)
+            self.assertRaises(RuntimeError, starter.result, timeout=10)
+            pool.release(waiter.result(timeout=10))
+        pool.close()
+
+    def test_close_wakes_waiters(self):
+        leased = [self.pool.acquire(), self.pool.acquire()]
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            waiter = executor.submit(self.pool.acquire)
+            sleep(0.05)
+            self.pool.close()
+            self.assertRaises(RuntimeError, waiter.result, timeout=10)
+        for shinobi_client in leased:
+            self.pool.release(shinobi_client)
+            self.assertRaises(Exception, shinobi_client.user.get_all)
+
+
+class TestResetShinobi(unittest.TestCase):
+    """
+    Tests for `reset_shinobi`.
+    """
+    def test_reset(self):
+        with StandInShinobi() as shinobi_client:
+            for i in range(5):
+                shinobi_client.user.create(f"{i}@example.com", "password")
+            reset_shinobi(shinobi_client)
+            self.assertEqual((), shinobi_client.user.get_all())
+
+
+if __name__ == "__main__":
+    unittest.main()
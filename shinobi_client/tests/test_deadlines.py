@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic, sleep
+
+from shinobi_client.deadlines import ShinobiTimeoutError, deadline_scope, get_deadline_scope, accepts_deadline
+from shinobi_client.polling import poll, PollPolicy
+from shinobi_client.profiling import in_current_context
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests._common import has_async_extra, ASYNC_SKIP_REASON
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+if has_async_extra():
+    from shinobi_client.async_client import AsyncShinobiClient
+
+
+class TestDeadlineScope(unittest.TestCase):
+    """
+    Tests for `deadline_scope` and `accepts_deadline`.
+    """
+    def test_no_deadline(self):
+        with deadline_scope(None) as scope:
+            self.assertIsNone(scope)
+            self.assertIsNone(get_deadline_scope())
+
+    def test_sooner_enclosing_deadline_applies(self):
+        with deadline_scope(0.5, "outer") as outer:
+            with deadline_scope(60, "inner") as inner:
+                self.assertEqual(outer.expires_at, inner.expires_at)
+                self.assertEqual("inner", inner.operation)
+                self.assertEqual(0.5, inner.deadline)
+            with deadline_scope(0.1, "inner") as inner:
+                self.assertLess(inner.expires_at, outer.expires_at)
+            self.assertIs(outer, get_deadline_scope())
+        self.assertIsNone(get_deadline_scope())
+
+    def test_invalid_deadline(self):
+        with self.assertRaises(ValueError):
+            with deadline_scope(0):
+                pass
+
+    def test_accepts_deadline(self):
+        @accepts_deadline("operation")
+        def operation():
+            return get_deadline_scope()
+
+        self.assertIsNone(operation())
+        scope = operation(deadline=10)
+        self.assertEqual("operation", scope.operation)
+        self.assertEqual(10, scope.deadline)
+
+    def test_propagates_to_worker_threads(self):
+        with deadline_scope(10) as scope:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                self.assertIs(scope, executor.submit(in_current_context(get_deadline_scope)).result())
+
+    def test_bounds_polling(self):
+        started_at = monotonic()
+        with self.assertRaises(ShinobiTimeoutError) as context:
+            with deadline_scope(0.2, "wait"):
+                poll(lambda: False, policy=PollPolicy(initial_interval=0.01, deadline=60))
+        self.assertLess(monotonic() - started_at, 1.0)
+        self.assertEqual("wait", context.exception.operation)
+        self.assertEqual("polling", context.exception.phase)
+
+    def test_polling_deadline_sooner_than_scope(self):
+        with deadline_scope(60):
+            result = poll(lambda: False, policy=PollPolicy(initial_interval=0.01, deadline=0.05))
+        self.assertFalse(result.converged)
+
+
+class TestDeadlines(unittest.TestCase):
+    """
+    Tests for deadlines of ORM operations.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        self.shinobi_client = self.stand_in_shinobi.start()
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_within_deadline(self):
+        user = self.shinobi_client.user.create("a@example.com", "password", deadline=10)
+        self.assertEqual("a@example.com", user["mail"])
+
+    def test_stuck_shinobi(self):
+        self.stand_in_shinobi.latency = 2.0
+        started_at = monotonic()
+        with self.assertRaises(ShinobiTimeoutError) as context:
+            self.shinobi_client.user.get_all(deadline=0.2)
+        self.assertLess(monotonic() - started_at, 1.0)
+        self.assertEqual("user.get_all", context.exception.operation)
+        self.assertEqual("GET super/accounts/list", context.exception.phase)
+        self.assertEqual(0.2, context.exception.deadline)
+
+    def test_reports_phase_that_used_up_deadline(self):
+        self.shinobi_client.user.create("a@example.com", "password")
+        with self.assertRaises(ShinobiTimeoutError) as context:
+            with deadline_scope(0.05, "provision"):
+                sleep(0.1)
+                self.shinobi_client.user.get("a@example.com")
+        self.assertEqual("user.get", context.exception.operation)
+        self.assertEqual("GET super/accounts/list", context.exception.phase)
+        self.assertEqual(0.05, context.exception.deadline)
+
+    def test_composite_operation_with_stuck_shinobi(self):
+        self.shinobi_client.user.create("a@example.com", "password")
+        monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+        self.stand_in_shinobi.latency = 2.0
+        started_at = monotonic()
+        with self.assertRaises(ShinobiTimeoutError):
+            monitor_orm.apply_many({f"camera{i}": {"name": f"camera{i}"} for i in range(4)}, deadline=0.2)
+        self.assertLess(monotonic() - started_at, 1.0)
+
+    def test_apply_many_keeps_results_if_verification_times_out(self):
+        self.shinobi_client.user.create("a@example.com", "password")
+        monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+        configure_monitor = self.stand_in_shinobi._configure_monitor
+
+        def configure_all_but_camera1(group_key, monitor_id, body):
+            # Accepted but never applied, so cannot be verified
+            return configure_monitor(group_key, monitor_id, body) if monitor_id != "camera1" else {"ok": True}
+
+        self.stand_in_shinobi._configure_monitor = configure_all_but_camera1
+        results = monitor_orm.apply_many({f"camera{i}": get_monitor_configuration(1) for i in range(2)}, deadline=0.5)
+        self.assertTrue(results["camera0"].succeeded)
+        self.assertFalse(results["camera1"].verified)
+        self.assertIsInstance(results["camera1"].error, ShinobiTimeoutError)
+        self.assertEqual("monitor.apply_many", results["camera1"].error.operation)
+
+    @unittest.skipUnless(has_async_extra(), ASYNC_SKIP_REASON)
+    def test_async_client(self):
+        self.stand_in_shinobi.latency = 2.0
+
+        async def run():
+            async with AsyncShinobiClient(self.shinobi_client.host, self.shinobi_client.port,
+                                          super_user_token=self.shinobi_client.super_user_token) as async_client:
+                await async_client.user.get_all(deadline=0.2)
+
+        started_at = monotonic()
+        with self.assertRaises(ShinobiTimeoutError) as context:
+            asyncio.run(run())
+        self.assertLess(monotonic() - started_at, 1.0)
+        self.assertEqual("GET super/accounts/list", context.exception.phase)
+
+
+if __name__ == "__main__":
+    unittest.main()
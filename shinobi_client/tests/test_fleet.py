@@ -0,0 +1,89 @@
+import unittest
+from time import monotonic
+
+from shinobi_client.deadlines import ShinobiTimeoutError
+from shinobi_client.fleet import ShinobiFleet, FleetHost, FleetItem, ShinobiFleetError
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+
+class TestShinobiFleet(unittest.TestCase):
+    """
+    Tests for `ShinobiFleet`.
+    """
+    def setUp(self):
+        self.stand_in_shinobis = {name: StandInShinobi() for name in ("site-a", "site-b", "site-c")}
+        hosts = []
+        for name, stand_in_shinobi in self.stand_in_shinobis.items():
+            shinobi_client = stand_in_shinobi.start()
+            shinobi_client.close()
+            hosts.append(FleetHost(name, shinobi_client.host, shinobi_client.port,
+                                   super_user_token=shinobi_client.super_user_token))
+        self.fleet = ShinobiFleet.from_hosts(hosts)
+
+    def tearDown(self):
+        self.fleet.close()
+        for stand_in_shinobi in self.stand_in_shinobis.values():
+            stand_in_shinobi.stop()
+
+    def test_get_all_users(self):
+        self.fleet.create_user("a@example.com", "password").raise_for_errors()
+        self.fleet.clients["site-b"].user.create("b@example.com", "password")
+
+        result = self.fleet.get_all_users()
+        self.assertTrue(result.succeeded)
+        self.assertEqual(("site-a", "site-b", "site-c"), tuple(result.values.keys()))
+        self.assertEqual([("site-a", "a@example.com"), ("site-b", "a@example.com"), ("site-b", "b@example.com"),
+                          ("site-c", "a@example.com")],
+                         sorted((item.host, item.value["email"]) for item in result.merge()))
+        self.assertIsInstance(result.merge()[0], FleetItem)
+
+    def test_takes_as_long_as_slowest_host(self):
+        for stand_in_shinobi in self.stand_in_shinobis.values():
+            stand_in_shinobi.latency = 0.2
+        started_at = monotonic()
+        self.fleet.get_all_users().raise_for_errors()
+        self.assertLess(monotonic() - started_at, 0.5)
+
+    def test_partial_results(self):
+        self.stand_in_shinobis["site-b"].stop()
+        result = self.fleet.get_all_users()
+        self.assertFalse(result.succeeded)
+        self.assertEqual({"site-a": (), "site-c": ()}, result.values)
+        self.assertEqual(["site-b"], list(result.errors.keys()))
+        with self.assertRaises(ShinobiFleetError) as context:
+            result.raise_for_errors()
+        self.assertIn("site-b", context.exception.errors)
+
+    def test_deadline_bounds_each_host(self):
+        self.stand_in_shinobis["site-c"].latency = 2.0
+        started_at = monotonic()
+        result = self.fleet.get_all_users(deadline=0.3)
+        self.assertLess(monotonic() - started_at, 1.0)
+        self.assertEqual({"site-a", "site-b"}, set(result.values.keys()))
+        self.assertIsInstance(result.errors["site-c"], ShinobiTimeoutError)
+
+    def test_monitors(self):
+        self.fleet.create_user("a@example.com", "password").raise_for_errors()
+        configurations = {"camera1": get_monitor_configuration(1), "camera2": get_monitor_configuration(2)}
+        self.fleet.apply_monitors("a@example.com", "password", configurations).raise_for_errors()
+
+        result = self.fleet.get_all_monitors("a@example.com", "password")
+        self.assertEqual(6, len(result.merge()))
+        self.assertEqual({"camera1", "camera2"},
+                         {item.value["mid"] for item in result.merge() if item.host == "site-a"})
+
+    def test_run_on_some_hosts(self):
+        result = self.fleet.run(lambda shinobi_client: shinobi_client.port, hosts=["site-c", "site-a"])
+        self.assertEqual(["site-a", "site-c"], list(result.values.keys()))
+        with self.assertRaises(KeyError):
+            self.fleet.run(lambda shinobi_client: None, hosts=["site-d"])
+
+    def test_unique_host_names(self):
+        with self.assertRaises(ValueError):
+            ShinobiFleet.from_hosts([FleetHost("site-a", "localhost", "8080"),
+                                     FleetHost("site-a", "localhost", "8081")])
+
+
+if __name__ == "__main__":
+    unittest.main()
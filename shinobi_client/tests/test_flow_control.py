@@ -0,0 +1,227 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from time import monotonic, sleep
+
+from requests import ConnectionError
+
+from shinobi_client.client import ShinobiClient
+from shinobi_client.flow_control import AdaptiveConcurrencyLimiter, CircuitBreaker, RetryPolicy, ShinobiFlowControl, \
+    ShinobiCircuitOpenError, CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN
+from shinobi_client.orms.user import ShinobiWrongPasswordError
+from shinobi_client.testing import StandInShinobi, DROP_CONNECTION
+from shinobi_client.tests._common import has_async_extra, ASYNC_SKIP_REASON
+
+if has_async_extra():
+    from shinobi_client.async_client import AsyncShinobiClient
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    """
+    Tests for `AdaptiveConcurrencyLimiter`.
+    """
+    def test_limits_requests_in_flight(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2)
+        self.assertTrue(limiter.acquire())
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire(timeout=0.01))
+        self.assertEqual(2, limiter.in_flight)
+
+    def test_waiter_allowed_on_release(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        started_at = monotonic()
+        limiter.acquire()
+        waiting = Event()
+
+        def wait() -> bool:
+            waiting.set()
+            return limiter.acquire(timeout=5)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(wait)
+            waiting.wait()
+            sleep(0.01)
+            limiter.release(started_at, False)
+            self.assertTrue(future.result())
+        self.assertEqual(1, limiter.in_flight)
+
+    def test_additive_increase(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, latency_threshold=60)
+        for _ in range(4):
+            limiter.acquire()
+            limiter.release(monotonic(), False)
+        self.assertEqual(3, limiter.limit)
+
+    def test_multiplicative_decrease_once_per_burst(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        started_at = monotonic()
+        for _ in range(4):
+            limiter.acquire()
+        for _ in range(4):
+            limiter.release(started_at, True)
+        self.assertEqual(4, limiter.limit)
+
+        limiter.acquire()
+        limiter.release(monotonic(), True)
+        self.assertEqual(2, limiter.limit)
+
+    def test_decreases_on_high_latency(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, latency_threshold=0.01)
+        limiter.acquire()
+        limiter.release(monotonic(), False)
+        limiter.acquire()
+        limiter.release(monotonic() - 0.5, False)
+        self.assertEqual(4, limiter.limit)
+
+    def test_neutral_outcome(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8)
+        limiter.acquire()
+        limiter.release(monotonic(), None)
+        self.assertEqual(8, limiter.limit)
+        self.assertEqual(0, limiter.in_flight)
+
+    def test_async_acquire(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+
+        async def run():
+            started_at = monotonic()
+            await limiter.async_acquire()
+            self.assertFalse(await limiter.async_acquire(timeout=0.01))
+            waiter = asyncio.create_task(limiter.async_acquire(timeout=5))
+            await asyncio.sleep(0.01)
+            limiter.release(started_at, False)
+            return await waiter
+
+        self.assertTrue(asyncio.run(run()))
+        self.assertEqual(1, limiter.in_flight)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Tests for `CircuitBreaker`.
+    """
+    def setUp(self):
+        self.circuit_breaker = CircuitBreaker("shinobi:8080", failure_threshold=2, reset_timeout=0.05)
+
+    def test_opens_after_consecutive_failures(self):
+        for failed in (True, False, True):
+            self.circuit_breaker.check()
+            self.circuit_breaker.record(failed)
+        self.assertEqual(CIRCUIT_CLOSED, self.circuit_breaker.state)
+        self.circuit_breaker.check()
+        self.circuit_breaker.record(True)
+        self.assertEqual(CIRCUIT_OPEN, self.circuit_breaker.state)
+        with self.assertRaises(ShinobiCircuitOpenError) as context:
+            self.circuit_breaker.check()
+        self.assertEqual("shinobi:8080", context.exception.host)
+
+    def test_half_open_trial(self):
+        for _ in range(2):
+            self.circuit_breaker.record(True)
+        sleep(0.05)
+        self.assertEqual(CIRCUIT_HALF_OPEN, self.circuit_breaker.state)
+        self.circuit_breaker.check()
+        with self.assertRaises(ShinobiCircuitOpenError):
+            self.circuit_breaker.check()
+        self.circuit_breaker.record(True)
+        self.assertEqual(CIRCUIT_OPEN, self.circuit_breaker.state)
+
+        sleep(0.05)
+        self.circuit_breaker.check()
+        self.circuit_breaker.record(False)
+        self.assertEqual(CIRCUIT_CLOSED, self.circuit_breaker.state)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """
+    Tests for `RetryPolicy`.
+    """
+    def test_should_retry(self):
+        retry_policy = RetryPolicy(max_attempts=2)
+        self.assertTrue(retry_policy.should_retry("GET", 1, 503))
+        self.assertTrue(retry_policy.should_retry("GET", 1, None))
+        self.assertFalse(retry_policy.should_retry("GET", 1, 200))
+        self.assertFalse(retry_policy.should_retry("GET", 1, 404))
+        self.assertFalse(retry_policy.should_retry("GET", 2, 503))
+        self.assertFalse(retry_policy.should_retry("POST", 1, 503))
+
+
+class TestShinobiFlowControl(unittest.TestCase):
+    """
+    Tests for clients using `ShinobiFlowControl`.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        stand_in_client = self.stand_in_shinobi.start()
+        self.flow_control = ShinobiFlowControl(
+            retry_policy=RetryPolicy(initial_interval=0.001),
+            circuit_breaker_factory=lambda host: CircuitBreaker(host, failure_threshold=3, reset_timeout=60))
+        self.shinobi_client = ShinobiClient(stand_in_client.host, stand_in_client.port,
+                                            super_user_token=stand_in_client.super_user_token,
+                                            flow_control=self.flow_control)
+        self.host = f"{stand_in_client.host}:{stand_in_client.port}"
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_retries_reads(self):
+        self.stand_in_shinobi.fail_next(1, 503)
+        self.stand_in_shinobi.fail_next(1, DROP_CONNECTION)
+        requests_before = self.stand_in_shinobi.requests
+        self.assertEqual((), self.shinobi_client.user.get_all())
+        self.assertEqual(3, self.stand_in_shinobi.requests - requests_before)
+
+    def test_does_not_retry_writes(self):
+        self.stand_in_shinobi.fail_next(1, 503)
+        requests_before = self.stand_in_shinobi.requests
+        response = self.shinobi_client.transport.post(f"{self.shinobi_client.url}/?json=true", data={})
+        self.assertEqual(503, response.status_code)
+        self.assertEqual(1, self.stand_in_shinobi.requests - requests_before)
+
+    def test_decreases_limit_when_overloaded(self):
+        self.shinobi_client.user.get_all()
+        initial_limit = self.flow_control.as_dict()[self.host]["limit"]
+        self.stand_in_shinobi.fail_next(1, 503)
+        self.shinobi_client.user.get_all()
+        self.assertEqual(initial_limit // 2, self.flow_control.as_dict()[self.host]["limit"])
+
+    def test_rejected_requests_do_not_count_as_overload(self):
+        self.shinobi_client.user.create("a@example.com", "password")
+        initial_limit = self.flow_control.as_dict()[self.host]["limit"]
+        requests_before = self.stand_in_shinobi.requests
+        for _ in range(4):
+            with self.assertRaises(ShinobiWrongPasswordError):
+                self.shinobi_client.user.get("a@example.com", "wrong-password")
+        self.assertEqual(4, self.stand_in_shinobi.requests - requests_before)
+        self.assertLessEqual(initial_limit, self.flow_control.as_dict()[self.host]["limit"])
+        self.assertEqual(CIRCUIT_CLOSED, self.flow_control.as_dict()[self.host]["circuit"])
+
+    def test_circuit_breaker_fails_fast(self):
+        self.stand_in_shinobi.fail_next(3, DROP_CONNECTION)
+        with self.assertRaises(ConnectionError):
+            self.shinobi_client.user.get_all()
+        self.assertEqual(CIRCUIT_OPEN, self.flow_control.as_dict()[self.host]["circuit"])
+
+        requests_before = self.stand_in_shinobi.requests
+        with self.assertRaises(ShinobiCircuitOpenError):
+            self.shinobi_client.user.get_all()
+        self.assertEqual(requests_before, self.stand_in_shinobi.requests)
+
+    @unittest.skipUnless(has_async_extra(), ASYNC_SKIP_REASON)
+    def test_async_client(self):
+        self.stand_in_shinobi.fail_next(2, 503)
+
+        async def run():
+            async with AsyncShinobiClient(self.shinobi_client.host, self.shinobi_client.port,
+                                          super_user_token=self.shinobi_client.super_user_token,
+                                          flow_control=self.flow_control) as async_client:
+                return await asyncio.gather(*(async_client.user.get_all() for _ in range(5)))
+
+        self.assertEqual([()] * 5, asyncio.run(run()))
+        self.assertEqual(0, self.flow_control.as_dict()[self.host]["in_flight"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import unittest
+
+from requests import ConnectionError
+
+from shinobi_client.client import ShinobiClient
+from shinobi_client.metrics import get_endpoint_template, ShinobiMetrics, NO_RESPONSE_STATUS
+from shinobi_client.orms.user import ShinobiWrongPasswordError
+from shinobi_client.testing import StandInShinobi, DROP_CONNECTION
+from shinobi_client.tests._common import has_async_extra, ASYNC_SKIP_REASON
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+if has_async_extra():
+    from shinobi_client.async_client import AsyncShinobiClient
+
+
+class TestGetEndpointTemplate(unittest.TestCase):
+    """
+    Tests for `get_endpoint_template`.
+    """
+    def test_templates(self):
+        for url, template in (
+                ("http://localhost:8080/?json=true", "/"),
+                ("http://localhost:8080/super/token/accounts/list", "super/accounts/list"),
+                ("http://localhost:8080/key/monitor/group", "monitor/{ke}"),
+                ("http://localhost:8080/key/monitor/group/camera1", "monitor/{ke}/{mid}"),
+                ("http://localhost:8080/key/configureMonitor/group/camera1", "configureMonitor/{ke}/{mid}"),
+                ("http://localhost:8080/key/configureMonitor/group/camera1/delete",
+                 "configureMonitor/{ke}/{mid}/delete"),
+                ("http://localhost:8080/key", "other"),
+                ("http://localhost:8080/key/a/b/c/d/e", "other")):
+            with self.subTest(url=url):
+                self.assertEqual(template, get_endpoint_template(url))
+
+
+class TestShinobiMetrics(unittest.TestCase):
+    """
+    Tests for `ShinobiMetrics`.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        stand_in_shinobi_client = self.stand_in_shinobi.start()
+        self.metrics = ShinobiMetrics()
+        self.shinobi_client = ShinobiClient(stand_in_shinobi_client.host, stand_in_shinobi_client.port,
+                                            super_user_token=self.stand_in_shinobi.super_user_token,
+                                            metrics=self.metrics)
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_records_requests(self):
+        self.shinobi_client.user.create("a@example.com", "password", verify=False)
+        monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+        monitor_orm.create("camera1", get_monitor_configuration(1), verify=False)
+        monitor_orm.get("camera1")
+        self.assertRaises(ShinobiWrongPasswordError, self.shinobi_client.user.get, "a@example.com", "wrong")
+
+        metrics = self.metrics.as_dict()
+        self.assertEqual({"POST /", "GET super/accounts/list", "POST super/accounts/registerAdmin",
+                          "GET monitor/{ke}/{mid}", "POST configureMonitor/{ke}/{mid}"}, set(metrics.keys()))
+        login = metrics["POST /"]
+        self.assertEqual(2, login["requests"])
+        self.assertEqual({"200": 2}, login["statuses"])
+        self.assertEqual(1, login["not_ok"])
+        self.assertGreater(login["request_bytes"], 0)
+        self.assertGreater(login["response_bytes"], 0)
+
+    def test_records_failed_requests(self):
+        self.stand_in_shinobi.fail_next(status=DROP_CONNECTION)
+        self.assertRaises(ConnectionError, self.shinobi_client.user.get_all)
+        self.stand_in_shinobi.fail_next(status=503)
+        self.assertRaises(Exception, self.shinobi_client.user.get_all)
+        self.assertEqual({NO_RESPONSE_STATUS: 1, "503": 1},
+                         self.metrics.as_dict()["GET super/accounts/list"]["statuses"])
+
+    def test_to_prometheus(self):
+        self.shinobi_client.user.create("a@example.com", "password", verify=False)
+        api_key = self.shinobi_client.monitor("a@example.com", "password").api_key
+        exported = self.metrics.to_prometheus()
+        labels = 'endpoint="super/accounts/registerAdmin",method="POST"'
+        self.assertIn(f'shinobi_client_requests_total{{{labels},status="200"}} 1\n', exported)
+        self.assertIn(f'shinobi_client_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1\n', exported)
+        self.assertIn(f"shinobi_client_request_duration_seconds_count{{{labels}}} 1\n", exported)
+        self.assertIn("# TYPE shinobi_client_request_duration_seconds histogram\n", exported)
+        self.assertNotIn(self.stand_in_shinobi.super_user_token, exported)
+        self.assertNotIn(api_key, exported)
+
+    @unittest.skipUnless(has_async_extra(), ASYNC_SKIP_REASON)
+    def test_async_client(self):
+        async def run():
+            async with AsyncShinobiClient(self.shinobi_client.host, self.shinobi_client.port,
+                                          super_user_token=self.stand_in_shinobi.super_user_token,
+                                          metrics=self.metrics) as async_shinobi_client:
+                await async_shinobi_client.user.get_all()
+
+        asyncio.run(run())
+        self.assertEqual({"200": 1}, self.metrics.as_dict()["GET super/accounts/list"]["statuses"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+from itertools import count
+
+from shinobi_client.polling import poll, async_poll, PollPolicy, PollStatistics
+
+FAST_POLL_POLICY = PollPolicy(initial_interval=0.001, max_interval=0.01, deadline=1.0)
+
+
+class TestPollPolicy(unittest.TestCase):
+    """
+    Tests for `PollPolicy`.
+    """
+    def test_interval_backs_off_exponentially(self):
+        policy = PollPolicy(initial_interval=0.1, multiplier=2.0, max_interval=10.0, jitter=0.0)
+        self.assertEqual([0.1, 0.2, 0.4, 0.8], [policy.interval(attempt) for attempt in range(1, 5)])
+
+    def test_interval_capped(self):
+        policy = PollPolicy(initial_interval=1.0, multiplier=10.0, max_interval=5.0, jitter=0.0)
+        self.assertEqual(5.0, policy.interval(3))
+
+    def test_interval_jittered(self):
+        policy = PollPolicy(initial_interval=1.0, jitter=0.5)
+        intervals = [policy.interval(1) for _ in range(100)]
+        self.assertTrue(all(0.5 <= interval <= 1.5 for interval in intervals))
+        self.assertGreater(len(set(intervals)), 1)
+
+
+class TestPoll(unittest.TestCase):
+    """
+    Tests for `poll`.
+    """
+    def test_converges_immediately(self):
+        result = poll(lambda: 1, lambda value: value == 1, policy=FAST_POLL_POLICY)
+        self.assertTrue(result.converged)
+        self.assertEqual(1, result.value)
+        self.assertEqual(1, result.attempts)
+
+    def test_converges_after_attempts(self):
+        counter = count(1)
+        result = poll(lambda: next(counter), lambda value: value == 3, policy=FAST_POLL_POLICY)
+        self.assertTrue(result.converged)
+        self.assertEqual(3, result.value)
+        self.assertEqual(3, result.attempts)
+
+    def test_deadline(self):
+        policy = PollPolicy(initial_interval=0.01, max_interval=0.01, deadline=0.05)
+        result = poll(lambda: False, policy=policy)
+        self.assertFalse(result.converged)
+        self.assertGreaterEqual(result.elapsed, 0.05)
+        self.assertLess(result.elapsed, 0.5)
+        self.assertGreater(result.attempts, 1)
+
+    def test_backs_off(self):
+        policy = PollPolicy(initial_interval=0.01, multiplier=2.0, max_interval=1.0, jitter=0.0, deadline=0.2)
+        result = poll(lambda: False, policy=policy)
+        # Attempts at ~0, 0.01, 0.03, 0.07, 0.15, 0.2 seconds - a busy loop would make many more
+        self.assertLessEqual(result.attempts, 7)
+
+    def test_statistics(self):
+        statistics = PollStatistics()
+        counter = count(1)
+        poll(lambda: next(counter), lambda value: value == 2, policy=FAST_POLL_POLICY, statistics=statistics)
+        poll(lambda: False, policy=PollPolicy(initial_interval=0.01, deadline=0.02), statistics=statistics)
+        snapshot = statistics.as_dict()
+        self.assertEqual(2, snapshot["polls"])
+        self.assertEqual(1, snapshot["converged"])
+        self.assertEqual(1, snapshot["timed_out"])
+        self.assertGreaterEqual(snapshot["attempts"], 3)
+
+
+class TestAsyncPoll(unittest.TestCase):
+    """
+    Tests for `async_poll`.
+    """
+    def test_converges_after_attempts(self):
+        counter = count(1)
+
+        async def probe() -> int:
+            return next(counter)
+
+        result = asyncio.run(async_poll(probe, lambda value: value == 3, policy=FAST_POLL_POLICY))
+        self.assertTrue(result.converged)
+        self.assertEqual(3, result.attempts)
+
+    def test_deadline(self):
+        async def probe() -> bool:
+            return False
+
+        result = asyncio.run(async_poll(probe, policy=PollPolicy(initial_interval=0.01, deadline=0.05)))
+        self.assertFalse(result.converged)
+        self.assertGreaterEqual(result.elapsed, 0.05)
+
+    def test_does_not_block_event_loop(self):
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(None)
+                await asyncio.sleep(0.005)
+
+        async def probe() -> bool:
+            return len(ticks) >= 5
+
+        async def run():
+            ticker_task = asyncio.ensure_future(ticker())
+            result = await async_poll(probe, policy=PollPolicy(initial_interval=0.005, max_interval=0.005))
+            await ticker_task
+            return result
+
+        self.assertTrue(asyncio.run(run()).converged)
+
+
+if __name__ == "__main__":
+    unittest.main()
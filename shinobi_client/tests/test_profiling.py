@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+from io import StringIO
+
+from shinobi_client.profiling import ShinobiProfiler, profiled
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests._common import has_async_extra, ASYNC_SKIP_REASON
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+if has_async_extra():
+    from shinobi_client.async_client import AsyncShinobiClient
+
+
+class TestShinobiProfiler(unittest.TestCase):
+    """
+    Tests for `ShinobiProfiler`.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        self.shinobi_client = self.stand_in_shinobi.start()
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_attributes_requests_to_operations(self):
+        with ShinobiProfiler(self.shinobi_client) as profiler:
+            requests_before = self.stand_in_shinobi.requests
+            self.shinobi_client.user.create("a@example.com", "password")
+            requests = self.stand_in_shinobi.requests - requests_before
+
+        user_create = profiler.root.children["user.create"]
+        self.assertEqual(1, user_create.calls)
+        self.assertEqual(requests, user_create.total_requests)
+        self.assertEqual(requests, profiler.root.total_requests)
+        self.assertEqual({"super/accounts/registerAdmin": 1, "super/accounts/list": requests - 1},
+                         user_create.total_endpoints)
+        self.assertGreater(user_create.total_bytes, 0)
+        self.assertTrue(profiler.summary()[0].startswith(
+            f"user.create: {requests} requests ({requests - 1} super/accounts/list, 1 super/accounts/registerAdmin)"))
+
+    def test_nested_operations(self):
+        self.shinobi_client.user.create("a@example.com", "password")
+        monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+
+        @profiled("provision")
+        def provision():
+            monitor_orm.create("camera1", get_monitor_configuration(1))
+            monitor_orm.create("camera2", get_monitor_configuration(2))
+
+        with ShinobiProfiler(self.shinobi_client) as profiler:
+            provision()
+
+        provision_node = profiler.root.children["provision"]
+        monitor_create = provision_node.children["monitor.create"]
+        self.assertEqual(1, provision_node.calls)
+        self.assertEqual(0, provision_node.requests)
+        self.assertEqual(2, monitor_create.calls)
+        self.assertEqual(monitor_create.total_requests, provision_node.total_requests)
+        self.assertIn("\n  provision: ", str(profiler))
+        self.assertIn("\n    monitor.create: ", str(profiler))
+
+    def test_attributes_login_to_monitor_login(self):
+        self.shinobi_client.user.create("a@example.com", "password")
+        with ShinobiProfiler(self.shinobi_client) as profiler:
+            self.shinobi_client.monitor("a@example.com", "password")
+
+        self.assertEqual({"monitor.login"}, set(profiler.root.children.keys()))
+        self.assertEqual(1, profiler.root.children["monitor.login"].calls)
+        self.assertEqual(1, profiler.root.children["monitor.login"].requests)
+        self.assertEqual(1, profiler.root.total_requests)
+
+    def test_attributes_requests_made_in_worker_threads(self):
+        self.shinobi_client.user.create("a@example.com", "password")
+        monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+        configurations = {f"camera{i}": get_monitor_configuration(1) for i in range(5)}
+        with ShinobiProfiler(self.shinobi_client) as profiler:
+            monitor_orm.apply_many(configurations, max_workers=5)
+
+        self.assertEqual(0, profiler.root.requests)
+        self.assertEqual(5, profiler.root.children["monitor.apply_many"].endpoints["configureMonitor/{ke}/{mid}"])
+
+    def test_not_recorded_outside_of_profiler(self):
+        with ShinobiProfiler(self.shinobi_client) as profiler:
+            self.shinobi_client.user.get_all()
+        self.shinobi_client.user.get_all()
+        self.assertEqual(1, profiler.root.total_requests)
+
+    def test_decorator(self):
+        output = StringIO()
+
+        @ShinobiProfiler(self.shinobi_client, name="provision", output=output)
+        def provision():
+            return user_tooling()
+
+        @profiled("tooling")
+        def user_tooling():
+            return self.shinobi_client.user.get_all()
+
+        provision()
+        self.assertTrue(output.getvalue().startswith("provision: 1 request (1 super/accounts/list), 1 call"))
+        self.assertIn("\n  tooling: 1 request", output.getvalue())
+        self.assertIn("\n    user.get_all: 1 request", output.getvalue())
+
+    @unittest.skipUnless(has_async_extra(), ASYNC_SKIP_REASON)
+    def test_async_client(self):
+        async def run():
+            async with AsyncShinobiClient(self.shinobi_client.host, self.shinobi_client.port,
+                                          super_user_token=self.shinobi_client.super_user_token) as async_client:
+                with ShinobiProfiler(async_client) as profiler:
+                    await asyncio.gather(*(async_client.user.get_all() for _ in range(3)))
+                return profiler
+
+        profiler = asyncio.run(run())
+        self.assertEqual(3, profiler.root.children["user.get_all"].calls)
+        self.assertEqual(3, profiler.root.children["user.get_all"].requests)
+
+    @unittest.skipUnless(has_async_extra(), ASYNC_SKIP_REASON)
+    def test_async_client_attributes_login_to_monitor_login(self):
+        self.shinobi_client.user.create("a@example.com", "password")
+
+        async def run():
+            async with AsyncShinobiClient(self.shinobi_client.host, self.shinobi_client.port) as async_client:
+                monitor_orm = async_client.monitor("a@example.com", "password")
+                with ShinobiProfiler(async_client) as profiler:
+                    await monitor_orm.get_all()
+                    await monitor_orm.get_all()
+                return profiler
+
+        profiler = asyncio.run(run())
+        monitor_get_all = profiler.root.children["monitor.get_all"]
+        self.assertEqual(2, monitor_get_all.calls)
+        self.assertEqual({"monitor.login"}, set(monitor_get_all.children.keys()))
+        self.assertEqual(1, monitor_get_all.children["monitor.login"].calls)
+        self.assertEqual(1, monitor_get_all.children["monitor.login"].requests)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from dataclasses import replace
+
+from shinobi_client.client import ShinobiClient
+from shinobi_client.polling import PollPolicy
+from shinobi_client.readiness import wait_until_ready, ShinobiNotReadyError, READINESS_STAGES
+from shinobi_client.testing import StandInShinobi
+
+_POLICY = PollPolicy(initial_interval=0.01, max_interval=0.05, deadline=5.0)
+
+
+class TestWaitUntilReady(unittest.TestCase):
+    """
+    Tests for `wait_until_ready`.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        self.shinobi_client = self.stand_in_shinobi.start()
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_ready(self):
+        report = wait_until_ready(self.shinobi_client, _POLICY)
+        self.assertTrue(report.ready)
+        self.assertEqual(list(READINESS_STAGES), list(report.timings.keys()))
+        self.assertEqual([1] * len(READINESS_STAGES), [stage.attempts for stage in report.stages])
+
+    def test_waits_for_stage(self):
+        self.stand_in_shinobi.fail_next(3, status=503)
+        report = wait_until_ready(self.shinobi_client, _POLICY)
+        self.assertEqual(4, report.stages[1].attempts)
+        self.assertTrue(report.ready)
+
+    def test_not_ready_before_deadline(self):
+        shinobi_client = ShinobiClient(self.shinobi_client.host, self.shinobi_client.port, super_user_token="wrong")
+        with self.assertRaises(ShinobiNotReadyError) as context:
+            wait_until_ready(shinobi_client, replace(_POLICY, deadline=0.2))
+        report = context.exception.report
+        self.assertFalse(report.ready)
+        self.assertEqual(["tcp", "http", "accounts"], [stage.stage for stage in report.stages])
+        self.assertIn("Not Authorized", report.stages[-1].error)
+        self.assertLess(report.elapsed, 1.0)
+
+    def test_not_listening(self):
+        stopped_stand_in_shinobi = StandInShinobi()
+        shinobi_client = stopped_stand_in_shinobi.start()
+        stopped_stand_in_shinobi.stop()
+        with self.assertRaises(ShinobiNotReadyError) as context:
+            wait_until_ready(shinobi_client, replace(_POLICY, deadline=0.2))
+        self.assertEqual(["tcp"], [stage.stage for stage in context.exception.report.stages])
+
+    def test_skips_accounts_without_super_user_token(self):
+        shinobi_client = ShinobiClient(self.shinobi_client.host, self.shinobi_client.port)
+        report = wait_until_ready(shinobi_client, _POLICY)
+        self.assertEqual(["tcp", "http", "login"], list(report.timings.keys()))
+
+    def test_unknown_stage(self):
+        self.assertRaises(ValueError, wait_until_ready, self.shinobi_client, _POLICY, ("tcp", "other"))
+
+
+if __name__ == "__main__":
+    unittest.main()
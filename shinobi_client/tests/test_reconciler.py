@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+import unittest
+from tempfile import mkdtemp
+
+import toml
+
+from shinobi_client._common import generate_random_string
+from shinobi_client.orms.monitor import InvalidConfigurationError
+from shinobi_client.reconciler import load_desired_state, ShinobiReconciler, DesiredState, DesiredUser, \
+    ReconcileAction
+from shinobi_client.tests._common import TestWithShinobi, _create_email_and_password
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+EXAMPLE_MONITOR_1_CONFIGURATION = get_monitor_configuration(1)
+EXAMPLE_MONITOR_2_CONFIGURATION = get_monitor_configuration(2)
+EXAMPLE_MONITOR_3_CONFIGURATION = get_monitor_configuration(3)
+
+
+class TestLoadDesiredState(unittest.TestCase):
+    """
+    Tests for `load_desired_state`.
+    """
+    def setUp(self):
+        self.temp_directory = mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_directory)
+
+    def test_load_toml(self):
+        # Note: TOML does not have `null` so cannot represent the example configurations
+        configuration = {"name": "camera1", "port": 554, "details": {"notes": "example", "muser": "user"}}
+        raw_desired_state = {"prune_users": True, "users": [{
+            "email": "user@example.com", "password": "password", "prune_monitors": True,
+            "monitors": {"camera1": configuration}}]}
+        desired_state = load_desired_state(self._write("desired.toml", toml.dumps(raw_desired_state)))
+        self.assertEqual(DesiredState([DesiredUser(
+            "user@example.com", "password", {"camera1": configuration}, True)], True), desired_state)
+
+    def test_load_json(self):
+        raw_desired_state = {"users": [{
+            "email": "user@example.com", "password": "password",
+            "monitors": {"camera1": EXAMPLE_MONITOR_3_CONFIGURATION}}]}
+        desired_state = load_desired_state(self._write("desired.json", json.dumps(raw_desired_state)))
+        self.assertEqual(DesiredState([DesiredUser(
+            "user@example.com", "password", {"camera1": EXAMPLE_MONITOR_3_CONFIGURATION})]), desired_state)
+
+    def test_load_with_missing_password(self):
+        raw_desired_state = {"users": [{"email": "user@example.com"}]}
+        self.assertRaises(ValueError, load_desired_state, self._write("desired.json", json.dumps(raw_desired_state)))
+
+    def test_load_with_duplicate_user(self):
+        user = {"email": "user@example.com", "password": "password"}
+        raw_desired_state = {"users": [user, user]}
+        self.assertRaises(ValueError, load_desired_state, self._write("desired.json", json.dumps(raw_desired_state)))
+
+    def test_load_with_invalid_monitor(self):
+        raw_desired_state = {"users": [{
+            "email": "user@example.com", "password": "password", "monitors": {"camera1": {"name": "camera1"}}}]}
+        self.assertRaises(InvalidConfigurationError, load_desired_state,
+                          self._write("desired.json", json.dumps(raw_desired_state)))
+
+    def _write(self, file_name: str, content: str) -> str:
+        location = os.path.join(self.temp_directory, file_name)
+        with open(location, "w") as file:
+            file.write(content)
+        return location
+
+
+class TestShinobiReconciler(TestWithShinobi):
+    """
+    Tests for `ShinobiReconciler`.
+    """
+    def setUp(self):
+        super().setUp()
+        self.reconciler = ShinobiReconciler(self.shinobi_client)
+
+    def test_plan_and_apply_new_user(self):
+        email, password = _create_email_and_password()
+        monitor_id = generate_random_string()
+        desired_state = DesiredState([DesiredUser(email, password, {monitor_id: EXAMPLE_MONITOR_1_CONFIGURATION})])
+
+        plan = self.reconciler.plan(desired_state)
+        self.assertEqual([ReconcileAction.CREATE, ReconcileAction.CREATE],
+                         [change.action for change in plan.changes])
+
+        applied_changes = self.reconciler.apply(plan)
+        self.assertTrue(all(applied_change.succeeded for applied_change in applied_changes))
+        monitor = self.shinobi_client.monitor(email, password).get(monitor_id)
+        self.assertEqual(EXAMPLE_MONITOR_1_CONFIGURATION["name"], monitor["name"])
+
+        self.assertFalse(self.reconciler.plan(desired_state).has_changes)
+
+    def test_plan_and_apply_existing_user(self):
+        user = self._create_user()
+        monitor_orm = self.shinobi_client.monitor(user["email"], user["password"])
+        unchanged_monitor_id, modified_monitor_id, deleted_monitor_id, created_monitor_id = (
+            generate_random_string() for _ in range(4))
+        for monitor_id in (unchanged_monitor_id, modified_monitor_id, deleted_monitor_id):
+            monitor_orm.create(monitor_id, EXAMPLE_MONITOR_1_CONFIGURATION)
+        desired_state = DesiredState([DesiredUser(user["email"], user["password"], {
+            unchanged_monitor_id: EXAMPLE_MONITOR_1_CONFIGURATION,
+            modified_monitor_id: EXAMPLE_MONITOR_2_CONFIGURATION,
+            created_monitor_id: EXAMPLE_MONITOR_2_CONFIGURATION
+        }, prune_monitors=True)])
+
+        plan = self.reconciler.plan(desired_state)
+        actions = {change.monitor_id: change.action for change in plan.changes}
+        self.assertEqual({
+            None: ReconcileAction.NONE,
+            unchanged_monitor_id: ReconcileAction.NONE,
+            modified_monitor_id: ReconcileAction.MODIFY,
+            deleted_monitor_id: ReconcileAction.DELETE,
+            created_monitor_id: ReconcileAction.CREATE
+        }, actions)
+
+        applied_changes = self.reconciler.apply(plan)
+        self.assertTrue(all(applied_change.succeeded for applied_change in applied_changes))
+        self.assertCountEqual((unchanged_monitor_id, modified_monitor_id, created_monitor_id),
+                              (monitor["mid"] for monitor in monitor_orm.get_all()))
+        self.assertFalse(self.reconciler.plan(desired_state).has_changes)
+
+    def test_plan_and_apply_password_change(self):
+        user = self._create_user()
+        _, password = _create_email_and_password()
+        desired_state = DesiredState([DesiredUser(user["email"], password)])
+
+        plan = self.reconciler.plan(desired_state)
+        self.assertEqual([ReconcileAction.MODIFY], [change.action for change in plan.changes])
+
+        self.reconciler.apply(plan)
+        self.assertIsNotNone(self.shinobi_client.user.get(user["email"], password))
+
+
+if __name__ == "__main__":
+    unittest.main()
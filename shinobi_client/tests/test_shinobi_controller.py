@@ -1,10 +1,20 @@
+import json
+import os
 import unittest
+from tempfile import TemporaryDirectory
 
 import requests
 
-from shinobi_client.shinobi_controller import ShinobiController, start_shinobi
+from shinobi_client.tests._common import is_using_docker
 
+if is_using_docker():
+    from shinobi_client.shinobi_controller import ShinobiController, start_shinobi, ShinobiSnapshotNotFoundError, \
+        ShinobiSnapshotMismatchError
 
+_SKIP_REASON = "Shinobi controller tests require SHINOBI_CLIENT_TEST_BACKEND=docker"
+
+
+@unittest.skipUnless(is_using_docker(), _SKIP_REASON)
 class TestShinobiController(unittest.TestCase):
     """
     Tests for `ShinobiController`.
@@ -28,7 +38,53 @@ class TestShinobiController(unittest.TestCase):
     def test_stop_when_not_started(self):
         self._shinobi_controller.stop()
 
+    def test_start_reuses_cache(self):
+        with TemporaryDirectory() as cache_location:
+            for _ in range(2):
+                controller = ShinobiController(cache_location=cache_location)
+                with controller as shinobi_client:
+                    self.assertTrue(requests.get(shinobi_client.url).ok)
+                self.assertEqual(["clone", "build", "up", "wait"], list(controller.startup_timings.keys()))
+            self.assertEqual(1, len(os.listdir(os.path.join(cache_location, "repositories"))))
+
+    def test_start_from_snapshot(self):
+        with TemporaryDirectory() as cache_location:
+            controller = ShinobiController(cache_location=cache_location)
+            with controller as shinobi_client:
+                shinobi_client.user.create("seeded@example.com", "password")
+                controller.save_snapshot("seeded")
+                self.assertIsNotNone(shinobi_client.user.get("seeded@example.com"))
+            self.assertEqual(["seeded"], controller.get_snapshot_names())
+
+            restored_controller = ShinobiController(cache_location=cache_location, snapshot="seeded")
+            with restored_controller as restored_shinobi_client:
+                self.assertIsNotNone(restored_shinobi_client.user.get("seeded@example.com"))
+                restored_shinobi_client.monitor("seeded@example.com", "password").get_all()
+            self.assertIn("restore", restored_controller.startup_timings)
+
+            self.assertTrue(controller.delete_snapshot("seeded"))
+            self.assertEqual([], controller.get_snapshot_names())
+
+    def test_start_from_missing_snapshot(self):
+        with TemporaryDirectory() as cache_location, TemporaryDirectory() as temp_root_location:
+            controller = ShinobiController(temp_root_location=temp_root_location, cache_location=cache_location,
+                                           snapshot="missing")
+            self.assertRaises(ShinobiSnapshotNotFoundError, controller.start)
+            self.assertEqual([], os.listdir(temp_root_location))
+
+    def test_start_from_snapshot_of_other_source(self):
+        with TemporaryDirectory() as cache_location, TemporaryDirectory() as temp_root_location:
+            snapshot_location = os.path.join(cache_location, "snapshots", "other")
+            os.makedirs(snapshot_location)
+            with open(os.path.join(snapshot_location, "metadata.json"), "w") as file:
+                json.dump(dict(credentials={}, source_hash="0" * 40), file)
+            controller = ShinobiController(temp_root_location=temp_root_location, cache_location=cache_location,
+                                           snapshot="other")
+            self.assertRaises(ShinobiSnapshotMismatchError, controller.start)
+            self.assertEqual([], os.listdir(temp_root_location))
+
 
+@unittest.skipUnless(is_using_docker(), _SKIP_REASON)
 class TestStartShinobi(unittest.TestCase):
     """
     Tests for `start_shinobi`.
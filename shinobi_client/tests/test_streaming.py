@@ -0,0 +1,98 @@
+import json
+import unittest
+from dataclasses import replace
+from typing import Any, Iterator, List
+
+from shinobi_client._streaming import StreamedJsonArray
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+
+def _chunk(content: Any, chunk_size: int = 1) -> List[bytes]:
+    encoded = json.dumps(content).encode()
+    return [encoded[i:i + chunk_size] for i in range(0, len(encoded), chunk_size)]
+
+
+class TestStreamedJsonArray(unittest.TestCase):
+    """
+    Tests for `StreamedJsonArray`.
+    """
+    def test_top_level_array(self):
+        content = [{"a": 1, "b": "é"}, [], 1234, -1.5e3, "x", True, None]
+        stream = StreamedJsonArray(_chunk(content))
+        self.assertEqual(content, list(stream))
+        self.assertIsNone(stream.value)
+
+    def test_empty_array(self):
+        self.assertEqual([], list(StreamedJsonArray(_chunk([]))))
+
+    def test_top_level_object(self):
+        stream = StreamedJsonArray(_chunk({"ok": False, "msg": "Not Authorized"}))
+        self.assertEqual([], list(stream))
+        self.assertEqual({"ok": False, "msg": "Not Authorized"}, stream.value)
+
+    def test_array_in_object(self):
+        stream = StreamedJsonArray(_chunk({"ok": True, "users": [{"mail": "a"}, {"mail": "b"}], "count": 2}), "users")
+        self.assertEqual([{"mail": "a"}, {"mail": "b"}], list(stream))
+        self.assertIsNone(stream.value)
+
+    def test_array_not_in_object(self):
+        stream = StreamedJsonArray(_chunk({"ok": False, "msg": "Not Authorized"}), "users")
+        self.assertEqual([], list(stream))
+        self.assertEqual({"ok": False, "msg": "Not Authorized"}, stream.value)
+
+    def test_elements_yielded_as_they_arrive(self):
+        chunks_read = 0
+
+        def chunks() -> Iterator[bytes]:
+            nonlocal chunks_read
+            for chunk in _chunk([{"mid": str(i)} for i in range(100)], chunk_size=64):
+                chunks_read += 1
+                yield chunk
+
+        elements = iter(StreamedJsonArray(chunks()))
+        self.assertEqual({"mid": "0"}, next(elements))
+        self.assertEqual(1, chunks_read)
+
+    def test_invalid_json(self):
+        self.assertRaises(ValueError, list, StreamedJsonArray([b"[{\"a\": 1}, {\"b\""]))
+        self.assertRaises(ValueError, list, StreamedJsonArray([b"[1, 2] 3"]))
+
+
+class TestIterAll(unittest.TestCase):
+    """
+    Tests for the ORMs' `iter_all`.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        self.shinobi_client = self.stand_in_shinobi.start()
+        self.shinobi_client.user.create("a@example.com", "password")
+        self.monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_iter_all_monitors(self):
+        for monitor_id in ("camera1", "camera2", "camera3"):
+            self.assertEqual(self.monitor_orm.get_all(), tuple(self.monitor_orm.iter_all(chunk_size=100)))
+            self.monitor_orm.create(monitor_id, get_monitor_configuration(1))
+
+    def test_iter_all_monitors_when_api_key_rejected(self):
+        self.monitor_orm.create("camera1", get_monitor_configuration(1))
+        self.stand_in_shinobi.rotate_api_key("a@example.com")
+        self.assertEqual(["camera1"], [monitor["mid"] for monitor in self.monitor_orm.iter_all()])
+
+    def test_iter_all_users(self):
+        self.shinobi_client.user.create("b@example.com", "password")
+        self.assertEqual(list(self.shinobi_client.user.get_all()),
+                         list(self.shinobi_client.user.iter_all(chunk_size=100)))
+
+    def test_iter_all_users_with_wrong_super_user_token(self):
+        shinobi_client = replace(self.shinobi_client, super_user_token="wrong")
+        self.assertRaisesRegex(RuntimeError, "Not Authorized", list, shinobi_client.user.iter_all())
+        shinobi_client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from time import monotonic
+
+from requests import HTTPError, ConnectionError
+
+from shinobi_client.testing import StandInShinobi, DROP_CONNECTION
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+
+class TestStandInShinobi(unittest.TestCase):
+    """
+    Tests for `StandInShinobi`.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        self.shinobi_client = self.stand_in_shinobi.start()
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_latency(self):
+        self.stand_in_shinobi.latency = 0.1
+        started_at = monotonic()
+        self.shinobi_client.user.get_all()
+        self.assertGreaterEqual(monotonic() - started_at, 0.1)
+
+    def test_fail_next(self):
+        self.stand_in_shinobi.fail_next(2, status=503)
+        for _ in range(2):
+            self.assertRaisesRegex(HTTPError, "503", self.shinobi_client.user.get_all)
+        self.assertEqual((), self.shinobi_client.user.get_all())
+        self.assertEqual(3, self.stand_in_shinobi.requests)
+
+    def test_drop_connection(self):
+        self.stand_in_shinobi.fail_next(status=DROP_CONNECTION)
+        self.assertRaises(ConnectionError, self.shinobi_client.user.get_all)
+        self.assertEqual((), self.shinobi_client.user.get_all())
+
+    def test_error_rate(self):
+        self.stand_in_shinobi.error_rate = 0.5
+        failures = 0
+        for _ in range(50):
+            try:
+                self.shinobi_client.user.get_all()
+            except HTTPError:
+                failures += 1
+        self.assertTrue(0 < failures < 50)
+
+    def test_dashes_removed_from_monitor_ids(self):
+        self.shinobi_client.user.create("a@example.com", "password")
+        monitor_orm = self.shinobi_client.monitor("a@example.com", "password")
+        monitor_orm._configure("camera-1", get_monitor_configuration(1))
+        self.assertEqual(["camera1"], [monitor["mid"] for monitor in monitor_orm.get_all()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import copy
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from shinobi_client._common import generate_random_string
+from shinobi_client.polling import PollPolicy
+from shinobi_client.testing import StandInShinobi
+from shinobi_client.tests.resources.metadata import get_monitor_configuration
+
+EXAMPLE_MONITOR_1_CONFIGURATION = get_monitor_configuration(1)
+EXAMPLE_MONITOR_2_CONFIGURATION = get_monitor_configuration(2)
+
+_NUMBER_OF_THREADS = 32
+_NUMBER_OF_USERS = 64
+
+
+class TestThreadSafety(unittest.TestCase):
+    """
+    Stress tests that use a single client (and ORMs) from many threads at once.
+    """
+    def setUp(self):
+        self.stand_in_shinobi = StandInShinobi()
+        self.shinobi_client = replace(
+            self.stand_in_shinobi.start(), poll_policy=PollPolicy(initial_interval=0.001, max_interval=0.01),
+            user_directory_ttl=60)
+
+    def tearDown(self):
+        self.shinobi_client.close()
+        self.stand_in_shinobi.stop()
+
+    def test_concurrent_user_lifecycles(self):
+        def lifecycle(_) -> bool:
+            email, password = f"{generate_random_string()}@example.com", generate_random_string()
+            user = self.shinobi_client.user.create(email, password)
+            assert self.shinobi_client.user.get(email) is not None
+            assert self.shinobi_client.user.get(email, password)["uid"] == user["uid"]
+            return self.shinobi_client.user.delete(email)
+
+        with ThreadPoolExecutor(_NUMBER_OF_THREADS) as executor:
+            self.assertTrue(all(executor.map(lifecycle, range(_NUMBER_OF_USERS))))
+        self.assertEqual((), self.shinobi_client.user.get_all())
+
+    def test_concurrent_monitor_lifecycles(self):
+        email, password = f"{generate_random_string()}@example.com", generate_random_string()
+        self.shinobi_client.user.create(email, password)
+        monitor_orm = self.shinobi_client.monitor(email, password)
+        configuration_1 = copy.deepcopy(EXAMPLE_MONITOR_1_CONFIGURATION)
+        configuration_2 = copy.deepcopy(EXAMPLE_MONITOR_2_CONFIGURATION)
+
+        def lifecycle(_) -> bool:
+            monitor_id = generate_random_string()
+            monitor_orm.create(monitor_id, configuration_1)
+            assert monitor_orm.modify(monitor_id, configuration_2)
+            assert monitor_id in (monitor["mid"] for monitor in monitor_orm.get_all())
+            return monitor_orm.delete(monitor_id)
+
+        with ThreadPoolExecutor(_NUMBER_OF_THREADS) as executor:
+            self.assertTrue(all(executor.map(lifecycle, range(_NUMBER_OF_USERS))))
+        self.assertEqual((), monitor_orm.get_all())
+        # Configurations shared between threads must not be modified
+        self.assertEqual(EXAMPLE_MONITOR_1_CONFIGURATION, configuration_1)
+        self.assertEqual(EXAMPLE_MONITOR_2_CONFIGURATION, configuration_2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+from threading import local, Lock
+from time import perf_counter, monotonic, sleep
+from typing import Dict, Optional, Callable, Sequence
+from weakref import WeakSet
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from shinobi_client.deadlines import get_deadline_scope, describe_request, DeadlineScope
+
+DEFAULT_POOL_SIZE = 10
+
+# Called after each request with the HTTP method, the URL, the response (`None` if the request failed without a
+# response) and the seconds taken
+RequestHook = Callable[[str, str, Optional[Response], float], None]
+
+
+class ShinobiTransport:
+    """
+    Pooled, keep-alive HTTP transport.
+
+    A single transport is owned by a `ShinobiClient` and is shared by all the ORMs created from that client, so that
+    connections to Shinobi are reused between API calls.
+
+    Thread safe: as `requests.Session` is not, each thread uses its own session (and pool of connections).
+    """
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, timeout: Optional[float] = None,
+                 headers: Optional[Dict[str, str]] = None, hooks: Sequence[RequestHook] = (),
+                 flow_control: Optional["ShinobiFlowControl"] = None):
+        """
+        Constructor.
+        :param pool_size: maximum number of connections to keep alive to Shinobi
+        :param timeout: default timeout (in seconds) for each request, `None` for no timeout
+        :param headers: headers to send with every request
+        :param hooks: called after each request (see `RequestHook`)
+        :param flow_control: optional flow control (concurrency limit, retries and circuit breaker) of requests
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = dict(headers) if headers is not None else {}
+        self.flow_control = flow_control
+        # Replaced, rather than modified, when a hook is added, so that requests can iterate hooks without locking
+        self.hooks = tuple(hooks)
+        self._thread_local = local()
+        # Weakly referenced so that the sessions of threads that have finished can be garbage collected
+        self._sessions: WeakSet = WeakSet()
+        self._sessions_lock = Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(self.headers)
+            self._thread_local.session = session
+            with self._sessions_lock:
+                self._sessions.add(session)
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> Response:
+        """
+        Makes a request to Shinobi using a pooled connection.
+
+        With flow control, the request waits for the concurrency limit of Shinobi's host and idempotent reads that fail
+        are retried (see `shinobi_client.flow_control`).
+        :param method: HTTP method
+        :param url: URL to request
+        :param kwargs: key word arguments to pass to `requests.Session.request` (`timeout` overrides the default)
+        :return: response from Shinobi
+        :raises ShinobiTimeoutError: if the deadline of the current deadline scope (see `shinobi_client.deadlines`)
+                                     has passed, or passes while waiting to make the request or during it
+        :raises ShinobiCircuitOpenError: if using flow control and the circuit breaker of Shinobi's host is open
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        scope = get_deadline_scope()
+        if self.flow_control is None:
+            return self._request_within_deadline(scope, method, url, kwargs)
+
+        host = self.flow_control.get_host(url)
+        retry_policy = self.flow_control.retry_policy
+        phase = describe_request(method, url)
+        attempt = 0
+        while True:
+            attempt += 1
+            if not host.acquire(scope.bound_timeout(None, phase) if scope is not None else None):
+                raise scope.timeout_error(f"{phase} (waiting to be made)")
+            started_at = monotonic()
+            response, status, error = None, None, None
+            try:
+                try:
+                    response = self._request_within_deadline(scope, method, url, dict(kwargs))
+                    status = response.status_code
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+            finally:
+                host.record(started_at, status, error is not None)
+
+            interval = retry_policy.interval(attempt)
+            if not retry_policy.should_retry(method, attempt, status) \
+                    or (scope is not None and scope.remaining <= interval):
+                if error is not None:
+                    raise error
+                return response
+            if response is not None:
+                response.close()
+            sleep(interval)
+
+    def _request_within_deadline(self, scope: Optional[DeadlineScope], method: str, url: str,
+                                 kwargs: Dict) -> Response:
+        """
+        Makes a request to Shinobi, with its timeout bounded by the time remaining until the deadline (if any).
+        """
+        if scope is None:
+            return self._request(method, url, kwargs)
+
+        timeout = kwargs["timeout"]
+        phase = describe_request(method, url)
+        kwargs["timeout"] = scope.bound_timeout(timeout, phase)
+        try:
+            return self._request(method, url, kwargs)
+        except requests.Timeout as e:
+            if kwargs["timeout"] != timeout:
+                raise scope.timeout_error(phase) from e
+            raise
+
+    def _request(self, method: str, url: str, kwargs: Dict) -> Response:
+        """
+        Makes a request to Shinobi, calling the request hooks.
+        """
+        if len(self.hooks) == 0:
+            return self.session.request(method, url, **kwargs)
+
+        response = None
+        started_at = perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+            return response
+        finally:
+            elapsed = perf_counter() - started_at
+            for hook in self.hooks:
+                hook(method, url, response, elapsed)
+
+    def add_hook(self, hook: RequestHook):
+        """
+        Adds a hook that is called after each request.
+        :param hook: hook to add (see `RequestHook`)
+        """
+        with self._sessions_lock:
+            self.hooks = self.hooks + (hook, )
+
+    def get(self, url: str, **kwargs) -> Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """
+        Closes all pooled connections (of all threads).
+        """
+        with self._sessions_lock:
+            sessions, self._sessions = list(self._sessions), WeakSet()
+            # Sessions of other threads are closed but not forgotten by them, so start afresh
+            self._thread_local = local()
+        for session in sessions:
+            session.close()